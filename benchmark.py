@@ -0,0 +1,53 @@
+import argparse
+import sys
+
+if __name__ == "__main__":
+    # Imported under the guard, so that spawned worker processes (which import this
+    # module as __mp_main__) do not pay for it in the worker_spawn benchmarks
+    from benchmarks.runner import (
+        compare_results,
+        read_results,
+        run_benchmarks,
+        save_results,
+    )
+
+    parser = argparse.ArgumentParser(
+        description="Run the benchmarks or compare two benchmark results."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    parser_run = subparsers.add_parser("run", help="run the benchmarks")
+    parser_run.add_argument("output_file", help="json file for the results")
+    parser_run.add_argument("--cases", nargs="*", help="names of the cases to run")
+    parser_run.add_argument("--max-nodes", type=int, default=10 ** 3)
+    parser_run.add_argument("--repeat", type=int, default=5)
+    parser_run.add_argument("--max-time", type=float, default=10.0)
+
+    parser_compare = subparsers.add_parser("compare", help="compare two results")
+    parser_compare.add_argument("baseline_file")
+    parser_compare.add_argument("current_file")
+    parser_compare.add_argument("--threshold", type=float, default=0.1)
+
+    arguments = parser.parse_args()
+    if arguments.command == "run":
+        results = run_benchmarks(
+            names=arguments.cases,
+            max_nodes=arguments.max_nodes,
+            repeat=arguments.repeat,
+            max_time=arguments.max_time,
+        )
+        save_results(results, arguments.output_file)
+    else:
+        comparison = compare_results(
+            baseline=read_results(arguments.baseline_file),
+            current=read_results(arguments.current_file),
+            threshold=arguments.threshold,
+        )
+        for item in comparison:
+            print(
+                f"{item['status']:<12} {item['ratio']:6.2f}x  "
+                f"{item['baseline']:.4g} s -> {item['current']:.4g} s  {item['case']}"
+            )
+        regressions = [item for item in comparison if item["status"] == "regression"]
+        print(f"{len(regressions)} regressions out of {len(comparison)} cases")
+        sys.exit(1 if regressions else 0)
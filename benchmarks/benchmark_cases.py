@@ -0,0 +1,236 @@
+import concurrent.futures as cf
+import multiprocessing
+import os
+import random as rd
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from community import Community
+from scripts.save_read_community import (
+    combine_community_files,
+    read_community_from_combined_file,
+    save_community_to_file,
+)
+from simulation import Simulation
+from stats.table_std_coefficients import table_std_coefficients
+from stats.table_variance import table_variance
+
+""" Benchmark cases
+
+Every case is a function that takes the parameters of the case, performs the setup
+that should not be timed and returns the function to be timed. Cases that create
+temporary files return (function, cleanup) instead, and the runner calls cleanup
+after the timing. """
+
+
+def community_parameters(number_of_nodes: int, degree: int):
+    return {
+        "number_of_nodes": number_of_nodes,
+        "number_of_elites": int(0.4 * number_of_nodes),
+        "degree": degree,
+        "elite_competence": 0.6,
+        "mass_competence": 0.6,
+        "probability_preferential_attachment": 0.6,
+        "probability_homophilic_attachment": 0.6,
+    }
+
+
+def case_community_init(number_of_nodes: int, degree: int):
+    params = community_parameters(number_of_nodes, degree)
+    return lambda: Community(**params)
+
+
+def case_rewire_network(number_of_nodes: int, degree: int):
+    # The edges avoid generating the network at initialization
+    community = Community(
+        **community_parameters(number_of_nodes, degree), edges=[(0, 1)]
+    )
+    initial_network = community.create_initial_network_with_homophilic_attachment()
+    return lambda: community.rewire_network(initial_network)
+
+
+def case_voting_simulation(number_of_nodes: int, number_of_voting_simulations: int):
+    community = Community(**community_parameters(number_of_nodes, 6))
+    return lambda: community.voting_simulation(number_of_voting_simulations)
+
+
+def case_save_communities(number_of_nodes: int, number_of_communities: int):
+    communities = [
+        Community(**community_parameters(number_of_nodes, 6))
+        for _ in range(number_of_communities)
+    ]
+    temporary_directory = tempfile.TemporaryDirectory()
+    directory = temporary_directory.name
+
+    def save_and_combine():
+        for number, community in enumerate(communities):
+            save_community_to_file(
+                filename=f"{directory}/communities/{number}", community=community
+            )
+        combine_community_files(
+            directory_path=f"{directory}/communities",
+            output_file=f"{directory}/communities.pickle",
+            delete_directory=True,
+        )
+
+    return save_and_combine, temporary_directory.cleanup
+
+
+def case_read_community(number_of_nodes: int, number_of_communities: int):
+    temporary_directory = tempfile.TemporaryDirectory()
+    directory = temporary_directory.name
+    for number in range(number_of_communities):
+        save_community_to_file(
+            filename=f"{directory}/communities/{number}",
+            community=Community(**community_parameters(number_of_nodes, 6)),
+        )
+    combine_community_files(
+        directory_path=f"{directory}/communities",
+        output_file=f"{directory}/communities.pickle",
+        delete_directory=True,
+    )
+    return (
+        lambda: read_community_from_combined_file(
+            filename=f"{directory}/communities.pickle",
+            community_number=number_of_communities - 1,
+        ),
+        temporary_directory.cleanup,
+    )
+
+
+def case_simulation_executor(executor: str, number_of_communities: int):
+    temporary_directory = tempfile.TemporaryDirectory()
+    directory = temporary_directory.name
+    simulation = Simulation(
+        folder_communities=f"{directory}/communities",
+        filename_csv=f"{directory}/data",
+        number_of_communities=number_of_communities,
+        number_of_voting_simulations=100,
+        executor=executor,
+        seed=0,
+    )
+    return simulation.run, temporary_directory.cleanup
+
+
+def synthetic_data_file(number_of_rows: int, directory: str):
+    """Writes a data file with the columns of the simulation output to 'directory'
+    and returns its name."""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "minority_competence": rng.uniform(0.55, 0.7, number_of_rows),
+            "majority_competence": rng.uniform(0.55, 0.7, number_of_rows),
+            "number_of_minority": rng.integers(25, 46, number_of_rows),
+            "influence_minority_proportion": rng.uniform(0.3, 0.6, number_of_rows),
+            "homophily": rng.uniform(0.5, 0.75, number_of_rows),
+        }
+    )
+    df["accuracy"] = (
+        0.5
+        - 2 * (df["minority_competence"] - 0.6)
+        + 2 * (df["majority_competence"] - 0.6)
+        - df["influence_minority_proportion"]
+        + rng.normal(0, 0.05, number_of_rows)
+    )
+    filename = f"{directory}/data.csv"
+    df.to_csv(filename, index=False)
+    return filename
+
+
+def case_table_variance(number_of_rows: int):
+    temporary_directory = tempfile.TemporaryDirectory()
+    data_file = synthetic_data_file(number_of_rows, temporary_directory.name)
+    return lambda: table_variance(data_file=data_file), temporary_directory.cleanup
+
+
+def case_table_std_coefficients(number_of_rows: int):
+    temporary_directory = tempfile.TemporaryDirectory()
+    data_file = synthetic_data_file(number_of_rows, temporary_directory.name)
+    return (
+        lambda: table_std_coefficients(data_file=data_file),
+        temporary_directory.cleanup,
+    )
+
+
+root_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def case_import_module(module: str):
+    """Times the import of 'module' in a new interpreter."""
+    command = [sys.executable, "-c", f"import {module}"]
+    return lambda: subprocess.run(command, cwd=root_directory, check=True)
+
+
+def case_worker_spawn(module: str):
+    """Times the start of a spawned worker process that imports 'module', as
+    happens for every worker of a process pool on platforms that spawn."""
+    context = multiprocessing.get_context("spawn")
+
+    def spawn_worker():
+        with cf.ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            executor.submit(exec, f"import {module}").result()
+
+    return spawn_worker
+
+
+node_values = [10 ** 2, 10 ** 3, 10 ** 4, 10 ** 5]
+
+benchmark_cases: dict = {
+    "import_module": {
+        "setup": case_import_module,
+        "params": {
+            "module": ["community", "simulation", "generate_figures.figure_basics"]
+        },
+    },
+    "worker_spawn": {
+        "setup": case_worker_spawn,
+        "params": {"module": ["community", "simulation"]},
+    },
+    "community_init": {
+        "setup": case_community_init,
+        "params": {"number_of_nodes": node_values, "degree": [3, 6, 12]},
+    },
+    "rewire_network": {
+        "setup": case_rewire_network,
+        "params": {"number_of_nodes": node_values, "degree": [3, 6, 12]},
+    },
+    "voting_simulation": {
+        "setup": case_voting_simulation,
+        "params": {
+            "number_of_nodes": node_values,
+            "number_of_voting_simulations": [10 ** 2, 10 ** 3],
+        },
+    },
+    "save_communities": {
+        "setup": case_save_communities,
+        "params": {"number_of_nodes": node_values, "number_of_communities": [10, 100]},
+    },
+    "read_community": {
+        "setup": case_read_community,
+        "params": {"number_of_nodes": node_values, "number_of_communities": [10, 100]},
+    },
+    "simulation_executor": {
+        "setup": case_simulation_executor,
+        "params": {
+            "executor": ["serial", "threads", "processes"],
+            "number_of_communities": [10, 100],
+        },
+    },
+    "table_variance": {
+        "setup": case_table_variance,
+        "params": {"number_of_rows": [10 ** 3, 10 ** 4, 10 ** 5]},
+    },
+    "table_std_coefficients": {
+        "setup": case_table_std_coefficients,
+        "params": {"number_of_rows": [10 ** 3, 10 ** 4, 10 ** 5]},
+    },
+}
+
+
+def seed_benchmarks(seed: int = 0):
+    rd.seed(seed)
+    np.random.seed(seed)
@@ -0,0 +1,152 @@
+import json
+import platform
+import subprocess
+import time
+
+from scripts.sweep import parameter_grid
+
+from benchmarks.benchmark_cases import benchmark_cases, seed_benchmarks
+
+
+def case_id(name: str, params: dict):
+    """Returns the identifier of a benchmark case, e.g.
+    'community_init(number_of_nodes=100, degree=6)'."""
+    arguments = ", ".join(f"{key}={value}" for key, value in params.items())
+    return f"{name}({arguments})"
+
+
+def time_function(function, repeat: int = 5, max_time: float = 10.0):
+    """Returns the timings in seconds of up to 'repeat' calls of 'function'. Stops
+    early once the total time exceeds 'max_time'."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+        if sum(timings) > max_time:
+            break
+    return timings
+
+
+def run_benchmarks(
+    names: list = None,
+    max_nodes: int = 10 ** 3,
+    repeat: int = 5,
+    max_time: float = 10.0,
+):
+    """Runs the benchmark cases and returns the results.
+
+    Parameters
+    ----------
+    names: list
+        Names of the cases to run; runs all cases if it is not given
+    max_nodes: int
+        Skips the parameter combinations with more nodes
+    repeat: int
+        Maximal number of timed calls per parameter combination
+    max_time: float
+        Time in seconds after which no further calls of a combination are timed
+
+    Returns
+    -------
+    results: dict
+        Maps the identifier of every case to its timings and summary statistics"""
+    results = {}
+    for name, case in benchmark_cases.items():
+        if names is not None and name not in names:
+            continue
+        for params in parameter_grid(case["params"]):
+            if params.get("number_of_nodes", 0) > max_nodes:
+                continue
+            identifier = case_id(name, params)
+            seed_benchmarks()
+            cleanup = None
+            try:
+                function = case["setup"](**params)
+                if isinstance(function, tuple):
+                    function, cleanup = function
+                timings = time_function(function, repeat=repeat, max_time=max_time)
+            except Exception as error:
+                results[identifier] = {"error": repr(error)}
+                print(f"{identifier}: {error!r}")
+                continue
+            finally:
+                if cleanup is not None:
+                    cleanup()
+            results[identifier] = {
+                "min": min(timings),
+                "median": sorted(timings)[len(timings) // 2],
+                "timings": timings,
+            }
+            print(f"{identifier}: {min(timings):.4g} s")
+    return results
+
+
+def machine_information():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    information = {
+        "commit": commit,
+        "date": time.ctime(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "system": platform.platform(),
+    }
+    return information
+
+
+def save_results(results: dict, filename: str):
+    with open(filename, "w") as f:
+        json.dump({"machine": machine_information(), "results": results}, f, indent=2)
+
+
+def read_results(filename: str):
+    with open(filename, "r") as f:
+        content = json.load(f)
+    return content["results"]
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = 0.1):
+    """Compares the minimal timings of the cases that occur in both results.
+
+    Parameters
+    ----------
+    baseline: dict
+        Results of run_benchmarks
+    current: dict
+        Results of run_benchmarks
+    threshold: float
+        Relative slowdown above which a case counts as a regression
+
+    Returns
+    -------
+    comparison: list
+        One dict per case with the keys "case", "baseline", "current", "ratio" and
+        "status" ("regression", "improvement" or "unchanged")"""
+    comparison = []
+    for identifier, result in current.items():
+        if identifier not in baseline or "min" not in result:
+            continue
+        if "min" not in baseline[identifier]:
+            continue
+        ratio = result["min"] / baseline[identifier]["min"]
+        status = "unchanged"
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 / (1 + threshold):
+            status = "improvement"
+        comparison.append(
+            {
+                "case": identifier,
+                "baseline": baseline[identifier]["min"],
+                "current": result["min"],
+                "ratio": ratio,
+                "status": status,
+            }
+        )
+    return comparison
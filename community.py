@@ -4,7 +4,16 @@ import networkx as nx
 import numpy as np
 
 from scripts import config as cfg
-from scripts.basic_functions import calculate_accuracy_and_precision, majority_winner
+from scripts.basic_functions import (
+    accuracy_and_precision_from_counts,
+    exponential_tilt,
+    majority_for_mass,
+    majority_winner,
+    proportion_confidence_interval,
+    voting_histogram,
+    voting_statistics_from_histogram,
+)
+from scripts.voting_rules import simple_majority
 
 
 class Community:
@@ -18,6 +27,7 @@ class Community:
         probability_preferential_attachment: float = 0.6,
         probability_homophilic_attachment: float = None,
         edges: list = None,
+        seed: int = None,
     ):
         self.number_of_nodes: int = number_of_nodes
         self.number_of_elites: int = number_of_elites
@@ -32,6 +42,11 @@ class Community:
             probability_homophilic_attachment
         )
         self.edges: list = edges
+        # Random number generators of the community; without seed the global
+        # generators of random and np.random are used
+        self.seed: int = seed
+        self._random = None if seed is None else rd.Random(seed)
+        self._np_random = None if seed is None else np.random.default_rng(seed)
 
         self.nodes: list = list(range(number_of_nodes))
         self.nodes_elite: list = self.nodes[: self.number_of_elites]
@@ -78,7 +93,7 @@ class Community:
         for node in self.nodes:
             potential_targets = self.nodes.copy()
             potential_targets.remove(node)
-            targets = rd.sample(potential_targets, self.degree)
+            targets = self.random.sample(potential_targets, self.degree)
             edges_from_node = [(node, target) for target in targets]
             initial_network.add_edges_from(edges_from_node)
         return initial_network
@@ -90,7 +105,7 @@ class Community:
 
         # Homophilic attachment
         for node in self.nodes:
-            random_list = np.random.random_sample(self.degree)
+            random_list = self.np_random.random(self.degree)
             number_targets_same_type = len(
                 [x for x in random_list if x < self.probability_homophilic_attachment]
             )
@@ -103,8 +118,12 @@ class Community:
                 nodes_same_type = self.nodes_mass.copy()
                 nodes_same_type.remove(node)
                 nodes_diff_type = self.nodes_elite
-            targets_same_type = rd.sample(nodes_same_type, number_targets_same_type)
-            targets_diff_type = rd.sample(nodes_diff_type, number_targets_diff_type)
+            targets_same_type = self.random.sample(
+                nodes_same_type, number_targets_same_type
+            )
+            targets_diff_type = self.random.sample(
+                nodes_diff_type, number_targets_diff_type
+            )
             targets = targets_same_type + targets_diff_type
             edges_from_source = [(node, target) for target in targets]
             initial_network.add_edges_from(edges_from_source)
@@ -117,7 +136,7 @@ class Community:
 
         # Multi-type preferential attachment
         edges_to_do = list(initial_network.edges()).copy()
-        rd.shuffle(edges_to_do)
+        self.random.shuffle(edges_to_do)
         for source, target in edges_to_do:
             # Define potential targets
             if target in self.nodes_elite:
@@ -130,7 +149,7 @@ class Community:
                 if node not in network[source] and node != source
             ]
 
-            if rd.random() < self.probability_preferential_attachment:
+            if self.random.random() < self.probability_preferential_attachment:
                 # Preferential attachment
                 list_of_tuples = list(
                     network.in_degree(potential_targets)
@@ -142,16 +161,16 @@ class Community:
                     break
                 elif all(w == 0 for w in potential_targets_in_degrees):
                     # catches the case where all weights are zero
-                    target_new = rd.choice(potential_targets)
+                    target_new = self.random.choice(potential_targets)
                 else:
-                    target_new = rd.choices(
+                    target_new = self.random.choices(
                         population=potential_targets,
                         weights=potential_targets_in_degrees,
                     )[0]
                     # Note on [0]: rd.choices produces a list
             else:
                 # Random attachment
-                target_new = rd.choice(potential_targets)
+                target_new = self.random.choice(potential_targets)
             # add edge to new network and remove edge from edges_to_do
             network.add_edge(source, target_new)
         return network
@@ -165,27 +184,580 @@ class Community:
             self.network.nodes[mass_node]["competence"] = self.mass_competence
 
     def total_influence_elites(self):
-        edges_to_elites = [
-            (source, target)
-            for (source, target) in self.network.edges()
-            if target in self.nodes_elite
-        ]
-        return len(edges_to_elites)
+        # The elites are the nodes 0, ..., number_of_elites - 1
+        return int(np.sum(self.edge_array()[:, 1] < self.number_of_elites))
 
     def total_influence_mass(self):
-        return len(self.network.edges()) - self.total_influence_elites()
+        return self.network.number_of_edges() - self.total_influence_elites()
+
+    def edge_array(self):
+        """Returns the edges of the network as an integer array of shape
+        (number_of_edges, 2) of (source, target)."""
+        return np.array(list(self.network.edges()), dtype=np.int64).reshape(-1, 2)
+
+    @property
+    def random(self):
+        return rd if self._random is None else self._random
+
+    @property
+    def np_random(self):
+        return np.random if self._np_random is None else self._np_random
+
+    @property
+    def network(self):
+        return self._network
+
+    @network.setter
+    def network(self, network):
+        # The structure is frozen, so that the neighbourhood index cannot become
+        # stale: edges are changed by assigning a new network, e.g. a modified
+        # nx.DiGraph(community.network). Node attributes remain writable.
+        self._network = nx.freeze(network)
+        self.invalidate_neighbourhoods()
+
+    def invalidate_neighbourhoods(self):
+        """Discards the neighbourhood index and sizes. They are rebuilt on the next
+        call of neighbourhood_array; replacing self.network invalidates them."""
+        self._neighbourhoods = None
+        self._neighbourhood_sizes = None
+
+    @property
+    def neighbourhood_sizes(self):
+        """Number of nodes of every neighbourhood, i.e. the out-degree plus one,
+        which is built together with neighbourhood_array."""
+        if self._neighbourhood_sizes is None:
+            self.neighbourhood_array()
+        return self._neighbourhood_sizes
+
+    def neighbourhood_array(self):
+        """Returns a read-only integer array of shape (number_of_nodes, maximal
+        out-degree + 1) whose row i contains node i and its out-neighbours, padded
+        with the value number_of_nodes. The array is built once and reused until the
+        network is replaced or invalidate_neighbourhoods is called."""
+        if self._neighbourhoods is not None:
+            return self._neighbourhoods
+        maximal_out_degree = max(
+            (out_degree for _, out_degree in self.network.out_degree()), default=0
+        )
+        neighbourhoods = np.full(
+            (self.number_of_nodes, maximal_out_degree + 1), self.number_of_nodes
+        )
+        for node in self.nodes:
+            neighbourhood = [node] + list(self.network[node])
+            neighbourhoods[node, : len(neighbourhood)] = neighbourhood
+        neighbourhoods.flags.writeable = False
+        self._neighbourhoods = neighbourhoods
+        self._neighbourhood_sizes = np.sum(
+            neighbourhoods < self.number_of_nodes, axis=1
+        )
+        return neighbourhoods
+
+    def neighbour_opinion_counts(self, opinions_for_mass, neighbourhoods=None):
+        """Returns for every trial and node the number of out-neighbours that hold the
+        opinion for the mass.
+        :param opinions_for_mass: np.ndarray
+            Boolean array of shape (trials, number_of_nodes)
+        :param neighbourhoods: np.ndarray
+            The result of neighbourhood_array, which is computed if not given"""
+        if neighbourhoods is None:
+            neighbourhoods = self.neighbourhood_array()
+        # The padding column refers to a node without the opinion for the mass
+        padded_opinions = np.zeros(
+            (len(opinions_for_mass), self.number_of_nodes + 1), dtype=np.int32
+        )
+        padded_opinions[:, :-1] = opinions_for_mass
+        return padded_opinions[:, neighbourhoods[:, 1:]].sum(axis=2)
+
+    def neighbourhood_votes_for_mass(
+        self, opinions_for_mass, tie_breakers, neighbourhoods=None, rule=None
+    ):
+        """Returns for every trial and node whether the node votes for the mass.
+        :param opinions_for_mass: np.ndarray
+            Boolean array of shape (trials, number_of_nodes)
+        :param tie_breakers: np.ndarray
+            Uniform random numbers of shape (trials, number_of_nodes) for ties
+        :param neighbourhoods: np.ndarray
+            The result of neighbourhood_array, which is computed if not given
+        :param rule:
+            Voting rule (see scripts.voting_rules); the simple majority of the
+            neighbourhood (including the node itself) if not given"""
+        if neighbourhoods is None:
+            neighbourhoods = self.neighbourhood_array()
+        if rule is None:
+            rule = simple_majority
+        out_degrees = np.sum(neighbourhoods[:, 1:] < self.number_of_nodes, axis=1)
+        number_for_mass = self.neighbour_opinion_counts(
+            opinions_for_mass, neighbourhoods
+        )
+        return rule(number_for_mass, out_degrees, opinions_for_mass, tie_breakers)
+
+    def sample_opinions_for_mass(self, rng, number_of_trials: int):
+        """Returns a boolean array of shape (number_of_trials, number_of_nodes) of
+        opinions drawn as in update_opinions: elites hold the opinion for the elites
+        with probability elite_competence and mass nodes hold the opinion for the mass
+        with probability mass_competence."""
+        uniforms = rng.random((number_of_trials, self.number_of_nodes))
+        is_elite = np.arange(self.number_of_nodes) < self.number_of_elites
+        return np.where(
+            is_elite, uniforms >= self.elite_competence, uniforms < self.mass_competence
+        )
+
+    def importance_sampling_simulation(
+        self,
+        number_of_voting_simulations: int,
+        tilted_elite_competence: float = None,
+        tilted_mass_competence: float = None,
+        alpha: float = 0.05,
+        seed: int = None,
+        batch_size: int = 1000,
+        method: str = "wilson",
+    ):
+        """Estimates the probability of majoritarian failure, i.e. that the mass does
+        not win the majority vote, by importance sampling. The opinions are drawn with
+        the tilted competences, under which failures are frequent, and every trial is
+        weighted by the likelihood ratio of its opinions. Rare failures are thereby
+        estimated with far fewer trials than by voting_simulation.
+        :param number_of_voting_simulations: int
+            Number of trials
+        :param tilted_elite_competence: float
+            Elite competence under which the opinions are drawn; by default the
+            competences are tilted exponentially such that the expected number of
+            opinions for the mass is half the number of nodes
+        :param tilted_mass_competence: float
+            Mass competence under which the opinions are drawn
+        :param alpha: float
+            p-value for confidence interval
+        :param seed: int
+            Seed of the random numbers
+        :param batch_size: int
+            Number of trials that are simulated at once
+        :param method: str
+            Method of the confidence interval, see proportion_confidence_interval
+        :returns result: dict
+            result["failure_probability"]: estimated probability of majoritarian
+            failure, where ties count as half a failure,
+            result["accuracy"]: 1 - result["failure_probability"],
+            result["precision"]: width of the confidence interval,
+            result["effective_sample_size"]: number of plain Monte Carlo trials with
+            the same variance, which determines the confidence interval,
+            result["relative_error"]: standard error relative to the estimate,
+            and the same keys with the suffix "_pre_influence" for the opinions"""
+        rng = np.random.default_rng(seed)
+        neighbourhoods = self.neighbourhood_array()
+        is_elite = np.arange(self.number_of_nodes) < self.number_of_elites
+        # Probabilities of the opinion for the mass under both distributions
+        probability_for_mass = np.array(
+            [1 - self.elite_competence, self.mass_competence]
+        )
+        group_sizes = np.array([self.number_of_elites, self.number_of_mass])
+        tilted_probability_for_mass = exponential_tilt(
+            probability_for_mass, group_sizes, self.number_of_nodes / 2
+        )
+        if tilted_elite_competence is not None:
+            tilted_probability_for_mass[0] = 1 - tilted_elite_competence
+        if tilted_mass_competence is not None:
+            tilted_probability_for_mass[1] = tilted_mass_competence
+        log_ratio_for_mass = np.log(probability_for_mass / tilted_probability_for_mass)
+        log_ratio_for_elites = np.log(
+            (1 - probability_for_mass) / (1 - tilted_probability_for_mass)
+        )
+        # Sums of the weighted failures and of their squares
+        sums = {"": np.zeros(2), "_pre_influence": np.zeros(2)}
+        for start in range(0, number_of_voting_simulations, batch_size):
+            trials = min(batch_size, number_of_voting_simulations - start)
+            uniforms = rng.random((trials, self.number_of_nodes))
+            opinions_for_mass = uniforms < np.where(
+                is_elite, *tilted_probability_for_mass
+            )
+            tie_breakers = rng.random((trials, self.number_of_nodes))
+            votes_for_mass = self.neighbourhood_votes_for_mass(
+                opinions_for_mass, tie_breakers, neighbourhoods
+            )
+            number_for_mass = np.stack(
+                [
+                    opinions_for_mass[:, is_elite].sum(axis=1),
+                    opinions_for_mass[:, ~is_elite].sum(axis=1),
+                ],
+                axis=1,
+            )
+            weights = np.exp(
+                number_for_mass @ log_ratio_for_mass
+                + (group_sizes - number_for_mass) @ log_ratio_for_elites
+            )
+            for suffix, outcome in [
+                ("", votes_for_mass),
+                ("_pre_influence", opinions_for_mass),
+            ]:
+                number_of_votes = outcome.sum(axis=1)
+                # The tie-break by a fair coin fails with probability 1/2
+                failures = (2 * number_of_votes < self.number_of_nodes) + (
+                    2 * number_of_votes == self.number_of_nodes
+                ) / 2
+                weighted_failures = weights * failures
+                sums[suffix] += [
+                    weighted_failures.sum(),
+                    np.square(weighted_failures).sum(),
+                ]
+
+        result = {}
+        for suffix, (weighted_sum, squared_sum) in sums.items():
+            failure_probability = weighted_sum / number_of_voting_simulations
+            variance = max(
+                squared_sum / number_of_voting_simulations - failure_probability ** 2,
+                0.0,
+            )
+            if variance > 0:
+                effective_sample_size = (
+                    failure_probability * (1 - failure_probability) / variance
+                ) * number_of_voting_simulations
+                relative_error = np.sqrt(
+                    variance / number_of_voting_simulations
+                ) / failure_probability
+            else:
+                effective_sample_size = float(number_of_voting_simulations)
+                relative_error = 0.0 if failure_probability > 0 else np.inf
+            lower, upper = proportion_confidence_interval(
+                failure_probability * effective_sample_size,
+                effective_sample_size,
+                alpha=alpha,
+                method=method,
+            )
+            result[f"failure_probability{suffix}"] = failure_probability
+            result[f"accuracy{suffix}"] = 1 - failure_probability
+            result[f"precision{suffix}"] = upper - lower
+            result[f"effective_sample_size{suffix}"] = effective_sample_size
+            result[f"relative_error{suffix}"] = relative_error
+        return result
+
+    def voting_simulation_rules(
+        self,
+        rules: dict,
+        number_of_voting_simulations: int,
+        alpha: float = 0.05,
+        seed: int = None,
+        batch_size: int = 1000,
+        method: str = "normal",
+    ):
+        """Estimates the majoritarian accuracy under several voting rules at once. Each
+        trial samples the opinions and counts the opinions in every neighbourhood once;
+        all rules are then applied to the same counts and tie-breakers.
+        :param rules: dict
+            Maps names to voting rules (see scripts.voting_rules)
+        :param number_of_voting_simulations: int
+            Number of trials
+        :param alpha: float
+            p-value for confidence interval
+        :param seed: int
+            Seed of the random numbers
+        :param batch_size: int
+            Number of trials that are simulated at once
+        :param method: str
+            Method of the confidence interval: "normal", "wilson" or "beta"
+        :returns result: dict
+            result[name]["accuracy"] and result[name]["precision"] for every rule, and
+            result["pre_influence"] for the majority of opinions"""
+        rng = np.random.default_rng(seed)
+        neighbourhoods = self.neighbourhood_array()
+        out_degrees = np.sum(neighbourhoods[:, 1:] < self.number_of_nodes, axis=1)
+        number_of_success = dict.fromkeys(list(rules) + ["pre_influence"], 0)
+        for start in range(0, number_of_voting_simulations, batch_size):
+            trials = min(batch_size, number_of_voting_simulations - start)
+            opinions_for_mass = self.sample_opinions_for_mass(rng, trials)
+            tie_breakers = rng.random((trials, self.number_of_nodes))
+            global_tie_breakers = rng.random(trials)
+            number_for_mass = self.neighbour_opinion_counts(
+                opinions_for_mass, neighbourhoods
+            )
+            number_of_success["pre_influence"] += np.sum(
+                majority_for_mass(
+                    opinions_for_mass.sum(axis=1),
+                    self.number_of_nodes,
+                    global_tie_breakers,
+                )
+            )
+            for name, rule in rules.items():
+                votes_for_mass = rule(
+                    number_for_mass, out_degrees, opinions_for_mass, tie_breakers
+                )
+                number_of_success[name] += np.sum(
+                    majority_for_mass(
+                        votes_for_mass.sum(axis=1),
+                        self.number_of_nodes,
+                        global_tie_breakers,
+                    )
+                )
+
+        result = {
+            name: accuracy_and_precision_from_counts(
+                number, number_of_voting_simulations, alpha=alpha, method=method
+            )
+            for name, number in number_of_success.items()
+        }
+        return result
+
+    def influence_matrix(self):
+        """Returns the sparse adjacency matrix of shape (number_of_nodes,
+        number_of_nodes) in CSR format whose entry (i, j) is 1 if node i has the
+        out-neighbour j. Its product with opinions counts the opinions of the
+        out-neighbours of all nodes with memory linear in the number of edges."""
+        from scipy.sparse import csr_matrix
+
+        edges = self.edge_array()
+        return csr_matrix(
+            (np.ones(len(edges), dtype=np.int32), (edges[:, 0], edges[:, 1])),
+            shape=(self.number_of_nodes, self.number_of_nodes),
+        )
+
+    def deliberation_simulation(
+        self,
+        number_of_voting_simulations: int,
+        number_of_rounds: int = 20,
+        rule=None,
+        alpha: float = 0.05,
+        seed: int = None,
+        batch_size: int = 1000,
+        method: str = "normal",
+    ):
+        """Estimates the majoritarian accuracy after every round of repeated
+        influence, where in each round all nodes vote according to the rule given the
+        votes of the previous round, starting from the opinions. The first round is the
+        influence of update_votes. The tie-breakers of every trial are drawn once, so
+        that the rounds of a trial are deterministic: a trial whose votes repeat the
+        previous round has reached a fixed point and a trial whose votes repeat the
+        round before the previous one is in a 2-cycle. These trials stop, and their
+        later rounds are continued from the fixed point or cycle.
+        :param number_of_voting_simulations: int
+            Number of trials
+        :param number_of_rounds: int
+            Maximal number of rounds of influence
+        :param rule:
+            Voting rule (see scripts.voting_rules); simple_majority if not given. With
+            weighted_self_vote(1.5), ties keep the vote of the previous round.
+        :param alpha: float
+            p-value for confidence interval
+        :param seed: int
+            Seed of the random numbers
+        :param batch_size: int
+            Number of trials that are simulated at once
+        :param method: str
+            Method of the confidence interval: "normal", "wilson" or "beta"
+        :returns result: dict
+            result["accuracy"] and result["precision"]: arrays of length
+            number_of_rounds + 1 whose entry 0 is the accuracy of the opinions,
+            result["fixed_point"], result["two_cycle"] and result["not_converged"]:
+            proportions of the trials,
+            result["convergence_round"]: mean first round of the fixed point or cycle
+            of the converged trials"""
+        if rule is None:
+            rule = simple_majority
+        rng = np.random.default_rng(seed)
+        matrix = self.influence_matrix()
+        out_degrees = np.diff(matrix.indptr)
+        rounds = np.arange(number_of_rounds + 1)
+        number_of_success = np.zeros(number_of_rounds + 1, dtype=np.int64)
+        number_converged = {"fixed_point": 0, "two_cycle": 0}
+        sum_of_convergence_rounds = 0
+        for start in range(0, number_of_voting_simulations, batch_size):
+            trials = min(batch_size, number_of_voting_simulations - start)
+            # Drawn in the order of voting_simulation_rules
+            opinions_for_mass = self.sample_opinions_for_mass(rng, trials)
+            tie_breakers = rng.random((trials, self.number_of_nodes))
+            global_tie_breakers = rng.random(trials)
+
+            success = np.zeros((trials, number_of_rounds + 1), dtype=bool)
+            success[:, 0] = majority_for_mass(
+                opinions_for_mass.sum(axis=1), self.number_of_nodes, global_tie_breakers
+            )
+            # Round in which each trial stopped, number_of_rounds + 1 if it did not
+            stop_rounds = np.full(trials, number_of_rounds + 1)
+            active = np.arange(trials)
+            previous_votes = None
+            votes_for_mass = opinions_for_mass
+            for round_number in range(1, number_of_rounds + 1):
+                number_for_mass = (matrix @ votes_for_mass.T.astype(np.int32)).T
+                new_votes = rule(
+                    number_for_mass,
+                    out_degrees,
+                    votes_for_mass,
+                    tie_breakers[active],
+                )
+                success[active, round_number] = majority_for_mass(
+                    new_votes.sum(axis=1),
+                    self.number_of_nodes,
+                    global_tie_breakers[active],
+                )
+                is_fixed_point = np.all(new_votes == votes_for_mass, axis=1)
+                is_two_cycle = ~is_fixed_point
+                if previous_votes is not None:
+                    is_two_cycle &= np.all(new_votes == previous_votes, axis=1)
+                else:
+                    is_two_cycle[:] = False
+                number_converged["fixed_point"] += int(is_fixed_point.sum())
+                number_converged["two_cycle"] += int(is_two_cycle.sum())
+                sum_of_convergence_rounds += int(
+                    is_fixed_point.sum() * (round_number - 1)
+                    + is_two_cycle.sum() * (round_number - 2)
+                )
+                stopped = is_fixed_point | is_two_cycle
+                stop_rounds[active[stopped]] = round_number
+                active = active[~stopped]
+                previous_votes = votes_for_mass[~stopped]
+                votes_for_mass = new_votes[~stopped]
+                if len(active) == 0:
+                    break
+
+            # Later rounds of stopped trials alternate between their last two rounds
+            stopped = stop_rounds <= number_of_rounds
+            later = rounds > stop_rounds[stopped, None]
+            source_rounds = stop_rounds[stopped, None] - (
+                (rounds - stop_rounds[stopped, None]) % 2
+            )
+            success[stopped] = np.where(
+                later,
+                np.take_along_axis(
+                    success[stopped], np.clip(source_rounds, 0, number_of_rounds), 1
+                ),
+                success[stopped],
+            )
+            number_of_success += success.sum(axis=0)
+
+        result = accuracy_and_precision_from_counts(
+            number_of_success, number_of_voting_simulations, alpha=alpha, method=method
+        )
+        number_of_converged_trials = sum(number_converged.values())
+        result.update(
+            {
+                name: number / number_of_voting_simulations
+                for name, number in number_converged.items()
+            }
+        )
+        result["not_converged"] = (
+            1 - number_of_converged_trials / number_of_voting_simulations
+        )
+        result["convergence_round"] = (
+            sum_of_convergence_rounds / number_of_converged_trials
+            if number_of_converged_trials
+            else np.nan
+        )
+        return result
+
+    def competence_sweep(
+        self,
+        elite_values,
+        mass_values,
+        number_of_voting_simulations: int,
+        alpha: float = 0.05,
+        seed: int = None,
+        batch_size: int = 1000,
+        method: str = "normal",
+    ):
+        """Estimates the majoritarian accuracy on the network of this community for
+        every combination of elite competence and mass competence with common random
+        numbers: every trial draws one uniform random number per node, which determines
+        the opinions for all combinations, and the tie-breaks are shared as well. The
+        differences between grid points therefore have low variance.
+        :param elite_values: list
+            Values of the elite competence
+        :param mass_values: list
+            Values of the mass competence
+        :param number_of_voting_simulations: int
+            Number of trials
+        :param alpha: float
+            p-value for confidence interval
+        :param seed: int
+            Seed of the random numbers
+        :param batch_size: int
+            Number of trials that are simulated at once
+        :param method: str
+            Method of the confidence interval: "normal", "wilson" or "beta"
+        :returns result: dict
+            result["accuracy"], result["precision"], result["accuracy_pre_influence"]
+            and result["precision_pre_influence"] are arrays of shape
+            (len(elite_values), len(mass_values))"""
+        rng = np.random.default_rng(seed)
+        neighbourhoods = self.neighbourhood_array()
+        is_elite = np.arange(self.number_of_nodes) < self.number_of_elites
+        shape = (len(elite_values), len(mass_values))
+        number_of_vote_success = np.zeros(shape, dtype=int)
+        number_of_opinion_success = np.zeros(shape, dtype=int)
+        for start in range(0, number_of_voting_simulations, batch_size):
+            trials = min(batch_size, number_of_voting_simulations - start)
+            uniforms = rng.random((trials, self.number_of_nodes))
+            tie_breakers = rng.random((trials, self.number_of_nodes))
+            global_tie_breakers = rng.random((trials, 2))
+            for i, elite_competence in enumerate(elite_values):
+                for j, mass_competence in enumerate(mass_values):
+                    # Elites hold the opinion for the mass if they are not competent
+                    opinions_for_mass = np.where(
+                        is_elite,
+                        uniforms >= elite_competence,
+                        uniforms < mass_competence,
+                    )
+                    votes_for_mass = self.neighbourhood_votes_for_mass(
+                        opinions_for_mass, tie_breakers, neighbourhoods
+                    )
+                    number_of_vote_success[i, j] += np.sum(
+                        majority_for_mass(
+                            votes_for_mass.sum(axis=1),
+                            self.number_of_nodes,
+                            global_tie_breakers[:, 0],
+                        )
+                    )
+                    number_of_opinion_success[i, j] += np.sum(
+                        majority_for_mass(
+                            opinions_for_mass.sum(axis=1),
+                            self.number_of_nodes,
+                            global_tie_breakers[:, 1],
+                        )
+                    )
+
+        result_votes = accuracy_and_precision_from_counts(
+            number_of_vote_success,
+            number_of_voting_simulations,
+            alpha=alpha,
+            method=method,
+        )
+        result_opinions = accuracy_and_precision_from_counts(
+            number_of_opinion_success,
+            number_of_voting_simulations,
+            alpha=alpha,
+            method=method,
+        )
+        result = {
+            "accuracy": result_votes["accuracy"],
+            "precision": result_votes["precision"],
+            "accuracy_pre_influence": result_opinions["accuracy"],
+            "precision_pre_influence": result_opinions["precision"],
+        }
+        return result
 
     def voting_simulation(
-        self, number_of_voting_simulations: int, alpha: float = 0.05, return_all=False
+        self,
+        number_of_voting_simulations: int,
+        alpha: float = 0.05,
+        return_all=False,
+        return_histogram=False,
+        method: str = "normal",
     ):
-        """Method for voting simulation.
+        """Method for voting simulation. The trials are accumulated in the histogram
+        of the number of opinions for the mass and the number of votes for the mass
+        (see voting_histogram), from which all statistics are derived. Memory use is
+        therefore O(number_of_nodes) plus the number of distinct (opinion, vote)
+        pairs.
         :param number_of_voting_simulations
             Number of simulations to estimate the majoritarian accuracy
         :param alpha:
             p-value for confidence interval.
+        :param return_all:
+            Whether to return the list of (vote, opinion) tuples of all trials
+        :param return_histogram:
+            Whether to return the histogram instead of the result
+        :param method:
+            Method of the confidence interval: "normal", "wilson" or "beta"
         :returns result: dict
-            result["accuracy_vote"]: estimated majoritarian accuracy,
-            result["precision_vote"]: the confidence interval associated with p-value
+            result["accuracy"]: estimated majoritarian accuracy, where ties count as
+            half a success,
+            result["precision"]: the confidence interval associated with p-value
             alpha
             result["accuracy_pre_influence"]: estimated majoritarian accuracy
             pre influence,
@@ -198,83 +770,112 @@ class Community:
             result["median_pre_influence"]: the median pre influence,
             result["std_pre_influence"]: the standard deviation pre influence,
         """
-        vote_winners = []
+        pair_counts = {}
         votes = []
-        opinion_winners = []
         opinions = []
+        # The network does not change during the trials
+        neighbourhoods = self.neighbourhood_array()
         for _ in range(number_of_voting_simulations):
-            outcome = self.vote_and_opinion()
-            vote_winners.append(outcome["vote_winner"])
-            votes.append(outcome["vote"])
-            opinion_winners.append(outcome["opinion_winner"])
-            opinions.append(outcome["opinion"])
+            pair = self.opinion_and_vote_counts(neighbourhoods)
+            pair_counts[pair] = pair_counts.get(pair, 0) + 1
+            if return_all:
+                opinions.append(pair[0])
+                votes.append(pair[1])
 
         if return_all:
             return list(zip(votes, opinions))
-        result_vote_winners = calculate_accuracy_and_precision(
-            vote_winners, alpha=alpha
+        histogram = voting_histogram(pair_counts, self.number_of_nodes)
+        if return_histogram:
+            return histogram
+        result = voting_statistics_from_histogram(
+            histogram, alpha=alpha, method=method
         )
-        result_opinion_winners = calculate_accuracy_and_precision(
-            opinion_winners, alpha=alpha
-        )
-        mean = np.mean(votes)
-        median = np.median(votes)
-        std = np.std(votes)
-        mean_pre_influence = np.mean(opinions)
-        median_pre_influence = np.median(opinions)
-        std_pre_influence = np.std(opinions)
-
-        result = {
-            "accuracy": result_vote_winners["accuracy"],
-            "precision": result_vote_winners["precision"],
-            "accuracy_pre_influence": result_opinion_winners["accuracy"],
-            "precision_pre_influence": result_opinion_winners["precision"],
-            "mean": mean,
-            "median": median,
-            "std": std,
-            "mean_pre_influence": mean_pre_influence,
-            "median_pre_influence": median_pre_influence,
-            "std_pre_influence": std_pre_influence,
-        }
         return result
 
-    def vote_and_opinion(self):
-        self.update_votes()
-        list_of_opinions = [self.network.nodes[node]["opinion"] for node in self.nodes]
-        list_of_votes = [self.network.nodes[node]["vote"] for node in self.nodes]
+    def opinion_and_vote_counts(self, neighbourhoods=None):
+        """Samples the opinions, computes the votes and returns the number of opinions
+        for the mass and the number of votes for the mass, which is all a trial of
+        voting_simulation needs."""
+        self.sample_opinions()
+        self.compute_votes(neighbourhoods)
+        return (
+            int(np.count_nonzero(self.opinions == cfg.vote_for_mass)),
+            int(np.count_nonzero(self.votes == cfg.vote_for_mass)),
+        )
+
+    def vote_and_opinion(self, neighbourhoods=None):
+        opinion, vote = self.opinion_and_vote_counts(neighbourhoods)
         output: dict = {
-            "vote_winner": majority_winner(list_of_votes),
-            "vote": sum([vote == cfg.vote_for_mass for vote in list_of_votes]),
-            "opinion_winner": majority_winner(list_of_opinions),
-            "opinion": sum(
-                [opinion == cfg.vote_for_mass for opinion in list_of_opinions]
-            ),
+            "vote_winner": majority_winner(self.votes.tolist(), self.random),
+            "vote": vote,
+            "opinion_winner": majority_winner(self.opinions.tolist(), self.random),
+            "opinion": opinion,
         }
         return output
 
     def vote(self):
-        self.update_votes()
-        list_of_votes = [self.network.nodes[node]["vote"] for node in self.nodes]
-        return majority_winner(list_of_votes)
+        self.sample_opinions()
+        self.compute_votes()
+        return majority_winner(self.votes.tolist(), self.random)
 
     def update_votes(self):
+        """Updates the opinions and votes of all nodes and stores them as the node
+        attributes "opinion" and "vote" of the network."""
         self.update_opinions()
-        for node in self.nodes:
-            neighborhood = list(self.network[node]) + [node]
-            neighborhood_opinions = [
-                self.network.nodes[neighbor_node]["opinion"]
-                for neighbor_node in neighborhood
-            ]
-            self.network.nodes[node]["vote"] = majority_winner(neighborhood_opinions)
+        self.compute_votes()
+        for node, vote in zip(self.nodes, self.votes.tolist()):
+            self.network.nodes[node]["vote"] = vote
 
     def update_opinions(self):
-        for node_elite in self.nodes_elite:
-            if rd.random() < self.elite_competence:
-                self.network.nodes[node_elite]["opinion"] = cfg.vote_for_elites
-            else:
-                self.network.nodes[node_elite]["opinion"] = cfg.vote_for_mass
-        for node_mass in self.nodes_mass:
-            if rd.random() < self.mass_competence:
-                self.network.nodes[node_mass]["opinion"] = cfg.vote_for_mass
-            else:
-                self.network.nodes[node_mass]["opinion"] = cfg.vote_for_elites
+        """Updates the opinions of all nodes and stores them as the node attribute
+        "opinion" of the network."""
+        self.sample_opinions()
+        for node, opinion in zip(self.nodes, self.opinions.tolist()):
+            self.network.nodes[node]["opinion"] = opinion
+
+    def sample_opinions(self):
+        """Draws the opinions of all nodes into the array self.opinions: elites hold
+        the opinion for the elites with probability elite_competence and mass nodes
+        hold the opinion for the mass with probability mass_competence."""
+        uniforms = np.array([self.random.random() for _ in self.nodes])
+        competences = np.where(
+            np.arange(self.number_of_nodes) < self.number_of_elites,
+            self.elite_competence,
+            self.mass_competence,
+        )
+        competent_opinions = np.where(
+            np.arange(self.number_of_nodes) < self.number_of_elites,
+            cfg.vote_for_elites,
+            cfg.vote_for_mass,
+        )
+        incompetent_opinions = np.where(
+            np.arange(self.number_of_nodes) < self.number_of_elites,
+            cfg.vote_for_mass,
+            cfg.vote_for_elites,
+        )
+        self.opinions = np.where(
+            uniforms < competences, competent_opinions, incompetent_opinions
+        )
+
+    def compute_votes(self, neighbourhoods=None):
+        """Computes the votes of all nodes from self.opinions into the array
+        self.votes: each node votes for the majority opinion of its out-neighbours and
+        itself, and ties are broken at random.
+        :param neighbourhoods: np.ndarray
+            The result of neighbourhood_array, which is looked up if not given"""
+        if neighbourhoods is None:
+            neighbourhoods = self.neighbourhood_array()
+        # The padding column refers to a node without the opinion for the mass
+        padded_for_mass = np.zeros(self.number_of_nodes + 1, dtype=np.int32)
+        padded_for_mass[:-1] = self.opinions == cfg.vote_for_mass
+        number_for_mass = padded_for_mass[neighbourhoods].sum(axis=1)
+        neighbourhood_sizes = self.neighbourhood_sizes
+        self.votes = np.where(
+            2 * number_for_mass > neighbourhood_sizes,
+            cfg.vote_for_mass,
+            cfg.vote_for_elites,
+        )
+        for node in np.flatnonzero(2 * number_for_mass == neighbourhood_sizes):
+            self.votes[node] = self.random.choice(
+                [cfg.vote_for_mass, cfg.vote_for_elites]
+            )
@@ -1,5 +1,6 @@
 import os
 
+from generate_figures.binned_data import binned_columns, figure_bins
 from generate_figures.figure_accuracy_homophily import figure_accuracy_homophilic
 from generate_figures.figure_cumulative_prior_post import figure_cumulative_prior_post
 from generate_figures.figure_distribution_accuracy import figure_distribution_accuracy
@@ -14,29 +15,41 @@ if __name__ == "__main__":
     folder_name = "new_figures"
     data_file = "data/clean.csv"
     os.makedirs(folder_name, exist_ok=True)
+    # All distribution figures share one pass over the data file
+    binned_columns(
+        data_file=data_file, bins=figure_bins, cache_directory=f"{folder_name}/cache"
+    )
 
     figure_accuracy_homophilic(
         filename=f"{folder_name}/figure_accuracy_homophilic",
         number_of_communities=200,
         number_of_voting_simulations=200,
+        cache_directory=f"{folder_name}/cache",
     )
     figure_distribution_accuracy_pre_influence(
         filename=f"{folder_name}/figure_distribution_accuracy_pre_influence",
         data_file=data_file,
+        cache_directory=f"{folder_name}/cache",
     )
 
     figure_distribution_influence(
-        filename=f"{folder_name}/figure_distribution_influence", data_file=data_file,
+        filename=f"{folder_name}/figure_distribution_influence",
+        data_file=data_file,
+        cache_directory=f"{folder_name}/cache",
     )
     figure_distribution_accuracy(
-        filename=f"{folder_name}/figure_distribution_accuracy", data_file=data_file,
+        filename=f"{folder_name}/figure_distribution_accuracy",
+        data_file=data_file,
+        cache_directory=f"{folder_name}/cache",
     )
     figure_epistemic_accuracy(
         filename=f"{folder_name}/figure_epistemic_accuracy", scale=4
     )
 
     figure_cumulative_prior_post(
-        filename=f"{folder_name}/figure_cumulative_prior_post", data_file=data_file,
+        filename=f"{folder_name}/figure_cumulative_prior_post",
+        data_file=data_file,
+        cache_directory=f"{folder_name}/cache",
     )
 
     figure_distribution_in_degree(
@@ -0,0 +1,100 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+""" Binned data
+
+The distribution figures plot histograms and cumulative distributions of columns of
+the data file. The counts of the bins of several columns are computed in a single
+pass over the data file in chunks, so that memory use does not grow with the number
+of rows, and are cached per column. """
+
+# Bins of the distribution figures, which cover the whole range of the columns, so
+# that the cumulative distributions include all rows
+accuracy_bins = np.linspace(0, 1, 41)
+figure_bins: dict = {
+    "accuracy": accuracy_bins,
+    "accuracy_pre_influence": accuracy_bins,
+    "influence_minority_proportion": np.linspace(0, 1, 201),
+}
+
+
+def bin_counts(values, edges):
+    """Returns the number of values in each bin as np.histogram: values outside the
+    bins are not counted, and the last bin includes its right edge."""
+    values = np.asarray(values, dtype=float)
+    values = values[(values >= edges[0]) & (values <= edges[-1])]
+    indices = np.searchsorted(edges, values, side="right") - 1
+    indices = np.minimum(indices, len(edges) - 2)
+    return np.bincount(indices, minlength=len(edges) - 1)
+
+
+def binned_dataframe_column(dataframe: pd.DataFrame, column: str, edges):
+    return {"edges": np.asarray(edges), "counts": bin_counts(dataframe[column], edges)}
+
+
+def cache_filename(cache_directory: str, data_file: str, column: str, edges):
+    """The name of the cache file depends on the data file including its size and
+    modification time, so that a changed data file is binned again."""
+    status = os.stat(data_file)
+    content = (
+        f"{os.path.abspath(data_file)}|{status.st_size}|{status.st_mtime_ns}|"
+        f"{column}|{np.asarray(edges, dtype=float).tobytes().hex()}"
+    )
+    key = hashlib.sha256(content.encode()).hexdigest()
+    return f"{cache_directory}/{column}_{key[:16]}.npz"
+
+
+def binned_columns(
+    data_file: str,
+    bins: dict,
+    cache_directory: str = None,
+    chunk_size: int = 10 ** 6,
+):
+    """Returns the binned distributions of columns of a data file.
+    :param data_file: str
+        The csv file
+    :param bins: dict
+        Maps the columns to the edges of their bins
+    :param cache_directory: str
+        Directory of the cached counts; nothing is cached if not given
+    :param chunk_size: int
+        Number of rows that are read at once
+    :returns binned: dict
+        Maps each column to a dict with the arrays "edges" and "counts" """
+    binned = {}
+    if cache_directory is not None:
+        os.makedirs(cache_directory, exist_ok=True)
+        for column, edges in bins.items():
+            filename = cache_filename(cache_directory, data_file, column, edges)
+            if os.path.exists(filename):
+                with np.load(filename) as cached:
+                    binned[column] = {
+                        "edges": cached["edges"],
+                        "counts": cached["counts"],
+                    }
+
+    columns = [column for column in bins if column not in binned]
+    if columns:
+        counts = {
+            column: np.zeros(len(bins[column]) - 1, dtype=np.int64)
+            for column in columns
+        }
+        for chunk in pd.read_csv(
+            data_file, usecols=columns, chunksize=chunk_size, skipinitialspace=True
+        ):
+            for column in columns:
+                counts[column] += bin_counts(chunk[column], bins[column])
+        for column in columns:
+            binned[column] = {
+                "edges": np.asarray(bins[column]),
+                "counts": counts[column],
+            }
+            if cache_directory is not None:
+                np.savez(
+                    cache_filename(cache_directory, data_file, column, bins[column]),
+                    **binned[column],
+                )
+    return binned
@@ -1,10 +1,39 @@
+from functools import partial
+
+import community as community_module
 import numpy as np
-import pandas as pd
+import scripts.sweep as sweep
 from community import Community
+from scripts.sweep import parameter_sweep
+from scripts.sweep_cache import SweepCache, local_dependencies, source_version
 
 from generate_figures.figure_basics import line_plot
 
 
+def homophily_accuracy(
+    homophily: float,
+    competence: float,
+    number_of_nodes: int,
+    degree: int,
+    number_of_elites: int,
+    number_of_voting_simulations: int,
+):
+    """Returns the estimated majoritarian accuracy of a single generated community
+    where elites and mass have the same competence."""
+    community = Community(
+        number_of_nodes=number_of_nodes,
+        number_of_elites=number_of_elites,
+        degree=degree,
+        elite_competence=competence,
+        mass_competence=competence,
+        probability_homophilic_attachment=homophily,
+    )
+    result = community.voting_simulation(
+        number_of_voting_simulations=number_of_voting_simulations
+    )
+    return result["accuracy"]
+
+
 def figure_accuracy_homophilic(
     filename: str = None,
     number_of_nodes: int = 100,
@@ -12,6 +41,9 @@ def figure_accuracy_homophilic(
     number_of_elites: int = 40,
     number_of_communities: int = 200,
     number_of_voting_simulations: int = 100,
+    seed: int = 0,
+    max_workers: int = None,
+    cache_directory: str = None,
 ):
     """Plots the majoritarian accuracy in communities of a certain type for various
     competences and degrees of homophily.
@@ -30,6 +62,12 @@ def figure_accuracy_homophilic(
         Number of communities used for each data point
     number_of_voting_simulations: int
         Number of steps used to estimate majoritarian accuracy in each network
+    seed: int
+        Seed of the parameter sweep
+    max_workers: int
+        Number of worker processes of the parameter sweep
+    cache_directory: str
+        Directory of the sweep cache; the cache is not used if it is not given
 
     Returns
     ----------
@@ -37,31 +75,37 @@ def figure_accuracy_homophilic(
     # Initialize variables
     homophily_values = 0.1 * np.arange(0, 6, 1, dtype=int) + 0.5
     competence_values = 0.05 * np.arange(0, 4, 1, dtype=int) + 0.55
-    columns = ["homophily", "competence", "accuracy"]
-    df = pd.DataFrame(columns=columns)
+    cache = None
+    if cache_directory is not None:
+        cache = SweepCache(
+            directory=cache_directory,
+            # The sweep depends on the community and everything it imports, and
+            # on the seeding of the replicates
+            code_version=source_version(
+                homophily_accuracy,
+                *local_dependencies(community_module, sweep),
+            ),
+        )
 
     # Get data points
-    for counter, h in enumerate(homophily_values):
-        for c in competence_values:
-            c = round(c, 2)
-            # Collect data about the accuracy in generated communities
-            for community_number in range(number_of_communities):
-                community = Community(
-                    number_of_nodes=number_of_nodes,
-                    number_of_elites=number_of_elites,
-                    degree=degree,
-                    elite_competence=c,
-                    mass_competence=c,
-                    probability_homophilic_attachment=h,
-                )
-                result = community.voting_simulation(
-                    number_of_voting_simulations=number_of_voting_simulations
-                )
-                e = result["accuracy"]
-                data_line = pd.DataFrame(data=[[h, c, e]], columns=columns)
-                df = pd.concat([df, data_line], ignore_index=True)
-        progress = int(100 * ((counter + 1) / len(homophily_values)))
-        print(f"Progress figure_accuracy_homophilic: {progress}%")
+    df = parameter_sweep(
+        function=partial(
+            homophily_accuracy,
+            number_of_nodes=number_of_nodes,
+            degree=degree,
+            number_of_elites=number_of_elites,
+            number_of_voting_simulations=number_of_voting_simulations,
+        ),
+        parameters={
+            "homophily": homophily_values,
+            "competence": [round(c, 2) for c in competence_values],
+        },
+        outputs=["accuracy"],
+        number_of_replicates=number_of_communities,
+        seed=seed,
+        max_workers=max_workers,
+        cache=cache,
+    )
 
     # 3. Plot
     ylabel = "majoritarian accuracy"
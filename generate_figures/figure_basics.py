@@ -1,17 +1,48 @@
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-import seaborn as sns
+
+from generate_figures.binned_data import accuracy_bins, binned_dataframe_column
 
 """ Parameter settings """
 font_style: dict = {"family": "Calibri", "size": 11}
 cm = 1 / 2.54  # variable used to convert inches to cm
 histogram_size = (14 * cm, 10 * cm)
 line_plot_size = (14 * cm, 10.5 * cm)
-plt.rc("font", **font_style)
-colormap = sns.color_palette("rocket_r", as_cmap=True)  # Greys_d, crest,
-palette = sns.color_palette("pink")
-sns.set_style("whitegrid")
+
+
+def set_style():
+    """Imports matplotlib and seaborn and applies the plot settings. This happens on
+    the first plot rather than at import time, so that importing the figure modules
+    stays light."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.rc("font", **font_style)
+    sns.set_style("whitegrid")
+    return plt, sns
+
+
+def colormap():
+    import seaborn as sns
+
+    return sns.color_palette("rocket_r", as_cmap=True)  # Greys_d, crest,
+
+
+def palette():
+    import seaborn as sns
+
+    return sns.color_palette("pink")
+
+
+def binned_histplot(binned: dict, **kwargs):
+    """sns.histplot of pre-binned data, i.e. a dict with the arrays "edges" and
+    "counts": every bin is represented by its left edge weighted by its count."""
+    import seaborn as sns
+
+    data = pd.DataFrame({"x": binned["edges"][:-1], "counts": binned["counts"]})
+    return sns.histplot(
+        data=data, x="x", weights="counts", bins=list(binned["edges"]), **kwargs
+    )
 
 
 def histogram_plot(
@@ -25,16 +56,23 @@ def histogram_plot(
     xticks=0.3 + 0.1 * np.arange(0, 4, 1, dtype=int),
     ylim=(0, 1),
     filename: str = None,
+    binned: dict = None,
 ):
+    """Plots the histogram of column 'y' with its cumulative distribution. The data
+    is either the dataframe or, if 'binned' is given, pre-binned data: a dict with
+    the arrays "edges" and "counts" (see generate_figures.binned_data)."""
+    plt, sns = set_style()
     sns.set_style("white")
+    if binned is None:
+        counts, edges = np.histogram(dataframe[y].dropna(), bins=40)
+        binned = {"edges": edges, "counts": counts}
     # Plot histogram
     fig, ax = plt.subplots(nrows=1, ncols=1, figsize=histogram_size)
 
-    sns.histplot(
-        dataframe[y],
+    binned_histplot(
+        binned,
         element="bars",
         color="silver",
-        bins=40,
         cumulative=False,
         stat="count",
         common_norm=False,
@@ -44,8 +82,8 @@ def histogram_plot(
     # Plot cumulative
     sns.set_style("whitegrid")
     ax_cumulative = ax.twinx()
-    sns.histplot(
-        dataframe[y],
+    binned_histplot(
+        binned,
         element="poly",
         color="dimgray",
         cumulative=True,
@@ -78,10 +116,11 @@ def line_plot(
     ylim=(0.5, 0.85),
     filename: str = None,
 ):
+    plt, sns = set_style()
     # Plot line
     fig, ax = plt.subplots(nrows=1, ncols=1, figsize=line_plot_size)
     sns.lineplot(
-        data=dataframe, x=x, y=y, hue=hue, palette=colormap, legend="full",
+        data=dataframe, x=x, y=y, hue=hue, palette=colormap(), legend="full",
     )
     ax.set(
         ylabel=ylabel, xlabel=xlabel, xlim=xlim, ylim=ylim, title=title,
@@ -95,28 +134,32 @@ def line_plot(
 
 
 def cumulative_line_plot(
-    dataframe: pd.DataFrame, filename: str = None,
+    dataframe: pd.DataFrame = None, filename: str = None, binned: dict = None,
 ):
-    df = dataframe.melt()
-    df = df[
-        (df["variable"] == "accuracy") | (df["variable"] == "accuracy_pre_influence")
-    ]
-    df.columns = ["Type", "Accuracy"]
-    df.replace("accuracy_pre_influence", "prior", inplace=True)
-    df.replace("accuracy", "posterior", inplace=True)
+    """Plots the cumulative distributions of the accuracy prior to and after
+    influence, either from the dataframe or from pre-binned data, i.e. a dict that
+    maps "accuracy_pre_influence" and "accuracy" to dicts with the arrays "edges" and
+    "counts" (see generate_figures.binned_data)."""
+    plt, sns = set_style()
+    if binned is None:
+        binned = {
+            column: binned_dataframe_column(dataframe, column, accuracy_bins)
+            for column in ["accuracy_pre_influence", "accuracy"]
+        }
 
     fig, ax = plt.subplots(figsize=histogram_size)
-    sns.histplot(
-        df,
-        x="Accuracy",
-        hue="Type",
-        element="poly",
-        cumulative=True,
-        stat="percent",
-        common_norm=False,
-        palette=palette,
-        ax=ax,
-    )
+    # The colors of the posterior and prior as in a histplot with hue
+    colors = {"accuracy": palette()[0], "accuracy_pre_influence": palette()[1]}
+    for column in ["accuracy_pre_influence", "accuracy"]:
+        binned_histplot(
+            binned[column],
+            element="poly",
+            color=colors[column],
+            cumulative=True,
+            stat="percent",
+            ax=ax,
+        )
+    ax.set(xlabel="Accuracy")
 
     xticks = 0.1 * np.arange(0, 11, 1, dtype=int)
     yticks = 10 * np.arange(0, 11, 1, dtype=int)
@@ -127,8 +170,6 @@ def cumulative_line_plot(
 
     # Show or save
     if filename:
-        plt.savefig(
-            fname="new_figures/figure_cumulative_prior_and_posterior", dpi="figure"
-        )
+        plt.savefig(fname=filename, dpi="figure")
     else:
         plt.show()
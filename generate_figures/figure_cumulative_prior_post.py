@@ -1,14 +1,18 @@
-import pandas as pd
-
+from generate_figures.binned_data import binned_columns, figure_bins
 from generate_figures.figure_basics import cumulative_line_plot
 
 
 def figure_cumulative_prior_post(
-    filename: str = None, data_file: str = "data/clean.csv"
+    filename: str = None, data_file: str = "data/clean.csv", cache_directory: str = None
 ):
-    df = pd.read_csv(data_file)
+    columns = ["accuracy_pre_influence", "accuracy"]
+    binned = binned_columns(
+        data_file=data_file,
+        bins={column: figure_bins[column] for column in columns},
+        cache_directory=cache_directory,
+    )
 
-    cumulative_line_plot(dataframe=df, filename=filename)
+    cumulative_line_plot(binned=binned, filename=filename)
 
 
 if __name__ == "__main__":
@@ -1,11 +1,13 @@
 import numpy as np
-import pandas as pd
 
+from generate_figures.binned_data import binned_columns, figure_bins
 from generate_figures.figure_basics import histogram_plot
 
 
 def figure_distribution_accuracy(
-    filename: str = None, data_file: str = "../data/clean.csv"
+    filename: str = None,
+    data_file: str = "../data/clean.csv",
+    cache_directory: str = None,
 ):
     """Plots the distribution of the majoritarian accuracy and the cumulative line plot.
 
@@ -16,13 +18,19 @@ def figure_distribution_accuracy(
     -------
         Plot of the distribution of the majoritarian accuracy and the cumulative
         line plot."""
-    df = pd.read_csv(data_file)
+    column = "accuracy"
+    binned = binned_columns(
+        data_file=data_file,
+        bins={column: figure_bins[column]},
+        cache_directory=cache_directory,
+    )
 
     # Histogram
     histogram_plot(
         filename=filename,
-        dataframe=df,
-        y="accuracy",
+        dataframe=None,
+        binned=binned[column],
+        y=column,
         title="Distribution of majoritarian accuracy",
         ylabel_left="number of occurrences",
         xlabel="majoritarian accuracy",
@@ -1,11 +1,13 @@
 import numpy as np
-import pandas as pd
 
+from generate_figures.binned_data import binned_columns, figure_bins
 from generate_figures.figure_basics import histogram_plot
 
 
 def figure_distribution_influence(
-    filename: str = None, data_file: str = "../data/clean.csv"
+    filename: str = None,
+    data_file: str = "../data/clean.csv",
+    cache_directory: str = None,
 ):
     """Plots the distribution of the proportional influence of the minority and the
     cumulative lineplot.
@@ -18,13 +20,19 @@ def figure_distribution_influence(
         Plot of the distribution of proportional influence of the minority and the
         cumulative lineplot
     """
-    df = pd.read_csv(data_file)
+    column = "influence_minority_proportion"
+    binned = binned_columns(
+        data_file=data_file,
+        bins={column: figure_bins[column]},
+        cache_directory=cache_directory,
+    )
 
     # Histogram
     histogram_plot(
         filename=filename,
-        dataframe=df,
-        y="influence_minority_proportion",
+        dataframe=None,
+        binned=binned[column],
+        y=column,
         title="Distribution of the proportional\n influence of the minority",
         ylabel_left="number of occurrences",
         xlabel="proportional influence minority",
@@ -1,49 +1,10 @@
 import numpy as np
 import pandas as pd
-from scipy.stats import binom
+from scripts.epistemic_accuracy import epistemic_accuracy
 
 from generate_figures.figure_basics import line_plot
 
 
-def epistemic_accuracy(group_size: int, competence: float):
-    """ Function returns the epistemic accuracy of majority voting in a group of size
-    'group_size' where each agent has competence 'competence'.
-
-    Parameters
-    ----------
-    group_size: int
-        The number of agents
-    competence: float
-        Competence level of agents
-
-    Returns
-    -------
-    probability_right: float
-        The probability that majority voting succeeds in selecting the correct
-        alternative"""
-    # 0. Initialize variables
-    probability_correct: float = 0
-
-    # 1. Calculate epistemic accuracy
-    if (group_size % 2) == 0:
-        # 1.a. Case where group_size is even and there can be ties.
-        probability_more_than_half_correct = binom.sf(
-            group_size / 2, group_size, competence
-        )
-        probability_tie = binom.pmf(group_size / 2, group_size, competence)
-        probability_correct_after_tie = probability_tie / 2
-
-        probability_correct = (
-            probability_more_than_half_correct + probability_correct_after_tie
-        )
-        return probability_correct
-
-    else:
-        # 1.b. Case where group_size is odd and there can be no ties.
-        probability_correct = binom.sf(group_size / 2, group_size, competence)
-        return probability_correct
-
-
 def figure_epistemic_accuracy(scale: int = 3, filename: str = None):
     """ Generates plot of the epistemic accuracy for various group sizes and competence
     levels.
@@ -68,15 +29,16 @@ def figure_epistemic_accuracy(scale: int = 3, filename: str = None):
         )
 
     # 1. Plots
-    columns = ["competence", "group_size", "accuracy"]
-    df = pd.DataFrame(columns=columns)
-    for competence in competence_values:
-        for group_size in group_size_values:
-            accuracy = epistemic_accuracy(group_size=group_size, competence=competence)
-            data_line = pd.DataFrame(
-                data=[[competence, group_size, accuracy]], columns=columns
-            )
-            df = pd.concat([df, data_line], ignore_index=True)
+    competence_grid, group_size_grid = np.meshgrid(
+        competence_values, group_size_values, indexing="ij"
+    )
+    df = pd.DataFrame(
+        {
+            "competence": competence_grid.ravel(),
+            "group_size": group_size_grid.ravel(),
+            "accuracy": epistemic_accuracy(group_size_grid, competence_grid).ravel(),
+        }
+    )
 
     line_plot(
         dataframe=df,
@@ -1,7 +1,8 @@
+import math
 import random as rd
 from itertools import combinations
 
-from statsmodels.stats.proportion import proportion_confint
+import numpy as np
 
 import scripts.config as cfg
 
@@ -21,8 +22,9 @@ convert_to_text_dict: dict = {
 convert_to_math_dict: dict = {value: key for key, value in convert_to_text_dict.items()}
 
 
-def majority_winner(values: list):
-    """Basic function to determine the majority winner in a binary decision context."""
+def majority_winner(values: list, random=rd):
+    """Basic function to determine the majority winner in a binary decision context.
+    Ties are broken by 'random', the random module or a random.Random instance."""
     number_votes_for_elites = len(
         [value for value in values if value == cfg.vote_for_elites]
     )
@@ -33,22 +35,287 @@ def majority_winner(values: list):
     elif number_votes_for_mass > threshold:
         return cfg.vote_for_mass
     else:
-        return rd.choice([cfg.vote_for_mass, cfg.vote_for_elites])
+        return random.choice([cfg.vote_for_mass, cfg.vote_for_elites])
 
 
-def calculate_accuracy_and_precision(list_of_items, alpha: float = 0.05):
+def majority_for_mass(number_for_mass, number_of_voters, tie_breakers):
+    """Vectorized version of majority_winner. Returns whether the mass wins the
+    majority vote, where ties are broken in favour of the mass if the corresponding
+    uniform random number in 'tie_breakers' is smaller than 0.5."""
+    twice_number_for_mass = 2 * np.asarray(number_for_mass)
+    is_tie = twice_number_for_mass == number_of_voters
+    return (twice_number_for_mass > number_of_voters) | (is_tie & (tie_breakers < 0.5))
+
+
+def calculate_accuracy_and_precision(
+    list_of_items, alpha: float = 0.05, method: str = "normal"
+):
     number_of_items = len(list_of_items)
     number_of_success = len(
         [outcome for outcome in list_of_items if outcome == cfg.vote_for_mass]
     )
-    estimated_accuracy = number_of_success / number_of_items
-    confidence_interval = proportion_confint(
-        number_of_success, number_of_items, alpha=alpha
+    return accuracy_and_precision_from_counts(
+        number_of_success, number_of_items, alpha=alpha, method=method
+    )
+
+
+def normal_quantile(probability: float):
+    """Returns the quantile of the standard normal distribution at 'probability',
+    like scipy.special.ndtri, without importing SciPy."""
+    if probability < 0.5:
+        return -normal_quantile(1 - probability)
+    # Bisection, since the distribution function 1 - erfc(z / sqrt(2)) / 2 increases
+    lower, upper = 0.0, 40.0
+    for _ in range(100):
+        middle = (lower + upper) / 2
+        if 1 - math.erfc(middle / math.sqrt(2)) / 2 < probability:
+            lower = middle
+        else:
+            upper = middle
+    return (lower + upper) / 2
+
+
+def proportion_confidence_interval(
+    number_of_success, number_of_items, alpha: float = 0.05, method: str = "normal"
+):
+    """Vectorized two-sided confidence interval for binomial proportions, which agrees
+    with statsmodels.stats.proportion.proportion_confint.
+    :param number_of_success: int or np.ndarray
+        Number of successes
+    :param number_of_items: int or np.ndarray
+        Number of trials
+    :param alpha: float
+        p-value for confidence interval
+    :param method: str
+        "normal" (normal approximation), "wilson" (Wilson score interval) or "beta"
+        (Clopper-Pearson interval)
+    :returns lower, upper: np.ndarray, np.ndarray
+        The bounds of the confidence intervals"""
+    number_of_success = np.asarray(number_of_success, dtype=float)
+    number_of_items = np.asarray(number_of_items, dtype=float)
+    proportion = number_of_success / number_of_items
+    if method == "normal":
+        distance = normal_quantile(1 - alpha / 2) * np.sqrt(
+            proportion * (1 - proportion) / number_of_items
+        )
+        lower = np.clip(proportion - distance, 0, 1)
+        upper = np.clip(proportion + distance, 0, 1)
+    elif method == "wilson":
+        critical_value = normal_quantile(1 - alpha / 2)
+        critical_value_squared = critical_value ** 2
+        denominator = 1 + critical_value_squared / number_of_items
+        center = (proportion + critical_value_squared / (2 * number_of_items)) / (
+            denominator
+        )
+        distance = (
+            critical_value
+            * np.sqrt(
+                proportion * (1 - proportion) / number_of_items
+                + critical_value_squared / (4 * number_of_items ** 2)
+            )
+            / denominator
+        )
+        lower = np.clip(center - distance, 0, 1)
+        upper = np.clip(center + distance, 0, 1)
+    elif method == "beta":
+        # Imported here, since the voting simulations use the other methods
+        from scipy.special import betaincinv
+
+        number_of_failures = number_of_items - number_of_success
+        with np.errstate(invalid="ignore"):
+            lower = betaincinv(number_of_success, number_of_failures + 1, alpha / 2)
+            upper = betaincinv(number_of_success + 1, number_of_failures, 1 - alpha / 2)
+        lower = np.where(proportion == 0, 0.0, lower)
+        upper = np.where(proportion == 1, 1.0, upper)
+    else:
+        raise ValueError(f"Method {method} is not available")
+    return lower[()], upper[()]
+
+
+def accuracy_and_precision_from_counts(
+    number_of_success, number_of_items, alpha: float = 0.05, method: str = "normal"
+):
+    """Returns the estimated accuracy and the width of its confidence interval given
+    the number of successes and the number of items. The counts may be arrays, for
+    example one entry per community."""
+    estimated_accuracy = np.asarray(number_of_success) / number_of_items
+    lower, upper = proportion_confidence_interval(
+        number_of_success, number_of_items, alpha=alpha, method=method
+    )
+    result = {
+        "accuracy": estimated_accuracy[()],
+        "precision": (upper - lower)[()],
+    }
+    return result
+
+
+def majority_success_counts(vote_histograms):
+    """Returns the number of trials where the mass wins the majority vote given
+    histograms of the number of votes for the mass along the last axis. A tie counts
+    as half a success, which is the expected outcome of the tie-break by a fair coin.
+    """
+    vote_histograms = np.asarray(vote_histograms)
+    number_of_nodes = vote_histograms.shape[-1] - 1
+    values = np.arange(number_of_nodes + 1)
+    number_of_success = vote_histograms[..., 2 * values > number_of_nodes].sum(-1) + (
+        vote_histograms[..., 2 * values == number_of_nodes].sum(-1) / 2
+    )
+    return number_of_success
+
+
+def voting_histogram(pair_counts: dict, number_of_nodes: int):
+    """Returns the histogram of a voting simulation given a dict that maps the pairs
+    (number of opinions for the mass, number of votes for the mass) to their number
+    of trials. The histogram is a dict of the marginal counts "opinions" and "votes"
+    of length number_of_nodes + 1, where votes[j] is the number of trials where j
+    nodes vote for the mass, and of the joint counts in sparse form: the distinct
+    pairs "pairs" as an array of shape (number_of_pairs, 2) and their numbers of
+    trials "counts". Its size is O(number_of_nodes) plus the number of distinct
+    pairs, which is at most the number of trials."""
+    sorted_pairs = sorted(pair_counts)
+    pairs = np.array(sorted_pairs, dtype=np.int64).reshape(-1, 2)
+    counts = np.array([pair_counts[pair] for pair in sorted_pairs], dtype=np.int64)
+    histogram = {
+        "opinions": np.zeros(number_of_nodes + 1, dtype=np.int64),
+        "votes": np.zeros(number_of_nodes + 1, dtype=np.int64),
+        "pairs": pairs,
+        "counts": counts,
+    }
+    np.add.at(histogram["opinions"], pairs[:, 0], counts)
+    np.add.at(histogram["votes"], pairs[:, 1], counts)
+    return histogram
+
+
+def accuracy_and_precision_from_histograms(
+    histograms: list, alpha: float = 0.05, method: str = "normal"
+):
+    """Returns the accuracy and precision, after and prior to influence, of many
+    communities at once.
+    :param histograms: list
+        Histograms of communities with the same number of nodes, see
+        voting_histogram
+    :returns result: dict
+        result["accuracy"], result["precision"], result["accuracy_pre_influence"]
+        and result["precision_pre_influence"] are arrays with one entry per
+        community"""
+    vote_histograms = np.stack([histogram["votes"] for histogram in histograms])
+    opinion_histograms = np.stack([histogram["opinions"] for histogram in histograms])
+    number_of_trials = vote_histograms.sum(axis=-1)
+    result_votes = accuracy_and_precision_from_counts(
+        majority_success_counts(vote_histograms),
+        number_of_trials,
+        alpha=alpha,
+        method=method,
+    )
+    result_opinions = accuracy_and_precision_from_counts(
+        majority_success_counts(opinion_histograms),
+        number_of_trials,
+        alpha=alpha,
+        method=method,
+    )
+    result = {
+        "accuracy": result_votes["accuracy"],
+        "precision": result_votes["precision"],
+        "accuracy_pre_influence": result_opinions["accuracy"],
+        "precision_pre_influence": result_opinions["precision"],
+    }
+    return result
+
+
+def exponential_tilt(probabilities, group_sizes, target_mean: float):
+    """Returns the exponentially tilted success probabilities p * e^t / (1 - p +
+    p * e^t) of groups of independent Bernoulli trials, where t <= 0 is chosen such
+    that the expected total number of successes is at most 'target_mean'. Sampling
+    from the tilted probabilities makes totals below the target frequent, which is
+    the proposal of importance sampling for the failure of the majority.
+    :param probabilities: np.ndarray
+        Success probability of each group
+    :param group_sizes: np.ndarray
+        Number of trials of each group
+    :param target_mean: float
+        Expected total number of successes under the tilted probabilities"""
+    probabilities = np.asarray(probabilities, dtype=float)
+    group_sizes = np.asarray(group_sizes)
+
+    def tilted(tilt):
+        odds = probabilities * np.exp(tilt)
+        return odds / (1 - probabilities + odds)
+
+    if group_sizes @ probabilities <= target_mean:
+        return probabilities.copy()
+    # Bisection, since the tilted mean increases with the tilt
+    lower, upper = -50.0, 0.0
+    for _ in range(100):
+        middle = (lower + upper) / 2
+        if group_sizes @ tilted(middle) > target_mean:
+            upper = middle
+        else:
+            lower = middle
+    return tilted((lower + upper) / 2)
+
+
+def histogram_statistics(counts):
+    """Returns the mean, median and (population) standard deviation of the values
+    0, 1, ..., len(counts) - 1 that occur counts[0], counts[1], ... times. These equal
+    np.mean, np.median and np.std of the list of values."""
+    counts = np.asarray(counts)
+    values = np.arange(len(counts))
+    number_of_values = counts.sum()
+    mean = (values @ counts) / number_of_values
+    std = np.sqrt((np.square(values - mean) @ counts) / number_of_values)
+    cumulative_counts = np.cumsum(counts)
+    lower_median = np.searchsorted(
+        cumulative_counts, (number_of_values - 1) // 2, side="right"
+    )
+    upper_median = np.searchsorted(
+        cumulative_counts, number_of_values // 2, side="right"
+    )
+    median = (lower_median + upper_median) / 2
+    return mean, median, std
+
+
+def voting_statistics_from_histogram(
+    histogram: dict, alpha: float = 0.05, method: str = "normal"
+):
+    """Returns the statistics of a voting simulation from the marginal counts of its
+    histogram.
+    :param histogram: dict
+        The histogram of the voting simulation, see voting_histogram
+    :param alpha: float
+        p-value for confidence interval
+    :param method: str
+        Method of the confidence interval, see proportion_confidence_interval
+    :returns result: dict
+        The result of Community.voting_simulation. The accuracy counts a tie as half a
+        success, which is the expected outcome of the tie-break by a fair coin."""
+    number_of_trials = histogram["votes"].sum()
+    result_votes = accuracy_and_precision_from_counts(
+        majority_success_counts(histogram["votes"]),
+        number_of_trials,
+        alpha=alpha,
+        method=method,
+    )
+    result_opinions = accuracy_and_precision_from_counts(
+        majority_success_counts(histogram["opinions"]),
+        number_of_trials,
+        alpha=alpha,
+        method=method,
     )
     result = {
-        "accuracy": estimated_accuracy,
-        "precision": max(confidence_interval) - min(confidence_interval),
+        "accuracy": result_votes["accuracy"],
+        "precision": result_votes["precision"],
+        "accuracy_pre_influence": result_opinions["accuracy"],
+        "precision_pre_influence": result_opinions["precision"],
+    }
+    marginals = {
+        "": histogram["votes"],
+        "_pre_influence": histogram["opinions"],
     }
+    for suffix, counts in marginals.items():
+        mean, median, std = histogram_statistics(counts)
+        result[f"mean{suffix}"] = mean
+        result[f"median{suffix}"] = median
+        result[f"std{suffix}"] = std
     return result
 
 
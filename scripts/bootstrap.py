@@ -0,0 +1,231 @@
+import concurrent.futures as cf
+
+import numpy as np
+import pandas as pd
+
+# Cross-products of the design columns and the row indices of the subsets of the
+# data, shared with the worker processes.
+_cross_products: np.ndarray = None
+_subsets: list = None
+
+
+def _initialize_worker(cross_products: np.ndarray, subsets: list = None):
+    global _cross_products, _subsets
+    _cross_products = cross_products
+    _subsets = subsets
+
+
+def cross_products(dataframe: pd.DataFrame, variables: list):
+    """Returns the pairwise products of the columns [1, *variables] as an array of
+    shape (number_of_rows, k * (k + 1) / 2) together with the index pairs. A weighted
+    sum of these columns gives the upper triangle of the weighted moment matrix."""
+    data = dataframe[variables].to_numpy(dtype=float)
+    data = np.hstack((np.ones((len(data), 1)), data))
+    pairs = np.triu_indices(data.shape[1])
+    products = data[:, pairs[0]] * data[:, pairs[1]]
+    return products, pairs
+
+
+def moments_to_statistics(moments: np.ndarray):
+    """Converts a batch of weighted moment matrices of [1, X, y] into standardized
+    coefficients and R squared.
+    :param moments: np.ndarray
+        Array of shape (batch, k, k) where the last column belongs to the dependent
+        variable and the first column to the constant
+    :returns std_coefficients, r_squared: np.ndarray, np.ndarray
+        Arrays of shape (batch, k - 2) and (batch,)"""
+    total_weight = moments[:, 0, 0]
+    means = moments[:, 0, :] / total_weight[:, None]
+    covariance = moments / total_weight[:, None, None] - (
+        means[:, :, None] * means[:, None, :]
+    )
+    covariance_x = covariance[:, 1:-1, 1:-1]
+    covariance_xy = covariance[:, 1:-1, -1]
+    variance_y = covariance[:, -1, -1]
+    coefficients = np.linalg.solve(covariance_x, covariance_xy[:, :, None])[:, :, 0]
+    std_x = np.sqrt(np.diagonal(covariance_x, axis1=1, axis2=2))
+    std_coefficients = coefficients * std_x / np.sqrt(variance_y)[:, None]
+    r_squared = np.einsum("bi,bi->b", coefficients, covariance_xy) / variance_y
+    return std_coefficients, r_squared
+
+
+def _bootstrap_batch(batch_size: int, seed: np.random.SeedSequence, subset: int):
+    rng = np.random.default_rng(seed)
+    products = _cross_products
+    if _subsets is not None:
+        products = _cross_products[_subsets[subset]]
+    number_of_rows = len(products)
+    # Multinomial weights: the number of times each row is drawn in a resample
+    draws = rng.integers(0, number_of_rows, size=(batch_size, number_of_rows))
+    draws += number_of_rows * np.arange(batch_size)[:, None]
+    weights = np.bincount(draws.ravel(), minlength=batch_size * number_of_rows)
+    weights = weights.reshape(batch_size, number_of_rows).astype(float)
+    upper_triangles = weights @ products
+    return upper_triangles
+
+
+def bootstrap_moments(
+    dataframe: pd.DataFrame,
+    variables: list,
+    number_of_resamples: int = 10 ** 4,
+    seed: int = 0,
+    batch_size: int = 100,
+    max_workers: int = None,
+    subsets: list = None,
+):
+    """Bootstraps the moment matrix of the columns [1, *variables], separately for
+    each subset of the rows of 'dataframe'.
+
+    Each resample is represented by multinomial weights on the rows. A batch of
+    weights is multiplied with the precomputed cross-products of the data in a single
+    matrix product, which yields the weighted moment matrices of all resamples in the
+    batch. The cross-products are computed and sent to the worker processes once for
+    all subsets, so a table bootstraps all its regressions with one pool. Each subset
+    resamples with the child seeds of 'seed', so the result does not depend on
+    'max_workers' or on the other subsets.
+
+    Parameters
+    ----------
+    dataframe: pd.DataFrame
+        The data
+    variables: list
+        Column names of all variables of the regressions
+    number_of_resamples: int
+        Number of bootstrap resamples
+    seed: int
+        Seed of the resampling
+    batch_size: int
+        Number of resamples per batch
+    max_workers: int
+        Number of worker processes; runs in the current process if it equals 1
+    subsets: list
+        Boolean masks or positions of the rows of each subset; all rows if None
+
+    Returns
+    -------
+    moments: list
+        One array of shape (number_of_resamples, len(variables) + 1,
+        len(variables) + 1) per subset"""
+    products, pairs = cross_products(dataframe, variables)
+    indices = None
+    if subsets is not None:
+        indices = [np.arange(len(dataframe))[np.asarray(rows)] for rows in subsets]
+    batch_sizes = [batch_size] * (number_of_resamples // batch_size)
+    if number_of_resamples % batch_size:
+        batch_sizes.append(number_of_resamples % batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(batch_sizes))
+    number_of_subsets = 1 if subsets is None else len(subsets)
+    tasks = [
+        (batch_sizes[i], seeds[i], subset)
+        for subset in range(number_of_subsets)
+        for i in range(len(batch_sizes))
+    ]
+
+    if max_workers == 1:
+        _initialize_worker(products, indices)
+        batches = [_bootstrap_batch(*task) for task in tasks]
+    else:
+        with cf.ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_initialize_worker,
+            initargs=(products, indices),
+        ) as executor:
+            batches = list(executor.map(_bootstrap_batch, *zip(*tasks)))
+
+    k = len(variables) + 1
+    moments = []
+    for subset in range(number_of_subsets):
+        upper_triangles = np.vstack(
+            batches[subset * len(batch_sizes) : (subset + 1) * len(batch_sizes)]
+        )
+        subset_moments = np.zeros((number_of_resamples, k, k))
+        subset_moments[:, pairs[0], pairs[1]] = upper_triangles
+        subset_moments[:, pairs[1], pairs[0]] = upper_triangles
+        moments.append(subset_moments)
+    return moments
+
+
+def regression_statistics(
+    moments: np.ndarray,
+    variables: list,
+    dependent_variable: str,
+    independent_variables: list,
+):
+    """Returns the standardized coefficients and R squared of the linear regression
+    of 'dependent_variable' on 'independent_variables' (with constant) from moment
+    matrices of the columns [1, *variables] (see bootstrap_moments).
+
+    Returns
+    -------
+    result: dict
+        result["std_coefficients"]: array of shape (len(moments),
+        len(independent_variables)),
+        result["r_squared"]: array of shape (len(moments),)"""
+    columns = [0] + [
+        1 + variables.index(variable)
+        for variable in independent_variables + [dependent_variable]
+    ]
+    moments = moments[:, columns][:, :, columns]
+    std_coefficients, r_squared = moments_to_statistics(moments)
+    result = {"std_coefficients": std_coefficients, "r_squared": r_squared}
+    return result
+
+
+def bootstrap_regression(
+    dataframe: pd.DataFrame,
+    dependent_variable: str,
+    independent_variables: list,
+    number_of_resamples: int = 10 ** 4,
+    seed: int = 0,
+    batch_size: int = 100,
+    max_workers: int = None,
+):
+    """Bootstraps the standardized coefficients and R squared of the linear
+    regression of 'dependent_variable' on 'independent_variables' (with constant).
+    No regression is refitted; see bootstrap_moments. To bootstrap several
+    regressions of a table, call bootstrap_moments once with all their variables and
+    subsets and regression_statistics for each regression.
+
+    Parameters
+    ----------
+    dataframe: pd.DataFrame
+        The data
+    dependent_variable: str
+        Column name of the dependent variable
+    independent_variables: list
+        Column names of the independent variables
+    number_of_resamples: int
+        Number of bootstrap resamples
+    seed: int
+        Seed of the resampling
+    batch_size: int
+        Number of resamples per batch
+    max_workers: int
+        Number of worker processes; runs in the current process if it equals 1
+
+    Returns
+    -------
+    result: dict
+        result["std_coefficients"]: array of shape (number_of_resamples,
+        len(independent_variables)),
+        result["r_squared"]: array of shape (number_of_resamples,)"""
+    variables = independent_variables + [dependent_variable]
+    (moments,) = bootstrap_moments(
+        dataframe,
+        variables,
+        number_of_resamples=number_of_resamples,
+        seed=seed,
+        batch_size=batch_size,
+        max_workers=max_workers,
+    )
+    return regression_statistics(
+        moments, variables, dependent_variable, independent_variables
+    )
+
+
+def percentile_interval(samples: np.ndarray, alpha: float = 0.05):
+    """Returns the lower and upper percentile bootstrap confidence bounds along the
+    first axis of 'samples'."""
+    lower = np.quantile(samples, alpha / 2, axis=0)
+    upper = np.quantile(samples, 1 - alpha / 2, axis=0)
+    return lower, upper
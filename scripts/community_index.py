@@ -0,0 +1,160 @@
+import concurrent.futures as cf
+import os
+import sqlite3
+
+from scripts.community_store import CommunityStore
+from scripts.network_metrics import compute_network_metrics, network_metrics
+
+""" Community index
+
+An SQLite table in the file index.sqlite of a community store (see
+scripts.community_store) with one row per community, which holds its parameters
+under the column names of the data file of Simulation and its network metrics. Slices
+of the store are selected by parameter ranges without loading any graph; the graphs
+of the selected communities are then loaded one at a time. """
+
+# Column names of the index and the corresponding fields of the store
+index_parameters: dict = {
+    "file_number": "file_number",
+    "file_index": "file_index",
+    "number_of_nodes": "number_of_nodes",
+    "degree": "degree",
+    "minority_competence": "elite_competence",
+    "majority_competence": "mass_competence",
+    "number_of_minority": "number_of_elites",
+    "probability_preferential_attachment": "probability_preferential_attachment",
+    "homophily": "probability_homophilic_attachment",
+}
+
+
+def index_filename(store_directory: str):
+    return f"{store_directory}/index.sqlite"
+
+
+def build_community_index(store_directory: str, metrics: list = None):
+    """Builds the index of a community store, replacing an existing index.
+    :param store_directory: str
+        Directory of the store
+    :param metrics: list
+        Names of the network metrics of the index (see scripts.network_metrics); all
+        metrics if not given"""
+    if metrics is None:
+        metrics = list(network_metrics)
+    store = CommunityStore(store_directory)
+    columns = list(index_parameters) + metrics
+    filename = index_filename(store_directory)
+    if os.path.exists(filename):
+        os.remove(filename)
+    with sqlite3.connect(filename) as connection:
+        column_definitions = ", ".join(f"{column} REAL" for column in columns)
+        connection.execute(
+            f"CREATE TABLE communities "
+            f"(community_id INTEGER PRIMARY KEY, {column_definitions})"
+        )
+        rows = []
+        for community_id in range(len(store)):
+            parameters = store.parameters[community_id]
+            row = [community_id] + [
+                parameters[field].item() for field in index_parameters.values()
+            ]
+            # A community without homophilic attachment has homophily NULL
+            row = [None if value != value else value for value in row]
+            values = compute_network_metrics(
+                edges=store.edges(community_id),
+                number_of_nodes=int(parameters["number_of_nodes"]),
+                number_of_elites=int(parameters["number_of_elites"]),
+                metrics=metrics,
+            )
+            rows.append(row + [float(values[name]) for name in metrics])
+        placeholders = ", ".join("?" for _ in range(len(columns) + 1))
+        connection.executemany(f"INSERT INTO communities VALUES ({placeholders})", rows)
+        for column in columns:
+            connection.execute(f"CREATE INDEX index_{column} ON communities ({column})")
+    connection.close()
+    return filename
+
+
+def index_columns(connection):
+    return [row[1] for row in connection.execute("PRAGMA table_info(communities)")]
+
+
+def select_communities(store_directory: str, **ranges):
+    """Returns the ids of the communities of a store whose parameters and network
+    metrics lie in the given ranges, e.g.
+        select_communities(store, number_of_minority=(40, 45), homophily=(0.7, None))
+    Every range (low, high) includes its bounds, and None leaves it open on that
+    side. The ids are the indices of the communities in the store."""
+    with sqlite3.connect(index_filename(store_directory)) as connection:
+        columns = index_columns(connection)
+        conditions = []
+        values = []
+        for column, (low, high) in ranges.items():
+            if column not in columns:
+                raise ValueError(f"Column {column} is not in the index")
+            if low is not None:
+                conditions.append(f"{column} >= ?")
+                values.append(low)
+            if high is not None:
+                conditions.append(f"{column} <= ?")
+                values.append(high)
+        query = "SELECT community_id FROM communities"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY community_id"
+        community_ids = [row[0] for row in connection.execute(query, values)]
+    connection.close()
+    return community_ids
+
+
+def load_communities(store_directory: str, community_ids: list):
+    """Yields the communities with the given ids, loading one graph at a time."""
+    store = CommunityStore(store_directory)
+    for community_id in community_ids:
+        yield store.community(community_id)
+
+
+def _simulate_and_write_store_line(simulation, community, store_id: int):
+    # The store ids are not the community numbers of the simulation that created
+    # the communities, so the row is written under a separate column
+    row = simulation.simulate_data_row(community, store_id)
+    del row["community_number"]
+    data_line = ",".join(f"{value}" for value in [store_id, *row.values()])
+    with open(simulation.filename_csv, "a") as f:
+        f.write(f"\n{data_line}")
+
+
+def resimulate_communities(
+    simulation, store_directory: str, community_ids: list, max_workers: int = None
+):
+    """Runs the voting simulations of 'simulation' (with its number of voting
+    simulations) on stored communities and writes one row per community to the data
+    file of the simulation. The column store_id, which replaces community_number,
+    holds the id of the community in the store."""
+    simulation.initialize_dirs()
+    simulation.write_readme()
+    columns = ["store_id"] + [
+        column for column in simulation.columns() if column != "community_number"
+    ]
+    with open(simulation.filename_csv, "w") as f:
+        f.write(",".join(columns))
+    # Bounds the number of loaded communities that wait for a worker
+    max_pending = 2 * (max_workers or os.cpu_count())
+    with cf.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pending = set()
+        for community_id, community in zip(
+            community_ids, load_communities(store_directory, community_ids)
+        ):
+            if len(pending) >= max_pending:
+                done, pending = cf.wait(pending, return_when=cf.FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            pending.add(
+                executor.submit(
+                    _simulate_and_write_store_line,
+                    simulation=simulation,
+                    community=community,
+                    store_id=community_id,
+                )
+            )
+        for future in pending:
+            future.result()
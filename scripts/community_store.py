@@ -0,0 +1,299 @@
+import argparse
+import concurrent.futures as cf
+import json
+import os
+import pickle
+import time
+
+import numpy as np
+
+from community import Community
+from scripts.save_read_community import community_unpack
+
+""" Community store
+
+A compact binary store of many communities in a directory:
+    parameters.npy: structured array with one row per community (see
+        parameter_dtype), where a missing homophily is NaN,
+    edge_offsets.npy: array of length number_of_communities + 1 such that the edges
+        of community i are the rows edge_offsets[i]:edge_offsets[i + 1] of edges,
+    edges.bin: raw array of shape (number_of_edges, 2) of (source, target),
+    metadata.json: the number of edges, the data type of edges.bin and the legacy
+        files of the communities.
+All arrays can be memory-mapped, so that single communities are read without loading
+the store. The store is written by migrate_legacy_files from the communities.pickle
+files of combine_community_files. """
+
+parameter_dtype = np.dtype(
+    [
+        ("file_number", np.int32),
+        ("file_index", np.int64),
+        ("number_of_nodes", np.int32),
+        ("number_of_elites", np.int32),
+        ("degree", np.int32),
+        ("elite_competence", np.float64),
+        ("mass_competence", np.float64),
+        ("probability_preferential_attachment", np.float64),
+        ("probability_homophilic_attachment", np.float64),
+    ]
+)
+
+# Keys of the compressed community dict of community_compress
+legacy_parameter_keys: dict = {
+    "number_of_nodes": "N",
+    "number_of_elites": "E",
+    "degree": "d",
+    "elite_competence": "pe",
+    "mass_competence": "pm",
+    "probability_preferential_attachment": "pp",
+    "probability_homophilic_attachment": "h",
+}
+
+
+def decode_edges(community_compressed: dict, edge_dtype=np.int32):
+    """Returns the edges of a compressed community (see community_compress) as an
+    array of shape (number_of_edges, 2), in the order of community_unpack."""
+    sources = sorted(key for key in community_compressed if isinstance(key, int))
+    if not sources:
+        return np.zeros((0, 2), dtype=edge_dtype)
+    target_strings = [community_compressed[source] for source in sources]
+    counts = [targets.count(",") + 1 for targets in target_strings]
+    edges = np.empty((sum(counts), 2), dtype=np.int64)
+    edges[:, 0] = np.repeat(sources, counts)
+    edges[:, 1] = np.array(",".join(target_strings).split(","), dtype=np.int64)
+    return edges.astype(edge_dtype)
+
+
+def decode_communities(
+    communities_compressed: list, file_number: int, start: int, edge_dtype=np.int32
+):
+    """Decodes a chunk of compressed communities without constructing Community
+    objects. Returns the parameter table, the number of edges of every community and
+    the concatenated edges."""
+    number_of_nodes = max(
+        (community["N"] for community in communities_compressed), default=0
+    )
+    if number_of_nodes - 1 > np.iinfo(edge_dtype).max:
+        raise ValueError(
+            f"Nodes of communities with {number_of_nodes} nodes do not fit into "
+            f"{np.dtype(edge_dtype).name}"
+        )
+    parameters = np.zeros(len(communities_compressed), dtype=parameter_dtype)
+    parameters["file_number"] = file_number
+    parameters["file_index"] = np.arange(start, start + len(communities_compressed))
+    for name, key in legacy_parameter_keys.items():
+        values = [community[key] for community in communities_compressed]
+        if name == "probability_homophilic_attachment":
+            values = [np.nan if value is None else value for value in values]
+        parameters[name] = values
+    edges = [
+        decode_edges(community, edge_dtype) for community in communities_compressed
+    ]
+    numbers_of_edges = np.array([len(edges_of_one) for edges_of_one in edges])
+    edges = np.concatenate(edges) if edges else np.zeros((0, 2), dtype=edge_dtype)
+    return parameters, numbers_of_edges, edges
+
+
+class CommunityStore:
+    """Read access to a community store, see the module docstring."""
+
+    def __init__(self, directory: str):
+        self.directory: str = directory
+        with open(f"{directory}/metadata.json", "r") as f:
+            self.metadata: dict = json.load(f)
+        self.parameters = np.load(f"{directory}/parameters.npy", mmap_mode="r")
+        self.edge_offsets = np.load(f"{directory}/edge_offsets.npy", mmap_mode="r")
+        edge_dtype = np.dtype(self.metadata["edge_dtype"])
+        if self.metadata["number_of_edges"] > 0:
+            self.all_edges = np.memmap(
+                f"{directory}/edges.bin",
+                dtype=edge_dtype,
+                mode="r",
+                shape=(self.metadata["number_of_edges"], 2),
+            )
+        else:
+            self.all_edges = np.zeros((0, 2), dtype=edge_dtype)
+
+    def __len__(self):
+        return len(self.parameters)
+
+    def edges(self, index: int):
+        """Returns the edges of community 'index' as an array of shape
+        (number_of_edges, 2)."""
+        return self.all_edges[self.edge_offsets[index] : self.edge_offsets[index + 1]]
+
+    def community_parameters(self, index: int):
+        row = self.parameters[index]
+        parameters = {
+            name: row[name].item()
+            for name in legacy_parameter_keys
+            if name != "probability_homophilic_attachment"
+        }
+        homophily = row["probability_homophilic_attachment"].item()
+        parameters["probability_homophilic_attachment"] = (
+            None if np.isnan(homophily) else homophily
+        )
+        return parameters
+
+    def community(self, index: int):
+        """Returns community 'index' as a Community."""
+        return Community(
+            **self.community_parameters(index),
+            edges=[tuple(edge) for edge in self.edges(index).tolist()],
+        )
+
+
+def communities_equal(community_1: Community, community_2: Community):
+    parameters_equal = all(
+        getattr(community_1, name) == getattr(community_2, name)
+        for name in legacy_parameter_keys
+    )
+    edges_equal = list(community_1.network.edges()) == list(
+        community_2.network.edges()
+    )
+    return parameters_equal and edges_equal
+
+
+def migrate_legacy_files(
+    filenames: list,
+    store_directory: str,
+    max_workers: int = None,
+    chunk_size: int = 1000,
+    number_of_verifications: int = 100,
+    seed: int = 0,
+    edge_dtype=np.uint16,
+):
+    """Converts legacy communities.pickle files (see combine_community_files) into a
+    community store. The edge strings are decoded in chunks by parallel workers, and
+    the edges are appended to the store as the chunks are decoded. Each legacy file
+    holds one pickled list and is therefore loaded at once, but only one file is in
+    memory at a time.
+    :param filenames: list
+        The legacy files
+    :param store_directory: str
+        Directory of the store, which must not exist yet
+    :param max_workers: int
+        Number of processes that decode the chunks
+    :param chunk_size: int
+        Number of communities per chunk
+    :param number_of_verifications: int
+        Number of randomly chosen communities per file whose round trip through the
+        store is compared with community_unpack
+    :param seed: int
+        Seed of the choice of the verified communities
+    :param edge_dtype:
+        Integer type of the stored nodes; np.uint16 holds communities of up to 65536
+        nodes in half the space of np.int32
+    :returns report: dict
+        The number of communities, edges and verified communities, the elapsed
+        seconds and the throughput in communities and megabytes of legacy files per
+        second"""
+    start_time = time.perf_counter()
+    os.makedirs(store_directory)
+    rng = np.random.default_rng(seed)
+    parameters = []
+    numbers_of_edges = []
+    number_of_bytes = 0
+    verifications = []
+    with open(f"{store_directory}/edges.bin", "wb") as edges_file:
+        with cf.ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for file_number, filename in enumerate(filenames):
+                number_of_bytes += os.path.getsize(filename)
+                with open(filename, "rb") as f:
+                    communities_compressed = pickle.load(f)
+                starts = range(0, len(communities_compressed), chunk_size)
+                futures = [
+                    executor.submit(
+                        decode_communities,
+                        communities_compressed[start : start + chunk_size],
+                        file_number,
+                        start,
+                        edge_dtype,
+                    )
+                    for start in starts
+                ]
+                for future in futures:
+                    chunk_parameters, chunk_numbers_of_edges, edges = future.result()
+                    parameters.append(chunk_parameters)
+                    numbers_of_edges.append(chunk_numbers_of_edges)
+                    edges_file.write(edges.tobytes())
+                sample = rng.choice(
+                    len(communities_compressed),
+                    min(number_of_verifications, len(communities_compressed)),
+                    replace=False,
+                )
+                verifications += [
+                    (file_number, index, communities_compressed[index])
+                    for index in sample
+                ]
+                del communities_compressed
+
+    parameters = np.concatenate(parameters)
+    numbers_of_edges = np.concatenate(numbers_of_edges)
+    edge_offsets = np.zeros(len(parameters) + 1, dtype=np.int64)
+    np.cumsum(numbers_of_edges, out=edge_offsets[1:])
+    np.save(f"{store_directory}/parameters.npy", parameters)
+    np.save(f"{store_directory}/edge_offsets.npy", edge_offsets)
+    with open(f"{store_directory}/metadata.json", "w") as f:
+        json.dump(
+            {
+                "number_of_edges": int(edge_offsets[-1]),
+                "edge_dtype": np.dtype(edge_dtype).name,
+                "legacy_files": filenames,
+            },
+            f,
+            indent=2,
+        )
+    elapsed_time = time.perf_counter() - start_time
+
+    # Round trip of a sample
+    store = CommunityStore(store_directory)
+    rows = {
+        (file_number, file_index): row
+        for row, (file_number, file_index) in enumerate(
+            zip(store.parameters["file_number"], store.parameters["file_index"])
+        )
+    }
+    for file_number, file_index, community_compressed in verifications:
+        community = store.community(rows[file_number, file_index])
+        if not communities_equal(community, community_unpack(community_compressed)):
+            raise RuntimeError(
+                f"Community {file_index} of {filenames[file_number]} differs in the "
+                f"store"
+            )
+
+    report = {
+        "number_of_communities": len(parameters),
+        "number_of_edges": int(edge_offsets[-1]),
+        "number_of_verified_communities": len(verifications),
+        "seconds": elapsed_time,
+        "communities_per_second": len(parameters) / elapsed_time,
+        "megabytes_per_second": number_of_bytes / 10 ** 6 / elapsed_time,
+    }
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Convert legacy communities.pickle files into a community store."
+    )
+    parser.add_argument("store_directory")
+    parser.add_argument("legacy_files", nargs="+")
+    parser.add_argument("--max-workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--verifications", type=int, default=100)
+    arguments = parser.parse_args()
+    report = migrate_legacy_files(
+        filenames=arguments.legacy_files,
+        store_directory=arguments.store_directory,
+        max_workers=arguments.max_workers,
+        chunk_size=arguments.chunk_size,
+        number_of_verifications=arguments.verifications,
+    )
+    print(
+        f"Converted {report['number_of_communities']} communities with "
+        f"{report['number_of_edges']} edges in {report['seconds']:.1f} s "
+        f"({report['communities_per_second']:.0f} communities/s, "
+        f"{report['megabytes_per_second']:.1f} MB/s); "
+        f"verified {report['number_of_verified_communities']} round trips"
+    )
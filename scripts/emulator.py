@@ -0,0 +1,279 @@
+import concurrent.futures as cf
+import copy
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+
+from scripts.save_read_community import combine_community_files, save_community_to_file
+
+""" Emulator
+
+A Gaussian process trained on the rows of a data file predicts the accuracy of a
+community from its parameters with uncertainty. The active learning loop generates
+candidate communities, which is cheap, and runs the expensive voting simulations only
+for those where the emulator is most uncertain. """
+
+emulator_variables: list = [
+    "minority_competence",
+    "majority_competence",
+    "number_of_minority",
+    "homophily",
+    "influence_minority_proportion",
+]
+
+
+def squared_distances(x, y, length_scales):
+    x = x / length_scales
+    y = y / length_scales
+    distances = (
+        np.sum(x ** 2, axis=1)[:, None] + np.sum(y ** 2, axis=1)[None, :] - 2 * x @ y.T
+    )
+    return np.maximum(distances, 0)
+
+
+class GaussianProcessEmulator:
+    """Gaussian process regression with a squared exponential kernel with one length
+    scale per variable. The noise variance of every row is the fitted noise plus the
+    Monte Carlo variance of its accuracy, which is derived from the width of its
+    confidence interval if 'precision_variable' is given. The hyperparameters maximize
+    the marginal likelihood on a random subset of at most 'max_optimization_points'
+    rows; the model is conditioned on at most 'max_training_points' rows."""
+
+    def __init__(
+        self,
+        variables: list = None,
+        dependent_variable: str = "accuracy",
+        precision_variable: str = "accuracy_precision",
+        max_training_points: int = 2000,
+        max_optimization_points: int = 500,
+        seed: int = 0,
+    ):
+        self.variables: list = emulator_variables if variables is None else variables
+        self.dependent_variable: str = dependent_variable
+        self.precision_variable: str = precision_variable
+        self.max_training_points: int = max_training_points
+        self.max_optimization_points: int = max_optimization_points
+        self.rng = np.random.default_rng(seed)
+
+    def scale_inputs(self, df: pd.DataFrame):
+        return (df[self.variables].to_numpy(dtype=float) - self.input_mean) / (
+            self.input_std
+        )
+
+    def noise_variances(self, df: pd.DataFrame):
+        """Monte Carlo variances of the standardized outputs, assuming that the
+        precision is the width of a 95% confidence interval."""
+        if self.precision_variable is None or self.precision_variable not in df:
+            return np.zeros(len(df))
+        precision = df[self.precision_variable].to_numpy(dtype=float)
+        return np.square(precision / (2 * 1.96) / self.output_std)
+
+    def kernel(self, x, y, log_parameters):
+        length_scales = np.exp(log_parameters[: len(self.variables)])
+        signal_variance = np.exp(log_parameters[-2])
+        return signal_variance * np.exp(-0.5 * squared_distances(x, y, length_scales))
+
+    def negative_log_likelihood(self, log_parameters, x, y, noise_variances):
+        covariance = self.kernel(x, x, log_parameters)
+        covariance[np.diag_indices_from(covariance)] += (
+            np.exp(log_parameters[-1]) + noise_variances + 1e-8
+        )
+        try:
+            cholesky = np.linalg.cholesky(covariance)
+        except np.linalg.LinAlgError:
+            return np.inf
+        alpha = np.linalg.solve(cholesky.T, np.linalg.solve(cholesky, y))
+        return 0.5 * y @ alpha + np.sum(np.log(np.diag(cholesky)))
+
+    def fit(self, df: pd.DataFrame):
+        """Fits the hyperparameters and conditions the model on the rows of 'df'."""
+        df = df.dropna(subset=self.variables + [self.dependent_variable])
+        self.input_mean = df[self.variables].to_numpy(dtype=float).mean(axis=0)
+        self.input_std = df[self.variables].to_numpy(dtype=float).std(axis=0)
+        self.input_std[self.input_std == 0] = 1
+        outputs = df[self.dependent_variable].to_numpy(dtype=float)
+        self.output_mean = outputs.mean()
+        self.output_std = outputs.std() if outputs.std() > 0 else 1.0
+
+        x = self.scale_inputs(df)
+        y = (outputs - self.output_mean) / self.output_std
+        noise_variances = self.noise_variances(df)
+
+        subset = self.subset(len(df), self.max_optimization_points)
+        initial_parameters = np.log(
+            np.concatenate([np.ones(len(self.variables)), [1.0, 0.1]])
+        )
+        optimization = minimize(
+            self.negative_log_likelihood,
+            initial_parameters,
+            args=(x[subset], y[subset], noise_variances[subset]),
+            method="L-BFGS-B",
+            bounds=[(-4.0, 4.0)] * len(self.variables) + [(-6.0, 3.0), (-12.0, 1.0)],
+        )
+        self.log_parameters = optimization.x
+
+        subset = self.subset(len(df), self.max_training_points)
+        self.training_inputs = x[subset]
+        covariance = self.kernel(
+            self.training_inputs, self.training_inputs, self.log_parameters
+        )
+        covariance[np.diag_indices_from(covariance)] += (
+            np.exp(self.log_parameters[-1]) + noise_variances[subset] + 1e-8
+        )
+        self.cholesky = np.linalg.cholesky(covariance)
+        self.weights = np.linalg.solve(
+            self.cholesky.T, np.linalg.solve(self.cholesky, y[subset])
+        )
+        return self
+
+    def subset(self, number_of_rows: int, max_size: int):
+        if number_of_rows <= max_size:
+            return np.arange(number_of_rows)
+        return np.sort(self.rng.choice(number_of_rows, max_size, replace=False))
+
+    def cross_covariance(self, df: pd.DataFrame):
+        """Returns the standardized inputs of 'df' and their posterior factor
+        L^-1 k(X, x), where X are the training inputs."""
+        x = self.scale_inputs(df)
+        covariance = self.kernel(self.training_inputs, x, self.log_parameters)
+        return x, covariance, np.linalg.solve(self.cholesky, covariance)
+
+    def predict(self, df: pd.DataFrame):
+        """Returns the predicted mean and standard deviation of the dependent
+        variable (without the Monte Carlo noise) for every row of 'df'."""
+        _, covariance, factor = self.cross_covariance(df)
+        mean = covariance.T @ self.weights
+        variance = np.exp(self.log_parameters[-2]) - np.sum(factor ** 2, axis=0)
+        std = np.sqrt(np.maximum(variance, 0))
+        return mean * self.output_std + self.output_mean, std * self.output_std
+
+    def select_batch(self, candidates: pd.DataFrame, batch_size: int):
+        """Returns the indices of 'batch_size' rows of 'candidates' chosen greedily by
+        the largest posterior variance, where each choice conditions the variances of
+        the remaining candidates as if it had been simulated. Unlike the candidates
+        with the largest variances, the batch therefore does not cluster."""
+        x, _, factor = self.cross_covariance(candidates)
+        covariance = self.kernel(x, x, self.log_parameters) - factor.T @ factor
+        chosen = []
+        for _ in range(min(batch_size, len(candidates))):
+            variances = np.diag(covariance).copy()
+            variances[chosen] = -np.inf
+            index = int(np.argmax(variances))
+            chosen.append(index)
+            if variances[index] <= 0:
+                continue
+            covariance = covariance - np.outer(
+                covariance[:, index], covariance[index, :]
+            ) / (variances[index])
+        return chosen
+
+
+def community_features(community, number: int = None):
+    """Returns the emulator variables of a community, which are available before
+    the voting simulations."""
+    total_influence_minority = community.total_influence_elites()
+    total_influence = len(community.network.edges())
+    features = {
+        "community_number": number,
+        "minority_competence": community.elite_competence,
+        "majority_competence": community.mass_competence,
+        "number_of_minority": community.number_of_elites,
+        "influence_minority_proportion": total_influence_minority / total_influence,
+        "homophily": community.probability_homophilic_attachment,
+    }
+    return features
+
+
+def active_learning(
+    simulation,
+    data: pd.DataFrame,
+    number_of_rounds: int,
+    batch_size: int,
+    number_of_candidates: int = 500,
+    emulator: GaussianProcessEmulator = None,
+    max_workers: int = None,
+):
+    """Extends the data by simulations of the communities where the emulator is most
+    uncertain. Every round fits the emulator, generates 'number_of_candidates'
+    communities with simulation.generate_community, and runs the voting simulations
+    of 'batch_size' of them, which are written to the data file of the simulation as
+    in Simulation.run. The design of the simulation spans the candidates of all
+    rounds.
+    :param simulation: Simulation
+        Determines the parameter ranges, the design and the output files, which must
+        not exist yet, so that the run that produced 'data' is not overwritten
+    :param data: pd.DataFrame
+        Rows of previous simulations with the emulator variables and the accuracy,
+        with the column names of the data file of Simulation
+    :param number_of_rounds: int
+        Number of rounds of fitting and simulating
+    :param batch_size: int
+        Number of communities simulated per round
+    :param number_of_candidates: int
+        Number of communities generated per round
+    :param emulator: GaussianProcessEmulator
+        Emulator with the default settings if not given
+    :param max_workers: int
+        Number of processes for the voting simulations
+    :returns data, emulator: pd.DataFrame, GaussianProcessEmulator
+        The data including the new rows, and the emulator fitted to them"""
+    if emulator is None:
+        emulator = GaussianProcessEmulator()
+    for path in [simulation.folder_communities, simulation.filename_csv]:
+        if os.path.exists(path):
+            raise ValueError(f"The output {path} of the simulation exists already")
+    # Candidate numbers run up to the number of all candidates, which therefore is
+    # the number of points of the design
+    candidate_simulation = copy.copy(simulation)
+    candidate_simulation.number_of_communities = number_of_rounds * number_of_candidates
+    simulation.initialize_dirs()
+    simulation.write_readme()
+    simulation.write_head_line()
+    initial_data = data
+    number = 0
+    for _ in range(number_of_rounds):
+        emulator.fit(data)
+        candidates = []
+        for candidate_number in range(number, number + number_of_candidates):
+            candidates.append(
+                candidate_simulation.generate_community(candidate_number)
+            )
+        features = pd.DataFrame(
+            [
+                community_features(community, candidate_number)
+                for candidate_number, community in enumerate(candidates, start=number)
+            ]
+        )
+        chosen = emulator.select_batch(features, batch_size)
+        with cf.ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = []
+            for index in chosen:
+                community_number = number + index
+                save_community_to_file(
+                    filename=f"{simulation.folder_communities}/communities/"
+                    f"{community_number}",
+                    community=candidates[index],
+                )
+                futures.append(
+                    executor.submit(
+                        simulation.simulate_and_write_data_line,
+                        community=candidates[index],
+                        number=community_number,
+                    )
+                )
+            for future in futures:
+                future.result()
+        number += number_of_candidates
+        # The data file contains the rows of all rounds so far
+        data = pd.concat(
+            [initial_data, pd.read_csv(simulation.filename_csv)], ignore_index=True
+        )
+    combine_community_files(
+        directory_path=f"{simulation.folder_communities}/communities",
+        output_file=f"{simulation.folder_communities}/communities.pickle",
+        delete_directory=False,
+    )
+    emulator.fit(data)
+    return data, emulator
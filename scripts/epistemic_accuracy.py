@@ -0,0 +1,127 @@
+import numpy as np
+from scipy.stats import binom
+
+# Number of standard deviations around the mean that is summed over in the
+# convolution of two binomial distributions; the remaining mass is negligible.
+number_of_std_support: int = 40
+
+
+def epistemic_accuracy(group_size, competence):
+    """Returns the epistemic accuracy of majority voting in a group of size
+    'group_size' where each agent has competence 'competence'. Ties are broken by a
+    fair coin. The arguments are broadcast against each other.
+
+    Parameters
+    ----------
+    group_size: int or np.ndarray
+        The number of agents
+    competence: float or np.ndarray
+        Competence level of agents
+
+    Returns
+    -------
+    probability_correct: float or np.ndarray
+        The probability that majority voting succeeds in selecting the correct
+        alternative"""
+    group_size, competence = np.broadcast_arrays(
+        np.asarray(group_size), np.asarray(competence, dtype=float)
+    )
+    half = group_size / 2
+    probability_more_than_half_correct = binom.sf(half, group_size, competence)
+    # Ties only occur when the group size is even
+    is_even = (group_size % 2) == 0
+    probability_tie = np.where(is_even, binom.pmf(half, group_size, competence), 0)
+    probability_correct = probability_more_than_half_correct + probability_tie / 2
+    return probability_correct[()]
+
+
+def epistemic_accuracy_two_types(
+    group_size_1,
+    group_size_2,
+    competence_1,
+    competence_2,
+):
+    """Returns the epistemic accuracy of majority voting in a group that consists of
+    'group_size_1' agents of competence 'competence_1' and 'group_size_2' agents of
+    competence 'competence_2'. Ties are broken by a fair coin. The arguments are
+    broadcast against each other.
+
+    The number of correct votes is the sum of two binomial random variables X_1 and
+    X_2. The accuracy is computed by conditioning on the smaller group:
+    P(X_1 + X_2 > N / 2) = sum_k P(X_1 = k) P(X_2 > N / 2 - k), where k only ranges
+    over the support of X_1 that carries non-negligible probability.
+
+    Returns
+    -------
+    probability_correct: float or np.ndarray
+        The probability that majority voting succeeds in selecting the correct
+        alternative"""
+    arrays = np.broadcast_arrays(
+        np.asarray(group_size_1),
+        np.asarray(group_size_2),
+        np.asarray(competence_1, dtype=float),
+        np.asarray(competence_2, dtype=float),
+    )
+    group_size_1, group_size_2, competence_1, competence_2 = arrays
+    group_size = group_size_1 + group_size_2
+
+    # Condition on the smaller group
+    swap = group_size_1 > group_size_2
+    size_small = np.where(swap, group_size_2, group_size_1)[..., None]
+    size_large = np.where(swap, group_size_1, group_size_2)[..., None]
+    competence_small = np.where(swap, competence_2, competence_1)[..., None]
+    competence_large = np.where(swap, competence_1, competence_2)[..., None]
+
+    # Values k of the smaller group with non-negligible probability
+    mean = size_small * competence_small
+    std = np.sqrt(size_small * competence_small * (1 - competence_small))
+    lowest = np.maximum(0, np.floor(mean - number_of_std_support * std)).astype(int)
+    highest = np.minimum(size_small, np.ceil(mean + number_of_std_support * std))
+    width = int(np.max(highest - lowest, initial=0)) + 1
+    k = lowest + np.arange(width)
+
+    probability_k = binom.pmf(k, size_small, competence_small)
+    half = group_size[..., None] / 2
+    probability_more_than_half_correct = np.sum(
+        probability_k * binom.sf(half - k, size_large, competence_large), axis=-1
+    )
+    is_even = (group_size % 2) == 0
+    probability_tie = np.where(
+        is_even,
+        np.sum(probability_k * binom.pmf(half - k, size_large, competence_large), -1),
+        0,
+    )
+    probability_correct = probability_more_than_half_correct + probability_tie / 2
+    return probability_correct[()]
+
+
+def exact_accuracy_pre_influence(
+    number_of_elites,
+    number_of_mass,
+    elite_competence,
+    mass_competence,
+):
+    """Returns the exact majoritarian accuracy prior to influence of a community, i.e.
+    the probability that the majority of opinions is for the mass, with ties broken by
+    a fair coin. It does not depend on the network. Elites hold the opinion for the
+    mass with probability 1 - elite_competence and mass nodes with probability
+    mass_competence. The arguments are broadcast against each other."""
+    probability_correct = epistemic_accuracy_two_types(
+        number_of_elites,
+        number_of_mass,
+        1 - np.asarray(elite_competence, dtype=float),
+        mass_competence,
+    )
+    return probability_correct
+
+
+def exact_accuracy_pre_influence_from_data(df, number_of_nodes: int = 100):
+    """Returns the exact majoritarian accuracy prior to influence of every row of a
+    results data frame as generated by Simulation."""
+    probability_correct = exact_accuracy_pre_influence(
+        number_of_elites=df["number_of_minority"].to_numpy(),
+        number_of_mass=number_of_nodes - df["number_of_minority"].to_numpy(),
+        elite_competence=df["minority_competence"].to_numpy(),
+        mass_competence=df["majority_competence"].to_numpy(),
+    )
+    return probability_correct
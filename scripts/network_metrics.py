@@ -0,0 +1,83 @@
+import numpy as np
+
+""" Network metrics
+
+Statistics of the network of a community computed from its edge array of shape
+(number_of_edges, 2) of (source, target), where the first number_of_elites nodes are
+the elites. Every metric is a function of the arrays of network_arrays, which are
+computed once for all metrics. """
+
+
+def network_arrays(edges, number_of_nodes: int, number_of_elites: int):
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    arrays = {
+        "edges": edges,
+        "number_of_nodes": number_of_nodes,
+        "in_degrees": np.bincount(edges[:, 1], minlength=number_of_nodes),
+        "source_is_elite": edges[:, 0] < number_of_elites,
+        "target_is_elite": edges[:, 1] < number_of_elites,
+    }
+    return arrays
+
+
+def influence_minority_proportion(arrays: dict):
+    """Proportion of the edges that point to elites, i.e. the share of the total
+    influence held by the elites."""
+    return np.mean(arrays["target_is_elite"]) if len(arrays["edges"]) else np.nan
+
+
+def in_degree_gini(arrays: dict):
+    """Gini coefficient of the in-degrees of all nodes."""
+    in_degrees = np.sort(arrays["in_degrees"])
+    number_of_nodes = len(in_degrees)
+    if number_of_nodes == 0 or in_degrees.sum() == 0:
+        return 0.0
+    ranks = np.arange(1, number_of_nodes + 1)
+    return np.sum((2 * ranks - number_of_nodes - 1) * in_degrees) / (
+        number_of_nodes * in_degrees.sum()
+    )
+
+
+def max_in_degree(arrays: dict):
+    return int(arrays["in_degrees"].max(initial=0))
+
+
+def cross_type_edge_fraction(arrays: dict):
+    """Proportion of the edges between an elite and a mass node."""
+    if len(arrays["edges"]) == 0:
+        return np.nan
+    return np.mean(arrays["source_is_elite"] != arrays["target_is_elite"])
+
+
+def reciprocity(arrays: dict):
+    """Proportion of the edges whose reverse edge is in the network as well."""
+    edges = arrays["edges"]
+    if len(edges) == 0:
+        return np.nan
+    number_of_nodes = arrays["number_of_nodes"]
+    edge_codes = edges[:, 0] * number_of_nodes + edges[:, 1]
+    reverse_codes = edges[:, 1] * number_of_nodes + edges[:, 0]
+    return np.mean(np.isin(reverse_codes, edge_codes))
+
+
+network_metrics: dict = {
+    "influence_minority_proportion": influence_minority_proportion,
+    "in_degree_gini": in_degree_gini,
+    "max_in_degree": max_in_degree,
+    "cross_type_edge_fraction": cross_type_edge_fraction,
+    "reciprocity": reciprocity,
+}
+
+
+def compute_network_metrics(
+    edges, number_of_nodes: int, number_of_elites: int, metrics: list = None
+):
+    """Returns a dict with the values of the given metrics (all metrics of
+    network_metrics if not given) of the network with the given edges."""
+    if metrics is None:
+        metrics = list(network_metrics)
+    unknown_metrics = [name for name in metrics if name not in network_metrics]
+    if unknown_metrics:
+        raise ValueError(f"Metrics {unknown_metrics} are not available")
+    arrays = network_arrays(edges, number_of_nodes, number_of_elites)
+    return {name: network_metrics[name](arrays) for name in metrics}
@@ -0,0 +1,178 @@
+import os
+
+import numpy as np
+
+from generate_figures.binned_data import bin_counts, cache_filename, figure_bins
+
+""" Online statistics
+
+Streaming accumulators of the rows of a simulation: fixed-bin histograms as in the
+distribution figures, running means and variances, and the sufficient statistics of
+linear regressions, i.e. the cross-products of the regression variables. They are
+updated row by row while the results arrive and can be checkpointed at any time. """
+
+# The variables of the regressions, see convert_math_to_text
+regression_variables: list = [
+    "minority_competence",
+    "majority_competence",
+    "number_of_minority",
+    "influence_minority_proportion",
+    "homophily",
+]
+
+
+class OnlineStatistics:
+    def __init__(
+        self,
+        bins: dict = None,
+        variables: list = None,
+        dependent_variable: str = "accuracy",
+    ):
+        self.bins: dict = figure_bins if bins is None else bins
+        self.variables: list = regression_variables if variables is None else variables
+        self.dependent_variable: str = dependent_variable
+        self.counts: dict = {
+            column: np.zeros(len(edges) - 1, dtype=np.int64)
+            for column, edges in self.bins.items()
+        }
+        # Welford's running count, mean and sum of squared deviations
+        self.moment_columns: list = list(
+            dict.fromkeys(list(self.bins) + self.variables + [dependent_variable])
+        )
+        self.number_of_values = np.zeros(len(self.moment_columns), dtype=np.int64)
+        self.means = np.zeros(len(self.moment_columns))
+        self.squared_deviations = np.zeros(len(self.moment_columns))
+        # Cross-products of [1, variables, dependent_variable]
+        size = len(self.variables) + 2
+        self.cross_products = np.zeros((size, size))
+
+    def update(self, row: dict):
+        """Adds a row of the data file, given as a dict of column values. Missing
+        values (None or NaN) are skipped, and rows with a missing regression variable
+        do not enter the regression."""
+        for column, edges in self.bins.items():
+            self.counts[column] += bin_counts([as_float(row.get(column))], edges)
+        values = np.array([as_float(row.get(column)) for column in self.moment_columns])
+        observed = ~np.isnan(values)
+        self.number_of_values += observed
+        delta = np.where(observed, values - self.means, 0)
+        counts = np.maximum(self.number_of_values, 1)
+        self.means += np.where(observed, delta / counts, 0)
+        self.squared_deviations += np.where(observed, delta * (values - self.means), 0)
+        regression_values = np.array(
+            [1.0]
+            + [as_float(row.get(column)) for column in self.variables]
+            + [as_float(row.get(self.dependent_variable))]
+        )
+        if not np.isnan(regression_values).any():
+            self.cross_products += np.outer(regression_values, regression_values)
+
+    def moments(self):
+        """Returns a dict that maps each column to its number of values, mean and
+        standard deviation."""
+        variances = self.squared_deviations / np.maximum(self.number_of_values, 1)
+        return {
+            column: {
+                "count": int(count),
+                "mean": mean,
+                "std": np.sqrt(variance),
+            }
+            for column, count, mean, variance in zip(
+                self.moment_columns, self.number_of_values, self.means, variances
+            )
+        }
+
+    def binned(self):
+        """Returns the histograms in the format of binned_columns."""
+        return {
+            column: {"edges": np.asarray(self.bins[column]), "counts": counts}
+            for column, counts in self.counts.items()
+        }
+
+    def regression(self, variables: list = None):
+        """Returns the coefficients, standardized coefficients and R squared of the
+        linear regression of the dependent variable on the given variables (all
+        variables if not given), computed from the cross-products."""
+        if variables is None:
+            variables = self.variables
+        indices = [0] + [self.variables.index(name) + 1 for name in variables]
+        dependent_index = len(self.variables) + 1
+        xtx = self.cross_products[np.ix_(indices, indices)]
+        xty = self.cross_products[indices, dependent_index]
+        coefficients = np.linalg.solve(xtx, xty)
+        number_of_rows = self.cross_products[0, 0]
+        means = self.cross_products[0, indices] / number_of_rows
+        dependent_mean = self.cross_products[0, dependent_index] / number_of_rows
+        total_sum_of_squares = (
+            self.cross_products[dependent_index, dependent_index]
+            - number_of_rows * dependent_mean ** 2
+        )
+        residual_sum_of_squares = (
+            self.cross_products[dependent_index, dependent_index]
+            - 2 * coefficients @ xty
+            + coefficients @ xtx @ coefficients
+        )
+        stds = np.sqrt(np.diag(xtx)[1:] / number_of_rows - means[1:] ** 2)
+        dependent_std = np.sqrt(total_sum_of_squares / number_of_rows)
+        result = {
+            "number_of_rows": int(number_of_rows),
+            "coefficients": dict(zip(["const"] + variables, coefficients)),
+            "std_coefficients": dict(
+                zip(variables, coefficients[1:] * stds / dependent_std)
+            ),
+            "r_squared": 1 - residual_sum_of_squares / total_sum_of_squares,
+        }
+        return result
+
+    def save(self, filename: str):
+        """Saves the accumulators to an npz file. The file is replaced atomically, so
+        that a checkpoint that is read during the run is always complete."""
+        temporary_filename = f"{filename}.tmp.npz"
+        np.savez(
+            temporary_filename,
+            variables=np.array(self.variables),
+            dependent_variable=np.array(self.dependent_variable),
+            moment_columns=np.array(self.moment_columns),
+            number_of_values=self.number_of_values,
+            means=self.means,
+            squared_deviations=self.squared_deviations,
+            cross_products=self.cross_products,
+            **{f"edges_{column}": edges for column, edges in self.bins.items()},
+            **{f"counts_{column}": counts for column, counts in self.counts.items()},
+        )
+        os.replace(temporary_filename, filename)
+
+    @classmethod
+    def load(cls, filename: str):
+        with np.load(filename) as data:
+            bins = {
+                key[len("edges_") :]: data[key]
+                for key in data.files
+                if key.startswith("edges_")
+            }
+            statistics = cls(
+                bins=bins,
+                variables=data["variables"].tolist(),
+                dependent_variable=str(data["dependent_variable"]),
+            )
+            for column in bins:
+                statistics.counts[column] = data[f"counts_{column}"]
+            statistics.number_of_values = data["number_of_values"]
+            statistics.means = data["means"]
+            statistics.squared_deviations = data["squared_deviations"]
+            statistics.cross_products = data["cross_products"]
+        return statistics
+
+    def write_figure_cache(self, data_file: str, cache_directory: str):
+        """Stores the histograms as the cached binned columns of the (complete) data
+        file, so that the distribution figures need no pass over the data file."""
+        os.makedirs(cache_directory, exist_ok=True)
+        for column, binned in self.binned().items():
+            np.savez(
+                cache_filename(cache_directory, data_file, column, binned["edges"]),
+                **binned,
+            )
+
+
+def as_float(value):
+    return np.nan if value is None else float(value)
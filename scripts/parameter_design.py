@@ -0,0 +1,82 @@
+import functools
+
+import numpy as np
+
+""" Parameter designs
+
+A design assigns to every community number a point of the unit cube, from which
+Simulation.generate_community derives the parameters of the community. Points
+depend only on the design, the seed and (for Latin hypercubes) the total number of
+communities, so that any subset of the communities can be generated independently
+and reproducibly. """
+
+designs = ["random", "sobol", "latin_hypercube"]
+
+
+@functools.lru_cache(maxsize=8)
+def latin_hypercube_points(number_of_points: int, dimension: int, seed: int):
+    """Returns the points of a scrambled Latin hypercube. Cached, since the design
+    is generated as a whole and indexed by community number."""
+    # Imported here to keep the import of the simulation core light
+    from scipy.stats import qmc
+
+    sampler = qmc.LatinHypercube(d=dimension, seed=seed)
+    return sampler.random(number_of_points)
+
+
+@functools.lru_cache(maxsize=8)
+def sobol_points(exponent: int, dimension: int, seed: int):
+    """Returns the first 2 ** exponent points of a scrambled Sobol sequence. Cached,
+    so that the sampler is built once per simulation and process instead of once
+    per community."""
+    # Imported here to keep the import of the simulation core light
+    from scipy.stats import qmc
+
+    sampler = qmc.Sobol(d=dimension, scramble=True, seed=seed)
+    return sampler.random_base2(exponent)
+
+
+def design_point(
+    design: str, number: int, number_of_points: int, dimension: int, seed: int = 0
+):
+    """Returns the point with index 'number' of the design as an array of shape
+    (dimension,) with values in [0, 1).
+    :param design: str
+        "sobol" (scrambled Sobol sequence) or "latin_hypercube"
+    :param number: int
+        Index of the point, i.e. the community number; smaller than
+        number_of_points for the Latin hypercube
+    :param number_of_points: int
+        Total number of points of the design
+    :param dimension: int
+        Dimension of the points
+    :param seed: int
+        Seed of the scrambling"""
+    if design == "sobol":
+        # The sequence is extensible, so its points do not depend on the total
+        # number of points, and numbers beyond it extend the sequence. Powers of 2
+        # keep the balance of the points and the number of cached sequences small.
+        number_of_points = max(number_of_points, number + 1)
+        exponent = (number_of_points - 1).bit_length()
+        return sobol_points(exponent, dimension, seed)[number]
+    if design == "latin_hypercube":
+        if not 0 <= number < number_of_points:
+            raise ValueError(
+                f"Design {design} has the points 0 to {number_of_points - 1}, "
+                f"not {number}"
+            )
+        return latin_hypercube_points(number_of_points, dimension, seed)[number]
+    raise ValueError(f"Design {design} is not available")
+
+
+def scale_to_range(value: float, value_range):
+    """Maps a value of [0, 1) linearly onto the interval 'value_range'."""
+    low, high = value_range
+    return low + value * (high - low)
+
+
+def scale_to_integer_range(value: float, value_range):
+    """Maps a value of [0, 1) onto the integers low, ..., high (inclusive, as in
+    rd.randint) such that every integer receives an interval of equal length."""
+    low, high = value_range
+    return min(low + int(np.floor(value * (high - low + 1))), high)
@@ -0,0 +1,300 @@
+import argparse
+import os
+import pickle
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from scipy.stats import norm
+
+from community import Community
+from scripts.save_read_community import community_compress
+
+""" Planner
+
+Predicts the cost of a simulation campaign (see Simulation.run) before it is run. Short
+micro-benchmarks time the generation of a community and a voting simulation, and
+measure the peak memory and the size of a saved community, for communities of
+several sizes up to the requested number of nodes. Power laws in the number of nodes
+are fitted to these measurements and extrapolated to the requested number of nodes,
+from which the wall time, CPU-hours, memory and disk of the campaign on a given
+number of cores follow. """
+
+# Approximate size in bytes of a row of the data file
+csv_row_bytes = 320
+
+
+def calibration_nodes(number_of_nodes: int, degree: int, max_nodes: int = 1000):
+    """Returns the sizes of the calibration communities: a quarter, half and all of
+    the requested number of nodes, or of max_nodes if that is smaller."""
+    largest = min(number_of_nodes, max_nodes)
+    smallest = 4 * (degree + 1)
+    return sorted({max(largest // 4, smallest), max(largest // 2, smallest), largest})
+
+
+def calibration_community(number_of_nodes: int, degree: int, seed: int = 0):
+    """Returns a community with the midpoints of the default parameter ranges of
+    Simulation."""
+    return Community(
+        number_of_nodes=number_of_nodes,
+        number_of_elites=int(0.35 * number_of_nodes),
+        degree=degree,
+        elite_competence=0.625,
+        mass_competence=0.625,
+        probability_preferential_attachment=0.6,
+        probability_homophilic_attachment=0.625,
+        seed=seed,
+    )
+
+
+def minimal_time(function, repeat: int = 3):
+    """Returns the minimal time in seconds of 'repeat' calls of 'function'."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def measure_community(
+    number_of_nodes: int, degree: int, calibration_trials: int = 100, repeat: int = 3
+):
+    """Returns the generation time, the voting time per trial, the peak memory of
+    generation and voting in bytes and the size of the saved community in bytes of a
+    community of the given size."""
+    generation_seconds = minimal_time(
+        lambda: calibration_community(number_of_nodes, degree), repeat=repeat
+    )
+    community = calibration_community(number_of_nodes, degree)
+    voting_seconds = minimal_time(
+        lambda: community.voting_simulation(calibration_trials), repeat=repeat
+    )
+    tracemalloc.start()
+    calibration_community(number_of_nodes, degree).voting_simulation(10)
+    peak_memory_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    measurement = {
+        "number_of_nodes": number_of_nodes,
+        "generation_seconds": generation_seconds,
+        "seconds_per_trial": voting_seconds / calibration_trials,
+        "peak_memory_bytes": peak_memory_bytes,
+        "community_bytes": len(pickle.dumps(community_compress(community))),
+    }
+    return measurement
+
+
+def worker_baseline_bytes():
+    """Returns the peak resident memory in bytes of a new interpreter that imports
+    simulation, as every worker process does (Unix only)."""
+    command = (
+        "import resource, simulation; "
+        "print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+    )
+    root_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run(
+        [sys.executable, "-c", command],
+        cwd=root_directory,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return int(output) * (1 if sys.platform == "darwin" else 1024)
+
+
+def fit_power_law(x, y):
+    """Returns (coefficient, exponent) of the least squares fit of y = coefficient *
+    x ** exponent on the logarithmic scale. With a single value of x, the exponent is
+    1."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if len(np.unique(x)) < 2:
+        return float(np.mean(y / x)), 1.0
+    exponent, log_coefficient = np.polyfit(np.log(x), np.log(y), 1)
+    return float(np.exp(log_coefficient)), float(exponent)
+
+
+def fit_cost_model(measurements: list):
+    """Fits a power law in the number of nodes to every measured quantity of
+    measure_community."""
+    number_of_nodes = [measurement["number_of_nodes"] for measurement in measurements]
+    quantities = [
+        "generation_seconds",
+        "seconds_per_trial",
+        "peak_memory_bytes",
+        "community_bytes",
+    ]
+    return {
+        quantity: fit_power_law(
+            number_of_nodes, [measurement[quantity] for measurement in measurements]
+        )
+        for quantity in quantities
+    }
+
+
+def predict(cost_model: dict, quantity: str, number_of_nodes: int):
+    coefficient, exponent = cost_model[quantity]
+    return coefficient * number_of_nodes ** exponent
+
+
+def trials_for_precision(precision: float, alpha: float = 0.05):
+    """Returns the number of trials for which the normal confidence interval of an
+    accuracy has at most the width 'precision', in the worst case of accuracy 1/2."""
+    z = norm.ppf(1 - alpha / 2)
+    return int(np.ceil((z / precision) ** 2))
+
+
+def plan_campaign(
+    number_of_communities: int,
+    number_of_voting_simulations: int,
+    number_of_nodes: int = 100,
+    degree: int = 6,
+    cores: int = None,
+    parallel_efficiency: float = 0.9,
+    target_precision: float = 0.01,
+    alpha: float = 0.05,
+    time_budget_hours: float = None,
+    target_chunk_seconds: float = 60.0,
+    chunks_per_core: int = 10,
+    max_calibration_nodes: int = 1000,
+    calibration_trials: int = 100,
+    cost_model: dict = None,
+    baseline_bytes: int = None,
+):
+    """Predicts the cost of a campaign and recommends its chunk size and number of
+    trials.
+    :param number_of_communities: int
+        Number of communities of the campaign
+    :param number_of_voting_simulations: int
+        Number of trials per community
+    :param number_of_nodes: int
+        Number of nodes per community
+    :param degree: int
+        Out-degree of the nodes
+    :param cores: int
+        Number of cores; all cores of this machine if not given
+    :param parallel_efficiency: float
+        Proportion of ideal speedup that is reached on all cores
+    :param target_precision: float
+        Width of the confidence interval of the accuracy to be reached
+    :param alpha: float
+        p-value for confidence interval
+    :param time_budget_hours: float
+        Wall time in hours for the recommended maximal number of trials
+    :param target_chunk_seconds: float
+        Desired duration of a chunk of communities of the work queue
+    :param chunks_per_core: int
+        Minimal number of chunks per core for load balancing
+    :param max_calibration_nodes: int
+        Largest calibration community; larger communities are extrapolated
+    :param calibration_trials: int
+        Number of trials of the calibration voting simulations
+    :param cost_model: dict
+        The result of fit_cost_model, which is calibrated if not given
+    :param baseline_bytes: int
+        Memory of a worker process before it simulates, which is measured by
+        worker_baseline_bytes if not given
+    :returns plan: dict
+        The predicted seconds per community, wall time in hours, CPU-hours, memory
+        in bytes (per worker and in total), disk in bytes, the recommended
+        chunk_size of Simulation with executor "queue", the number of trials for
+        the target precision, the maximal number of trials within the time budget
+        and the cost model"""
+    if cores is None:
+        cores = os.cpu_count()
+    if cost_model is None:
+        measurements = [
+            measure_community(nodes, degree, calibration_trials=calibration_trials)
+            for nodes in calibration_nodes(
+                number_of_nodes, degree, max_nodes=max_calibration_nodes
+            )
+        ]
+        cost_model = fit_cost_model(measurements)
+    generation_seconds = predict(cost_model, "generation_seconds", number_of_nodes)
+    seconds_per_trial = predict(cost_model, "seconds_per_trial", number_of_nodes)
+    seconds_per_community = (
+        generation_seconds + number_of_voting_simulations * seconds_per_trial
+    )
+    cpu_seconds = number_of_communities * seconds_per_community
+    wall_seconds = cpu_seconds / (cores * parallel_efficiency)
+    if baseline_bytes is None:
+        baseline_bytes = worker_baseline_bytes()
+    memory_per_worker = baseline_bytes + predict(
+        cost_model, "peak_memory_bytes", number_of_nodes
+    )
+    # The communities are saved separately and combined into communities.pickle
+    community_bytes = predict(cost_model, "community_bytes", number_of_nodes)
+    disk_bytes = number_of_communities * (2 * community_bytes + csv_row_bytes)
+
+    # Chunks of about target_chunk_seconds, but enough chunks for all cores
+    chunk_size = max(int(target_chunk_seconds / seconds_per_community), 1)
+    chunk_size = max(
+        min(chunk_size, number_of_communities // (chunks_per_core * cores)), 1
+    )
+    max_trials = None
+    if time_budget_hours is not None:
+        budget_seconds_per_community = (
+            time_budget_hours * 3600 * cores * parallel_efficiency
+        ) / number_of_communities
+        voting_seconds = budget_seconds_per_community - generation_seconds
+        max_trials = max(int(voting_seconds / seconds_per_trial), 0)
+    plan = {
+        "seconds_per_community": seconds_per_community,
+        "wall_hours": wall_seconds / 3600,
+        "cpu_hours": cpu_seconds / 3600,
+        "memory_per_worker_bytes": memory_per_worker,
+        "memory_bytes": cores * memory_per_worker,
+        "disk_bytes": disk_bytes,
+        "chunk_size": chunk_size,
+        "trials_for_precision": trials_for_precision(target_precision, alpha=alpha),
+        "max_trials_within_budget": max_trials,
+        "cost_model": cost_model,
+    }
+    return plan
+
+
+def format_plan(plan: dict, cores: int):
+    lines = [
+        f"Seconds per community: {plan['seconds_per_community']:.3g}",
+        f"Wall time on {cores} cores: {plan['wall_hours']:.3g} hours",
+        f"CPU time: {plan['cpu_hours']:.3g} CPU-hours",
+        f"Memory: {plan['memory_per_worker_bytes'] / 10 ** 6:.3g} MB per worker, "
+        f"{plan['memory_bytes'] / 10 ** 9:.3g} GB in total",
+        f"Disk: {plan['disk_bytes'] / 10 ** 9:.3g} GB",
+        f"Recommended chunk size of the work queue: {plan['chunk_size']} "
+        f"communities (Simulation(executor='queue', chunk_size=...))",
+        f"Trials for the target precision: {plan['trials_for_precision']}",
+    ]
+    if plan["max_trials_within_budget"] is not None:
+        lines.append(
+            f"Maximal trials within the time budget: "
+            f"{plan['max_trials_within_budget']}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Predict the cost of a simulation campaign."
+    )
+    parser.add_argument("--communities", type=int, default=10 ** 5)
+    parser.add_argument("--trials", type=int, default=10 ** 5)
+    parser.add_argument("--nodes", type=int, default=100)
+    parser.add_argument("--degree", type=int, default=6)
+    parser.add_argument("--cores", type=int, default=os.cpu_count())
+    parser.add_argument("--precision", type=float, default=0.01)
+    parser.add_argument("--budget-hours", type=float, default=None)
+    arguments = parser.parse_args()
+    plan = plan_campaign(
+        number_of_communities=arguments.communities,
+        number_of_voting_simulations=arguments.trials,
+        number_of_nodes=arguments.nodes,
+        degree=arguments.degree,
+        cores=arguments.cores,
+        target_precision=arguments.precision,
+        time_budget_hours=arguments.budget_hours,
+    )
+    print(format_plan(plan, arguments.cores))
@@ -0,0 +1,110 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+""" Result buffer
+
+A structured array in shared memory with one row per community, into which the
+workers of Simulation.run write their result rows at the index of the community
+number. The parent appends the filled rows to the csv file in bulk, ordered by
+community number, so that neither a file nor a pickled result is written per row.
+Every row is appended once, at the first checkpoint at which all rows before it are
+complete. The field "_written" marks the rows that are complete. """
+
+# Buffers of the current process by name, so that every worker attaches only once
+attached_buffers: dict = {}
+
+
+def result_dtype(columns: list, integer_columns: list = ()):
+    """Returns the structured data type of the rows with the given columns, where the
+    integer columns are int64 and the others float64."""
+    return np.dtype(
+        [
+            (column, np.int64 if column in integer_columns else np.float64)
+            for column in columns
+        ]
+        + [("_written", np.bool_)]
+    )
+
+
+class ResultBuffer:
+    def __init__(self, memory: shared_memory.SharedMemory, dtype, number_of_rows: int):
+        self.memory = memory
+        self.dtype = np.dtype(dtype)
+        self.columns: list = [name for name in self.dtype.names if name != "_written"]
+        self.array = np.ndarray(number_of_rows, dtype=self.dtype, buffer=memory.buf)
+        # Rows that were already returned by new_rows, which is known to the parent
+        self.collected = np.zeros(number_of_rows, dtype=bool)
+        # Number of rows that were appended to the csv file by the parent
+        self.number_of_appended_rows: int = 0
+
+    @classmethod
+    def create(cls, dtype, number_of_rows: int):
+        size = max(np.dtype(dtype).itemsize * number_of_rows, 1)
+        memory = shared_memory.SharedMemory(create=True, size=size)
+        buffer = cls(memory, dtype, number_of_rows)
+        buffer.array["_written"] = False
+        attached_buffers[buffer.name] = buffer
+        return buffer
+
+    @classmethod
+    def attach(cls, name: str, dtype, number_of_rows: int):
+        """Returns the buffer with the given name, which is attached once per
+        process."""
+        if name not in attached_buffers:
+            memory = shared_memory.SharedMemory(name=name)
+            attached_buffers[name] = cls(memory, dtype, number_of_rows)
+        return attached_buffers[name]
+
+    @property
+    def name(self):
+        return self.memory.name
+
+    def write_row(self, index: int, row: dict):
+        """Writes a row given as a dict of column values, where None is stored as
+        NaN. The row is marked as written after all values are stored."""
+        self.array[index] = tuple(
+            np.nan if row[column] is None else row[column] for column in self.columns
+        ) + (False,)
+        self.array["_written"][index] = True
+
+    def new_rows(self):
+        """Returns the written rows that were not returned before as a list of
+        dicts."""
+        indices = np.flatnonzero(self.array["_written"] & ~self.collected)
+        self.collected[indices] = True
+        rows = self.array[indices][self.columns].tolist()
+        return [dict(zip(self.columns, values)) for values in rows]
+
+    def append_to_csv(self, filename: str):
+        """Appends the rows that are written and follow the rows appended before
+        without gap to a csv file whose head line was written before, see
+        Simulation.write_head_line. The rows are thereby ordered by index, and every
+        row is appended once. NaN is written as None as in
+        Simulation.simulate_and_write_data_line. Returns the number of appended
+        rows."""
+        start = self.number_of_appended_rows
+        missing = np.flatnonzero(~self.array["_written"][start:])
+        stop = start + missing[0] if len(missing) else len(self.array)
+        rows = self.array[start:stop][self.columns].tolist()
+        if rows:
+            lines = [
+                ",".join("None" if value != value else f"{value}" for value in values)
+                for values in rows
+            ]
+            with open(filename, "a") as f:
+                f.write("".join(f"\n{line}" for line in lines))
+        self.number_of_appended_rows = stop
+        return len(rows)
+
+    def close(self):
+        attached_buffers.pop(self.name, None)
+        del self.array
+        self.memory.close()
+
+    def unlink(self):
+        """Closes the buffer and frees the shared memory, which is done by the
+        process that created it."""
+        memory = self.memory
+        self.close()
+        memory.unlink()
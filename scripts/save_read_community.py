@@ -2,6 +2,8 @@ import os
 import pickle
 import shutil
 
+import numpy as np
+
 from community import Community
 
 
@@ -85,3 +87,28 @@ def read_community_from_combined_file(filename: str, community_number: int):
         community_compressed = pickle.load(f)[community_number]
     community = community_unpack(community_compressed)
     return community
+
+
+def save_histogram_to_file(filename: str, histogram: dict):
+    """Saves the histogram of the voting simulation of a community, i.e. its
+    marginal counts and its sparse joint (opinion, vote) counts, see
+    voting_histogram."""
+    path = os.path.dirname(filename).replace("\\", "/")
+    os.makedirs(path, exist_ok=True)
+    np.savez_compressed(f"{filename}.npz", **histogram)
+
+
+def read_histogram_from_file(filename: str):
+    with np.load(f"{filename}.npz") as data:
+        histogram = {key: data[key] for key in data.files}
+    return histogram
+
+
+def read_histograms_from_directory(directory_path: str, community_numbers):
+    """Returns the stored histograms of the given communities as a list, which can
+    be re-analysed at once with accuracy_and_precision_from_histograms."""
+    histograms = [
+        read_histogram_from_file(filename=f"{directory_path}/{number}")
+        for number in community_numbers
+    ]
+    return histograms
@@ -0,0 +1,138 @@
+import concurrent.futures as cf
+import hashlib
+import itertools
+import json
+import os
+import random as rd
+
+import numpy as np
+import pandas as pd
+
+
+def parameter_grid(parameters: dict):
+    """Returns the list of all combinations of the parameter values, for example
+    {"h": [0.5, 0.6], "c": [0.55]} gives [{"h": 0.5, "c": 0.55}, {"h": 0.6, "c": 0.55}].
+    """
+    names = list(parameters.keys())
+    grid = [
+        dict(zip(names, values))
+        for values in itertools.product(*parameters.values())
+    ]
+    return grid
+
+
+def point_key(point: dict):
+    """Returns a canonical string representation of a grid point."""
+    return json.dumps(
+        {name: value for name, value in sorted(point.items())},
+        default=lambda value: value.item(),
+    )
+
+
+def task_seed(seed: int, point: dict, replicate: int):
+    """Returns the seed of a single task. The seed depends on the values of the grid
+    point instead of its position in the grid, so that adding grid points does not
+    change the results of the others."""
+    text = f"{seed}|{point_key(point)}|{replicate}"
+    digest = hashlib.sha256(text.encode()).digest()
+    return int.from_bytes(digest[:4], "little")
+
+
+def _run_task(function, point: dict, seed: int):
+    rd.seed(seed)
+    np.random.seed(seed)
+    return function(**point)
+
+
+def parameter_sweep(
+    function,
+    parameters: dict,
+    outputs: list,
+    number_of_replicates: int = 1,
+    seed: int = 0,
+    max_workers: int = None,
+    cache=None,
+):
+    """Evaluates 'function' on every point of the parameter grid, 'number_of_replicates'
+    times per point. The (grid point, replicate) tasks are spread over processes and
+    their results are collected in a preallocated array.
+
+    Parameters
+    ----------
+    function
+        Module level function that takes the grid parameters as keyword arguments and
+        returns a number or a tuple with one number per output. Fixed arguments can be
+        bound with functools.partial.
+    parameters: dict
+        Maps every parameter name to the list of its values
+    outputs: list
+        Names of the outputs of 'function'
+    number_of_replicates: int
+        Number of evaluations per grid point
+    seed: int
+        Seed from which the seed of every task is derived
+    max_workers: int
+        Number of worker processes; runs in the current process if it equals 1
+    cache: SweepCache
+        Optional cache (see scripts.sweep_cache) of the results per grid point. Only
+        the grid points that are missing from the cache are computed.
+
+    Returns
+    -------
+    df: pd.DataFrame
+        One row per task with the grid parameters, the replicate number and the
+        outputs"""
+    grid = parameter_grid(parameters)
+    results = np.empty((len(grid), number_of_replicates, len(outputs)))
+
+    # Look up cached grid points
+    keys = [None] * len(grid)
+    missing = list(range(len(grid)))
+    if cache is not None:
+        keys = [
+            cache.key(function, point, number_of_replicates, seed) for point in grid
+        ]
+        missing = []
+        for index, key in enumerate(keys):
+            values = cache.get(key)
+            if values is not None and values.shape == results[index].shape:
+                results[index] = values
+            else:
+                missing.append(index)
+
+    # Compute missing grid points
+    tasks = [
+        (index, replicate)
+        for index in missing
+        for replicate in range(number_of_replicates)
+    ]
+    functions = [function] * len(tasks)
+    points = [grid[index] for index, _ in tasks]
+    seeds = [task_seed(seed, grid[index], replicate) for index, replicate in tasks]
+    if max_workers == 1:
+        values = map(_run_task, functions, points, seeds)
+        for (index, replicate), value in zip(tasks, values):
+            results[index, replicate] = value
+    elif tasks:
+        number_of_workers = max_workers or os.cpu_count() or 1
+        chunksize = max(1, len(tasks) // (4 * number_of_workers))
+        with cf.ProcessPoolExecutor(max_workers=max_workers) as executor:
+            values = executor.map(
+                _run_task, functions, points, seeds, chunksize=chunksize
+            )
+            for (index, replicate), value in zip(tasks, values):
+                results[index, replicate] = value
+    if cache is not None:
+        for index in missing:
+            cache.put(keys[index], results[index])
+
+    df = pd.DataFrame(
+        [
+            {**point, "replicate": replicate}
+            for point in grid
+            for replicate in range(number_of_replicates)
+        ],
+        columns=list(parameters.keys()) + ["replicate"],
+    )
+    df[outputs] = results.reshape(-1, len(outputs))
+    return df
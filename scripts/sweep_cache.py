@@ -0,0 +1,124 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sys
+
+import numpy as np
+
+from scripts.sweep import point_key
+
+
+def source_version(*objects):
+    """Returns a hash of the source code of the given modules, classes or functions,
+    which serves as the code version of cached results."""
+    sources = "".join(inspect.getsource(obj) for obj in objects)
+    return hashlib.sha256(sources.encode()).hexdigest()[:16]
+
+
+# Modules in this directory belong to the repository
+root_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def local_dependencies(*modules):
+    """Returns the given modules and all modules of the repository that they import,
+    directly or indirectly, ordered by name. Their source code determines the results
+    of functions of the given modules."""
+    dependencies = {}
+    unvisited = list(modules)
+    while unvisited:
+        module = unvisited.pop()
+        filename = getattr(module, "__file__", None)
+        if (
+            module.__name__ in dependencies
+            or filename is None
+            or not os.path.abspath(filename).startswith(root_directory + os.sep)
+            or "site-packages" in filename
+        ):
+            continue
+        dependencies[module.__name__] = module
+        for value in vars(module).values():
+            if inspect.ismodule(value):
+                unvisited.append(value)
+            elif getattr(value, "__module__", None) in sys.modules:
+                unvisited.append(sys.modules[value.__module__])
+    return [dependencies[name] for name in sorted(dependencies)]
+
+
+def function_identity(function):
+    """Returns a json-compatible description of a (partial) function consisting of its
+    qualified name and bound keyword arguments."""
+    keywords = {}
+    while isinstance(function, functools.partial):
+        keywords = {**function.keywords, **keywords}
+        function = function.func
+    identity = {
+        "function": f"{function.__module__}.{function.__qualname__}",
+        "keywords": {name: keywords[name] for name in sorted(keywords)},
+    }
+    return identity
+
+
+class SweepCache:
+    """Content-addressed on-disk cache for the results of a single grid point of a
+    parameter sweep. Every entry is a .npy file whose name is the hash of the function,
+    its fixed arguments, the grid point, the number of replicates, the seed and the code
+    version. The least recently used entries are removed once the total size exceeds
+    'max_size_bytes'."""
+
+    def __init__(
+        self, directory: str, max_size_bytes: int = 10 ** 9, code_version: str = ""
+    ):
+        self.directory: str = directory
+        self.max_size_bytes: int = max_size_bytes
+        self.code_version: str = code_version
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, function, point: dict, number_of_replicates: int, seed: int):
+        content = json.dumps(
+            {
+                **function_identity(function),
+                "point": point_key(point),
+                "number_of_replicates": number_of_replicates,
+                "seed": seed,
+                "code_version": self.code_version,
+            },
+            default=lambda value: value.item(),
+        )
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def filename(self, key: str):
+        return os.path.join(self.directory, f"{key}.npy")
+
+    def get(self, key: str):
+        """Returns the cached array or None. Reading an entry marks it as recently
+        used."""
+        filename = self.filename(key)
+        try:
+            values = np.load(filename)
+        except (FileNotFoundError, ValueError, EOFError):
+            return None
+        os.utime(filename)
+        return values
+
+    def put(self, key: str, values: np.ndarray):
+        filename = self.filename(key)
+        temporary_filename = f"{filename}.{os.getpid()}.tmp"
+        with open(temporary_filename, "wb") as f:
+            np.save(f, values)
+        os.replace(temporary_filename, filename)
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".npy"):
+                status = os.stat(os.path.join(self.directory, name))
+                entries.append((status.st_mtime, status.st_size, name))
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total_size <= self.max_size_bytes:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total_size -= size
@@ -0,0 +1,61 @@
+import numpy as np
+
+from scripts.basic_functions import majority_for_mass
+
+""" Voting rules
+
+A voting rule determines the votes of all nodes from their opinions and the opinions
+of their out-neighbours. Every rule is a function with the arguments
+    number_for_mass: array of shape (trials, number_of_nodes) with the number of
+        out-neighbours that hold the opinion for the mass,
+    out_degrees: array of shape (number_of_nodes,) with the number of out-neighbours,
+    opinions_for_mass: boolean array of shape (trials, number_of_nodes) with the
+        opinions of the nodes themselves,
+    tie_breakers: array of shape (trials, number_of_nodes) with uniform random numbers
+        used to break ties,
+that returns a boolean array of shape (trials, number_of_nodes) which indicates the
+votes for the mass. """
+
+
+def simple_majority(number_for_mass, out_degrees, opinions_for_mass, tie_breakers):
+    """Each node votes for the majority opinion of its out-neighbours and itself. This
+    is the rule of Community.update_votes."""
+    return majority_for_mass(
+        number_for_mass + opinions_for_mass, out_degrees + 1, tie_breakers
+    )
+
+
+def ignore_own_opinion(number_for_mass, out_degrees, opinions_for_mass, tie_breakers):
+    """Each node votes for the majority opinion of its out-neighbours. Nodes without
+    out-neighbours vote according to their own opinion."""
+    votes_for_mass = majority_for_mass(number_for_mass, out_degrees, tie_breakers)
+    return np.where(out_degrees == 0, opinions_for_mass, votes_for_mass)
+
+
+def weighted_self_vote(weight: float):
+    """Returns the rule where each node votes for the weighted majority of its
+    out-neighbours and itself, where its own opinion has weight 'weight' and the
+    opinion of each out-neighbour has weight 1."""
+
+    def rule(number_for_mass, out_degrees, opinions_for_mass, tie_breakers):
+        weight_for_mass = number_for_mass + weight * opinions_for_mass
+        return majority_for_mass(weight_for_mass, out_degrees + weight, tie_breakers)
+
+    return rule
+
+
+def supermajority(threshold: float):
+    """Returns the rule where each node changes its opinion only if at least a
+    proportion 'threshold' (at least 1/2) of its out-neighbours and itself holds the
+    other opinion; otherwise it votes according to its own opinion."""
+
+    def rule(number_for_mass, out_degrees, opinions_for_mass, tie_breakers):
+        number_in_neighbourhood = number_for_mass + opinions_for_mass
+        proportion_for_mass = number_in_neighbourhood / (out_degrees + 1)
+        return np.where(
+            opinions_for_mass,
+            proportion_for_mass > 1 - threshold,
+            proportion_for_mass >= threshold,
+        )
+
+    return rule
@@ -0,0 +1,366 @@
+import argparse
+import os
+import pickle
+import socket
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from scripts.save_read_community import save_community_to_file
+from simulation import integer_columns
+
+""" Work queue
+
+A job queue of the communities of a Simulation in an SQLite database, so that workers
+can join and leave during a long simulation, on one machine or on several machines
+that share the database file (which requires a file system with working file locks).
+The communities are split into chunks of consecutive community numbers. A worker
+leases a chunk for lease_seconds and renews the lease by heartbeats while it
+simulates the chunk; the chunk of a worker that is lost is leased again once its
+lease has expired. The rows of completed chunks are stored in the table "results" of
+the database, whose columns are those of the data file of the simulation. Since every
+community is seeded by its number (see Simulation.community_seeds), a chunk that is
+simulated twice yields the same rows. For the same reason, a work queue survives the
+loss of all workers and of the process that created it: creating the work queue of
+the same simulation again resumes the existing database. """
+
+# Parameters of a simulation that do not affect its rows and may differ when a work
+# queue is resumed
+execution_parameters: list = [
+    "online_statistics",
+    "checkpoint_interval",
+    "executor",
+    "max_workers",
+    "result_buffer",
+    "overwrite_work_queue",
+    "chunk_size",
+]
+
+
+def connect(database: str):
+    # Waits for locks of other workers instead of failing
+    return sqlite3.connect(database, timeout=60, isolation_level=None)
+
+
+def matching_work_queue(database: str, simulation):
+    """Whether 'database' is the database of a work queue of a simulation with the
+    parameters of 'simulation', apart from the execution parameters."""
+    if not os.path.exists(database):
+        return False
+    queue = WorkQueue(database)
+    try:
+        stored_simulation = queue.simulation()
+    except sqlite3.Error:
+        return False
+    finally:
+        queue.close()
+    return result_parameters(stored_simulation) == result_parameters(simulation)
+
+
+def result_parameters(simulation):
+    return {
+        name: value
+        for name, value in simulation.parameters().items()
+        if name not in execution_parameters
+    }
+
+
+def create_work_queue(
+    database: str, simulation, chunk_size: int = 1, overwrite: bool = False
+):
+    """Creates the database of the work queue of 'simulation'. An existing database
+    of the same simulation (see matching_work_queue) is resumed: its completed chunks
+    are kept and its failed chunks are retried. Any other existing database is
+    replaced if 'overwrite' is set; otherwise a ValueError is raised. The simulation
+    and the chunk size are stored in the database, so that workers only need the
+    name of the database. A resumed database keeps its chunks."""
+    if matching_work_queue(database, simulation):
+        connection = connect(database)
+        connection.execute(
+            "UPDATE chunks SET status = 'pending', attempts = 0 "
+            "WHERE status = 'failed'"
+        )
+        connection.close()
+        return database
+    if os.path.exists(database):
+        if not overwrite:
+            raise ValueError(
+                f"The work queue {database} belongs to another simulation"
+            )
+        os.remove(database)
+    number_of_communities = simulation.number_of_communities
+    connection = connect(database)
+    with connection:
+        connection.execute("CREATE TABLE settings (key TEXT PRIMARY KEY, value BLOB)")
+        connection.executemany(
+            "INSERT INTO settings VALUES (?, ?)",
+            [("simulation", pickle.dumps(simulation)), ("chunk_size", chunk_size)],
+        )
+        connection.execute(
+            "CREATE TABLE chunks (chunk_id INTEGER PRIMARY KEY, start INTEGER, "
+            "stop INTEGER, status TEXT, worker TEXT, lease_expires REAL, "
+            "attempts INTEGER)"
+        )
+        connection.executemany(
+            "INSERT INTO chunks VALUES (?, ?, ?, 'pending', NULL, NULL, 0)",
+            [
+                (chunk_id, start, min(start + chunk_size, number_of_communities))
+                for chunk_id, start in enumerate(
+                    range(0, number_of_communities, chunk_size)
+                )
+            ],
+        )
+        column_definitions = ", ".join(
+            f"{column} {'INTEGER' if column in integer_columns else 'REAL'}"
+            for column in simulation.columns()[1:]
+        )
+        connection.execute(
+            f"CREATE TABLE results "
+            f"(community_number INTEGER PRIMARY KEY, {column_definitions})"
+        )
+    connection.close()
+    return database
+
+
+class WorkQueue:
+    """Access to the database of a work queue, see the module docstring.
+    :param database: str
+        The database file of create_work_queue
+    :param lease_seconds: float
+        Duration of a lease, which has to be renewed by heartbeat before it expires
+    :param max_attempts: int
+        Number of leases of a chunk after which it is marked as failed"""
+
+    def __init__(
+        self, database: str, lease_seconds: float = 600.0, max_attempts: int = 5
+    ):
+        self.database: str = database
+        self.lease_seconds: float = lease_seconds
+        self.max_attempts: int = max_attempts
+        self.connection = connect(database)
+
+    def simulation(self):
+        value = self.connection.execute(
+            "SELECT value FROM settings WHERE key = 'simulation'"
+        ).fetchone()[0]
+        return pickle.loads(value)
+
+    def chunk_size(self):
+        return self.connection.execute(
+            "SELECT value FROM settings WHERE key = 'chunk_size'"
+        ).fetchone()[0]
+
+    def lease(self, worker: str):
+        """Leases the first pending chunk or chunk with an expired lease to 'worker'
+        and returns (chunk_id, start, stop), or None if no chunk is available.
+        Expired chunks that were leased max_attempts times are marked as failed."""
+        now = time.time()
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            self.connection.execute(
+                "UPDATE chunks SET status = 'failed' WHERE status = 'leased' "
+                "AND lease_expires < ? AND attempts >= ?",
+                (now, self.max_attempts),
+            )
+            chunk = self.connection.execute(
+                "SELECT chunk_id, start, stop FROM chunks WHERE status = 'pending' "
+                "OR (status = 'leased' AND lease_expires < ?) "
+                "ORDER BY chunk_id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if chunk is not None:
+                self.connection.execute(
+                    "UPDATE chunks SET status = 'leased', worker = ?, "
+                    "lease_expires = ?, attempts = attempts + 1 WHERE chunk_id = ?",
+                    (worker, now + self.lease_seconds, chunk[0]),
+                )
+            self.connection.execute("COMMIT")
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        return chunk
+
+    def heartbeat(self, chunk_id: int, worker: str):
+        """Renews the lease of a chunk and returns whether 'worker' still holds it."""
+        cursor = self.connection.execute(
+            "UPDATE chunks SET lease_expires = ? WHERE chunk_id = ? AND worker = ? "
+            "AND status = 'leased'",
+            (time.time() + self.lease_seconds, chunk_id, worker),
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, chunk_id: int, worker: str, rows: list):
+        """Stores the rows (dicts of column values) of a chunk and marks it as done,
+        unless the chunk was leased to another worker in the meantime. Returns
+        whether the rows were stored."""
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = self.connection.execute(
+                "UPDATE chunks SET status = 'done' WHERE chunk_id = ? AND worker = ? "
+                "AND status = 'leased'",
+                (chunk_id, worker),
+            )
+            stored = cursor.rowcount == 1
+            if stored and rows:
+                columns = list(rows[0])
+                placeholders = ", ".join("?" for _ in columns)
+                self.connection.executemany(
+                    f"INSERT OR REPLACE INTO results ({', '.join(columns)}) "
+                    f"VALUES ({placeholders})",
+                    [[sql_value(value) for value in row.values()] for row in rows],
+                )
+            self.connection.execute("COMMIT")
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        return stored
+
+    def status(self):
+        """Returns a dict that maps the status of the chunks to their number."""
+        return dict(
+            self.connection.execute(
+                "SELECT status, COUNT(*) FROM chunks GROUP BY status"
+            ).fetchall()
+        )
+
+    def finished(self):
+        """Whether every chunk is done or failed."""
+        return set(self.status()) <= {"done", "failed"}
+
+    def results(self):
+        """Returns the stored rows as a list of dicts ordered by community number."""
+        cursor = self.connection.execute(
+            "SELECT * FROM results ORDER BY community_number"
+        )
+        columns = [description[0] for description in cursor.description]
+        return [dict(zip(columns, values)) for values in cursor.fetchall()]
+
+    def to_csv(self, filename: str):
+        """Writes the stored rows ordered by community number to a csv file in the
+        format of Simulation.simulate_and_write_data_line."""
+        cursor = self.connection.execute(
+            "SELECT * FROM results ORDER BY community_number"
+        )
+        columns = [description[0] for description in cursor.description]
+        lines = [",".join(columns)] + [
+            ",".join(f"{value}" for value in values) for values in cursor
+        ]
+        with open(filename, "w") as f:
+            f.write("\n".join(lines))
+
+    def close(self):
+        self.connection.close()
+
+
+def sql_value(value):
+    # NumPy scalars are stored as the corresponding Python numbers
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def default_worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def run_worker(
+    database: str,
+    worker: str = None,
+    lease_seconds: float = 600.0,
+    heartbeat_interval: float = None,
+    poll_interval: float = 1.0,
+    max_chunks: int = None,
+):
+    """Runs a worker of a work queue until every chunk is done or failed. While the
+    worker simulates a chunk, a thread renews its lease every heartbeat_interval
+    seconds (a third of lease_seconds by default). If no chunk is available while
+    other workers still hold leases, the worker waits poll_interval seconds, so that
+    it takes over the chunks of lost workers.
+    :param database: str
+        The database file of create_work_queue
+    :param worker: str
+        Name of the worker; host name and process id by default
+    :param max_chunks: int
+        The worker stops after this number of chunks if given
+    :returns number_of_chunks: int
+        Number of chunks whose rows the worker stored"""
+    if worker is None:
+        worker = default_worker_name()
+    if heartbeat_interval is None:
+        heartbeat_interval = lease_seconds / 3
+    queue = WorkQueue(database, lease_seconds=lease_seconds)
+    simulation = queue.simulation()
+    number_of_chunks = 0
+    number_of_leases = 0
+    while max_chunks is None or number_of_leases < max_chunks:
+        chunk = queue.lease(worker)
+        if chunk is None:
+            if queue.finished():
+                break
+            time.sleep(poll_interval)
+            continue
+        number_of_leases += 1
+        chunk_id, start, stop = chunk
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(
+            target=renew_lease,
+            args=(database, chunk_id, worker, lease_seconds, heartbeat_interval),
+            kwargs={"stop": stop_heartbeat},
+            daemon=True,
+        )
+        heartbeat.start()
+        try:
+            rows = [
+                simulate_community(simulation, number) for number in range(start, stop)
+            ]
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+        number_of_chunks += queue.complete(chunk_id, worker, rows)
+    queue.close()
+    return number_of_chunks
+
+
+def renew_lease(
+    database: str,
+    chunk_id: int,
+    worker: str,
+    lease_seconds: float,
+    heartbeat_interval: float,
+    stop: threading.Event,
+):
+    # The thread needs its own connection
+    queue = WorkQueue(database, lease_seconds=lease_seconds)
+    while not stop.wait(heartbeat_interval):
+        if not queue.heartbeat(chunk_id, worker):
+            break
+    queue.close()
+
+
+def simulate_community(simulation, number: int):
+    community = simulation.generate_community(number)
+    save_community_to_file(
+        filename=f"{simulation.folder_communities}/communities/{number}",
+        community=community,
+    )
+    return simulation.simulate_data_row(community, number)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run a worker of a work queue or show the status of the queue."
+    )
+    parser.add_argument("command", choices=["worker", "status", "export"])
+    parser.add_argument("database")
+    parser.add_argument("--lease-seconds", type=float, default=600.0)
+    parser.add_argument("--output", help="csv file of the command export")
+    arguments = parser.parse_args()
+    if arguments.command == "worker":
+        number_of_chunks = run_worker(
+            arguments.database, lease_seconds=arguments.lease_seconds
+        )
+        print(f"Completed {number_of_chunks} chunks")
+    elif arguments.command == "status":
+        print(WorkQueue(arguments.database).status())
+    else:
+        WorkQueue(arguments.database).to_csv(arguments.output)
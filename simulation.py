@@ -1,12 +1,42 @@
 import concurrent.futures as cf
+import multiprocessing
 import os
 import random as rd
 import shutil
 import time
 
+import numpy as np
+
 from community import Community
-from scripts.basic_functions import calculate_accuracy_and_precision
-from scripts.save_read_community import combine_community_files, save_community_to_file
+from scripts.basic_functions import (
+    calculate_accuracy_and_precision,
+    voting_statistics_from_histogram,
+)
+from scripts.network_metrics import compute_network_metrics
+from scripts.parameter_design import (
+    design_point,
+    designs,
+    scale_to_integer_range,
+    scale_to_range,
+)
+from scripts.result_buffer import ResultBuffer, result_dtype
+from scripts.save_read_community import (
+    combine_community_files,
+    save_community_to_file,
+    save_histogram_to_file,
+)
+
+# Executors of Simulation.run; "serial" runs in the current thread and "queue" runs
+# worker processes of a work queue (see scripts.work_queue)
+executors: dict = {
+    "processes": cf.ProcessPoolExecutor,
+    "threads": cf.ThreadPoolExecutor,
+    "serial": None,
+    "queue": None,
+}
+
+# Columns of the data file with integer values
+integer_columns: list = ["community_number", "number_of_minority"]
 
 
 class Simulation:
@@ -23,6 +53,21 @@ class Simulation:
         mass_competence_range=(0.55, 0.7),
         number_of_elites_range=(25, 45),
         probability_homophilic_attachment_range=(0.5, 0.75),
+        exact_pre_influence: bool = False,
+        save_histograms: bool = False,
+        confidence_interval_method: str = "normal",
+        number_of_importance_samples: int = None,
+        design: str = "random",
+        design_seed: int = 0,
+        network_metrics: list = None,
+        online_statistics: bool = False,
+        checkpoint_interval: int = 1000,
+        executor: str = "processes",
+        max_workers: int = None,
+        seed: int = None,
+        result_buffer: bool = False,
+        overwrite_work_queue: bool = False,
+        chunk_size: int = 1,
     ):
         self.start_time = time.time()
         self.filename_csv = f"{filename_csv}.csv"
@@ -38,32 +83,188 @@ class Simulation:
         self.probability_homophilic_attachment_range = (
             probability_homophilic_attachment_range
         )
+        self.exact_pre_influence = exact_pre_influence
+        self.save_histograms = save_histograms
+        self.confidence_interval_method = confidence_interval_method
+        self.number_of_importance_samples = number_of_importance_samples
+        if design not in designs:
+            raise ValueError(f"Design {design} is not available")
+        self.design = design
+        self.design_seed = design_seed
+        self.network_metrics = network_metrics
+        self.online_statistics = online_statistics
+        self.checkpoint_interval = checkpoint_interval
+        if executor not in executors:
+            raise ValueError(f"Executor {executor} is not available")
+        self.executor = executor
+        self.max_workers = max_workers
+        # A work queue is resumed only by a simulation with the same seed
+        if executor == "queue" and seed is None:
+            raise ValueError("The executor queue requires a seed")
+        # Without seed, a random seed is drawn and recorded in the readme
+        self.seed = np.random.SeedSequence(seed).entropy
+        self.result_buffer = result_buffer
+        # Name of the shared memory of the result buffer while run() is running
+        self.result_buffer_name = None
+        self.overwrite_work_queue = overwrite_work_queue
+        # Number of communities per chunk of the work queue
+        self.chunk_size = chunk_size
 
     def run(self):
         print(f"Started simulation at {time.ctime()}")
         self.start_time = time.time()
-        self.initialize_dirs()
+        resume = False
+        if self.executor == "queue":
+            from scripts.work_queue import matching_work_queue
+
+            # The folder holds the database and communities of a resumed queue
+            resume = matching_work_queue(self.filename_work_queue, self)
+            if (
+                not resume
+                and os.path.exists(self.filename_work_queue)
+                and not self.overwrite_work_queue
+            ):
+                raise ValueError(
+                    f"The work queue {self.filename_work_queue} belongs to a "
+                    f"simulation with other parameters; set overwrite_work_queue "
+                    f"to replace it"
+                )
+        if not resume:
+            self.initialize_dirs()
         self.write_readme()
         self.write_head_line()
-        with cf.ProcessPoolExecutor() as executor:
-            executor.map(self.single_run, range(self.number_of_communities))
+        statistics = None
+        if self.online_statistics:
+            from scripts.online_statistics import OnlineStatistics
+
+            statistics = OnlineStatistics()
+        buffer = None
+        if self.result_buffer:
+            buffer = ResultBuffer.create(
+                self.buffer_dtype(), self.number_of_communities
+            )
+            self.result_buffer_name = buffer.name
+        numbers = range(self.number_of_communities)
+        try:
+            if self.executor == "serial":
+                rows = map(self.single_run, numbers)
+                self.collect_rows(rows, statistics, buffer)
+            elif self.executor == "queue":
+                self.collect_rows(self.run_work_queue(), statistics)
+            else:
+                executor_class = executors[self.executor]
+                with executor_class(max_workers=self.max_workers) as executor:
+                    rows = executor.map(self.single_run, numbers)
+                    self.collect_rows(rows, statistics, buffer)
+        finally:
+            if buffer is not None:
+                buffer.unlink()
+                self.result_buffer_name = None
+        if statistics is not None:
+            statistics.write_figure_cache(
+                data_file=self.filename_csv,
+                cache_directory=f"{self.folder_communities}/figure_cache",
+            )
         combine_community_files(
             directory_path=f"{self.folder_communities}/communities",
             output_file=f"{self.folder_communities}/communities.pickle",
             delete_directory=False,
         )
-        # for community_number in range(self.number_of_communities):
-        #     self.single_run(number=community_number)
         print("The simulation is a great success.")
 
+    def collect_rows(self, rows, statistics=None, buffer=None):
+        """Consumes the rows of single_run as they arrive, which raises the exceptions
+        of the workers, and writes a checkpoint every checkpoint_interval rows and at
+        the end. With a result buffer, the workers return no rows and the rows are
+        read from the buffer at the checkpoints."""
+        for number_of_rows, row in enumerate(rows, start=1):
+            if statistics is not None and buffer is None:
+                statistics.update(row)
+            if number_of_rows % self.checkpoint_interval == 0:
+                self.checkpoint(statistics, buffer)
+        self.checkpoint(statistics, buffer)
+
+    def checkpoint(self, statistics=None, buffer=None):
+        """Appends the new rows of the result buffer to the csv file, ordered by
+        community number, and saves the online statistics."""
+        if buffer is not None:
+            buffer.append_to_csv(self.filename_csv)
+            if statistics is not None:
+                for row in buffer.new_rows():
+                    statistics.update(row)
+        if statistics is not None:
+            statistics.save(self.filename_online_statistics)
+
+    def buffer_dtype(self):
+        return result_dtype(self.columns(), integer_columns=integer_columns)
+
+    def run_work_queue(self):
+        """Creates or resumes the work queue of the simulation, runs max_workers
+        worker processes (one per CPU by default) until all communities are done,
+        writes the csv file and returns the rows. More workers, also on other
+        machines, can join by running 'python -m scripts.work_queue worker' with the
+        database filename_work_queue. If chunks failed or were left unfinished, a
+        RuntimeError is raised instead; running the simulation again resumes the
+        queue and retries them."""
+        from scripts.work_queue import WorkQueue, create_work_queue, run_worker
+
+        database = create_work_queue(
+            self.filename_work_queue,
+            self,
+            chunk_size=self.chunk_size,
+            overwrite=self.overwrite_work_queue,
+        )
+        workers = [
+            multiprocessing.Process(target=run_worker, args=(database,))
+            for _ in range(self.max_workers or os.cpu_count())
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        queue = WorkQueue(database)
+        status = queue.status()
+        if set(status) - {"done"}:
+            queue.close()
+            raise RuntimeError(
+                f"The work queue {database} is incomplete: {status}. Running the "
+                f"simulation again retries the chunks."
+            )
+        queue.to_csv(self.filename_csv)
+        rows = queue.results()
+        queue.close()
+        return rows
+
+    @property
+    def filename_work_queue(self):
+        """Database of the work queue, see scripts.work_queue."""
+        return f"{self.folder_communities}/work_queue.sqlite"
+
+    @property
+    def filename_online_statistics(self):
+        """Checkpoint of the online statistics, see scripts.online_statistics. It can
+        be loaded with OnlineStatistics.load while the simulation runs."""
+        return f"{self.folder_communities}/online_statistics.npz"
+
     def single_run(self, number: int):
-        community = self.generate_community()
+        community = self.generate_community(number)
         save_community_to_file(
             filename=f"{self.folder_communities}/communities/{number}",
             community=community,
         )
-        self.simulate_and_write_data_line(community=community, number=number)
+        if self.result_buffer_name is None:
+            row = self.simulate_and_write_data_line(community=community, number=number)
+        else:
+            buffer = ResultBuffer.attach(
+                self.result_buffer_name,
+                self.buffer_dtype(),
+                self.number_of_communities,
+            )
+            buffer.write_row(number, self.simulate_data_row(community, number))
+            # The parent reads the row from the buffer
+            row = None
         self.report_progress(number)
+        return row
 
     def initialize_dirs(self):
         if os.path.exists(f"{self.folder_communities}"):
@@ -72,36 +273,98 @@ class Simulation:
         if os.path.exists(f"{self.filename_csv}"):
             os.remove(f"{self.filename_csv}")
 
+    def parameters(self):
+        """Returns the parameters of the simulation as a dict, as written to the
+        readme."""
+        parameters = {
+            "filename": self.filename_csv,
+            "folder": self.folder_communities,
+            "number_of_communities": self.number_of_communities,
+            "number_of_voting_simulations": self.number_of_voting_simulations,
+            "number_of_nodes": self.number_of_nodes,
+            "degree": self.degree,
+            "probability_preferential_attachment": (
+                self.probability_preferential_attachment
+            ),
+            "elite_competence_range": self.elite_competence_range,
+            "mass_competence_range": self.mass_competence_range,
+            "number_of_elites_range": self.number_of_elites_range,
+            "probability_homophilic_attachment_range": (
+                self.probability_homophilic_attachment_range
+            ),
+            "exact_pre_influence": self.exact_pre_influence,
+            "save_histograms": self.save_histograms,
+            "confidence_interval_method": self.confidence_interval_method,
+            "number_of_importance_samples": self.number_of_importance_samples,
+            "design": self.design,
+            "design_seed": self.design_seed,
+            "network_metrics": self.network_metrics,
+            "online_statistics": self.online_statistics,
+            "checkpoint_interval": self.checkpoint_interval,
+            "executor": self.executor,
+            "max_workers": self.max_workers,
+            "seed": self.seed,
+            "result_buffer": self.result_buffer,
+            "overwrite_work_queue": self.overwrite_work_queue,
+            "chunk_size": self.chunk_size,
+        }
+        return parameters
+
     def write_readme(self):
-        information = (
-            f"parameter, value\n"
-            f"filename, {self.filename_csv}\n"
-            f"folder, {self.folder_communities}\n"
-            f"number_of_communities, {self.number_of_communities}\n"
-            f"number_of_voting_simulations, {self.number_of_voting_simulations}\n"
-            f"number_of_nodes, {self.number_of_nodes}\n"
-            f"degree, {self.degree}\n"
-            f"probability_preferential_attachment"
-            f", {self.probability_preferential_attachment}\n"
-            f"elite_competence_range, {self.elite_competence_range}\n"
-            f"mass_competence_range, {self.mass_competence_range}\n"
-            f"number_of_elites_range, {self.number_of_elites_range}\n"
-            f"probability_homophilic_attachment_range, "
-            f"{self.probability_homophilic_attachment_range}"
+        information = "parameter, value\n" + "\n".join(
+            f"{name}, {value}" for name, value in self.parameters().items()
         )
         filename_readme = f"{self.folder_communities}/README.csv"
         with open(filename_readme, "w") as f:
             f.write(information)
 
-    def generate_community(self):
-        elite_competence: float = rd.uniform(*self.elite_competence_range)
-        mass_competence: float = rd.uniform(*self.mass_competence_range)
-        probability_homophilic_attachment = None
-        if self.probability_homophilic_attachment_range is not None:
-            probability_homophilic_attachment = rd.uniform(
-                *self.probability_homophilic_attachment_range
+    def community_seeds(self, number: int):
+        """Returns the seeds of the parameters, of the community and of the
+        importance sampling of community 'number'. They depend only on the seed of the
+        simulation and the number, so that every executor produces the same
+        communities and results in any order of the communities."""
+        seed_sequence = np.random.SeedSequence(self.seed, spawn_key=(number,))
+        return [int(value) for value in seed_sequence.generate_state(3, np.uint64)]
+
+    def generate_community(self, number: int = None):
+        """Returns a community whose parameters are drawn from the configured ranges,
+        either independently at random or, for the designs "sobol" and
+        "latin_hypercube", from the point of the design with index 'number', which
+        is therefore required by the designs. The random numbers of the community
+        are seeded by community_seeds(number) if 'number' is given."""
+        if number is None and self.design != "random":
+            raise ValueError(f"Design {self.design} requires the community number")
+        random, community_seed = rd, None
+        if number is not None:
+            parameter_seed, community_seed, _ = self.community_seeds(number)
+            random = rd.Random(parameter_seed)
+        if self.design == "random":
+            elite_competence: float = random.uniform(*self.elite_competence_range)
+            mass_competence: float = random.uniform(*self.mass_competence_range)
+            probability_homophilic_attachment = None
+            if self.probability_homophilic_attachment_range is not None:
+                probability_homophilic_attachment = random.uniform(
+                    *self.probability_homophilic_attachment_range
+                )
+            number_of_elites: int = random.randint(*self.number_of_elites_range)
+        else:
+            point = design_point(
+                design=self.design,
+                number=number,
+                number_of_points=self.number_of_communities,
+                dimension=4,
+                seed=self.design_seed,
             )
-        number_of_elites: int = rd.randint(*self.number_of_elites_range)
+            elite_competence = scale_to_range(point[0], self.elite_competence_range)
+            mass_competence = scale_to_range(point[1], self.mass_competence_range)
+            number_of_elites = scale_to_integer_range(
+                point[2], self.number_of_elites_range
+            )
+            probability_homophilic_attachment = None
+            if self.probability_homophilic_attachment_range is not None:
+                probability_homophilic_attachment = scale_to_range(
+                    point[3], self.probability_homophilic_attachment_range
+                )
 
         # 1. Generate community with these parameters
         community = Community(
@@ -114,40 +377,74 @@ class Simulation:
                 self.probability_preferential_attachment
             ),
             probability_homophilic_attachment=probability_homophilic_attachment,
+            seed=community_seed,
         )
         return community
 
+    def columns(self):
+        """Returns the columns of the data file."""
+        columns = [
+            "community_number",
+            "minority_competence",
+            "majority_competence",
+            "number_of_minority",
+            "influence_minority_proportion",
+            "homophily",
+            "accuracy",
+            "accuracy_precision",
+            "accuracy_pre_influence",
+            "accuracy_precision_pre_influence",
+            "mean",
+            "median",
+            "std",
+            "mean_pre_influence",
+            "median_pre_influence",
+            "std_pre_influence",
+        ]
+        if self.network_metrics is not None:
+            columns += self.network_metrics
+        if self.number_of_importance_samples is not None:
+            columns += [
+                "failure_probability",
+                "failure_precision",
+                "failure_effective_sample_size",
+            ]
+        return columns
+
     def write_head_line(self):
-        head_line = (
-            "community_number,"
-            + "minority_competence,"
-            + "majority_competence,"
-            + "number_of_minority,"
-            + "influence_minority_proportion,"
-            + "homophily,"
-            + "accuracy,"
-            + "accuracy_precision,"
-            + "accuracy_pre_influence,"
-            + "accuracy_precision_pre_influence,"
-            + "mean,"
-            + "median,"
-            + "std,"
-            + "mean_pre_influence,"
-            + "median_pre_influence,"
-            + "std_pre_influence"
-        )
         with open(self.filename_csv, "w") as f:
-            f.write(head_line)
+            f.write(",".join(self.columns()))
 
     def simulate_and_write_data_line(self, community: Community, number: int):
-        # Determine influence_minority_proportion
-        total_influence_minority = community.total_influence_elites()
-        total_influence_majority = community.total_influence_mass()
-        influence_minority_proportion = total_influence_minority / (
-            total_influence_minority + total_influence_majority
+        row = self.simulate_data_row(community, number)
+        data_line = ",".join(f"{value}" for value in row.values())
+        with open(self.filename_csv, "a") as f:
+            f.write(f"\n{data_line}")
+        return row
+
+    def simulate_data_row(self, community: Community, number: int):
+        """Runs the voting simulations of a community and returns the row of the
+        data file as a dict that maps the columns to the values."""
+        # Determine influence_minority_proportion and the other network metrics
+        metrics = compute_network_metrics(
+            edges=community.edge_array(),
+            number_of_nodes=community.number_of_nodes,
+            number_of_elites=community.number_of_elites,
+            metrics=["influence_minority_proportion"] + (self.network_metrics or []),
         )
+        influence_minority_proportion = metrics["influence_minority_proportion"]
         # Run voting simulations to estimate accuracy
-        result = community.voting_simulation(self.number_of_voting_simulations)
+        histogram = community.voting_simulation(
+            self.number_of_voting_simulations, return_histogram=True
+        )
+        if self.save_histograms:
+            save_histogram_to_file(
+                filename=f"{self.folder_communities}/histograms/{number}",
+                histogram=histogram,
+            )
+        result = voting_statistics_from_histogram(
+            histogram, method=self.confidence_interval_method
+        )
         accuracy = result["accuracy"]
         accuracy_precision = result["precision"]
         accuracy_pre_influence = result["accuracy_pre_influence"]
@@ -158,18 +455,51 @@ class Simulation:
         mean_pre_influence = result["mean_pre_influence"]
         median_pre_influence = result["median_pre_influence"]
         std_pre_influence = result["std_pre_influence"]
+        if self.exact_pre_influence:
+            # The accuracy prior to influence does not depend on the network
+            from scripts.epistemic_accuracy import exact_accuracy_pre_influence
+
+            accuracy_pre_influence = exact_accuracy_pre_influence(
+                number_of_elites=community.number_of_elites,
+                number_of_mass=community.number_of_mass,
+                elite_competence=community.elite_competence,
+                mass_competence=community.mass_competence,
+            )
+            # The exact accuracy has no confidence interval
+            accuracy_precision_pre_influence = None
 
         # Print results to line in csv folder_communities
-        data_line = (
-            f"{number},{community.elite_competence},{community.mass_competence},"
-            f"{community.number_of_elites},{influence_minority_proportion},"
-            f"{community.probability_homophilic_attachment},{accuracy},"
-            f"{accuracy_precision},{accuracy_pre_influence},"
-            f"{accuracy_precision_pre_influence},{mean},{median},{std},"
-            f"{mean_pre_influence},{median_pre_influence},{std_pre_influence}"
-        )
-        with open(self.filename_csv, "a") as f:
-            f.write(f"\n{data_line}")
+        row = {
+            "community_number": number,
+            "minority_competence": community.elite_competence,
+            "majority_competence": community.mass_competence,
+            "number_of_minority": community.number_of_elites,
+            "influence_minority_proportion": influence_minority_proportion,
+            "homophily": community.probability_homophilic_attachment,
+            "accuracy": accuracy,
+            "accuracy_precision": accuracy_precision,
+            "accuracy_pre_influence": accuracy_pre_influence,
+            "accuracy_precision_pre_influence": accuracy_precision_pre_influence,
+            "mean": mean,
+            "median": median,
+            "std": std,
+            "mean_pre_influence": mean_pre_influence,
+            "median_pre_influence": median_pre_influence,
+            "std_pre_influence": std_pre_influence,
+        }
+        if self.network_metrics is not None:
+            row.update({name: metrics[name] for name in self.network_metrics})
+        if self.number_of_importance_samples is not None:
+            # Rare failures of the majority are estimated by importance sampling
+            result = community.importance_sampling_simulation(
+                self.number_of_importance_samples,
+                seed=self.community_seeds(number)[2],
+                method=self.confidence_interval_method,
+            )
+            row["failure_probability"] = result["failure_probability"]
+            row["failure_precision"] = result["precision"]
+            row["failure_effective_sample_size"] = result["effective_sample_size"]
+        return row
 
     def report_progress(self, community_number):
         stamps_percent = [1, 5, 10, 20, 30, 40, 50, 60, 70, 80, 90]
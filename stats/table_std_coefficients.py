@@ -2,6 +2,11 @@ import pandas as pd
 import statsmodels.api as sm
 from scipy import stats
 from scripts.basic_functions import convert_math_to_text, convert_text_list_to_math_list
+from scripts.bootstrap import (
+    bootstrap_moments,
+    percentile_interval,
+    regression_statistics,
+)
 
 
 def table_std_coefficients(
@@ -9,7 +14,14 @@ def table_std_coefficients(
     output_file: str = None,
     independent_variables: list = None,
     dependent_variable: str = None,
+    number_of_resamples: int = None,
+    alpha: float = 0.05,
+    seed: int = 0,
 ):
+    """Table of standardized coefficients for the full data and for the low, medium
+    and high competence ranges. If 'number_of_resamples' is given, the columns
+    '<range>_lower' and '<range>_upper' contain bootstrap confidence bounds with
+    significance level 'alpha'."""
     # Initialize
     df = pd.read_csv(data_file)
 
@@ -28,17 +40,30 @@ def table_std_coefficients(
         "high": [0.65, 0.70],
     }
 
-    for subdata_key in subdata_vars.keys():
-        competence_range = subdata_vars[subdata_key]
-        df_sub = df.loc[
+    subsets: dict = {}
+    for subdata_key, competence_range in subdata_vars.items():
+        subsets[subdata_key] = (
             (df["minority_competence"] > min(competence_range))
             & (df["minority_competence"] < max(competence_range))
             & (df["majority_competence"] > min(competence_range))
             & (df["majority_competence"] < max(competence_range))
-        ]
+        )
+    variables = [convert_math_to_text(row) for row in rows]
+
+    # Bootstrap the moments of all competence ranges with one pool of workers
+    if number_of_resamples is not None:
+        moments = bootstrap_moments(
+            dataframe=df,
+            variables=variables + [dependent_variable],
+            number_of_resamples=number_of_resamples,
+            seed=seed,
+            subsets=list(subsets.values()),
+        )
+
+    for subset_number, subdata_key in enumerate(subsets):
+        df_sub = df.loc[subsets[subdata_key]]
 
         # Standardized coefficients
-        variables = [convert_math_to_text(row) for row in rows]
         df_norm = pd.DataFrame(stats.zscore(df_sub))
         Y_norm = df_norm[dependent_variable]
         X_norm = df_norm[variables]
@@ -48,6 +73,19 @@ def table_std_coefficients(
             variable = convert_math_to_text(row)
             table.loc[row, subdata_key] = round(model_norm.params[variable], 3)
 
+        # Bootstrap confidence intervals
+        if number_of_resamples is not None:
+            samples = regression_statistics(
+                moments[subset_number],
+                variables=variables + [dependent_variable],
+                dependent_variable=dependent_variable,
+                independent_variables=variables,
+            )
+            lower, upper = percentile_interval(samples["std_coefficients"], alpha)
+            for k, row in enumerate(rows):
+                table.loc[row, f"{subdata_key}_lower"] = round(lower[k], 3)
+                table.loc[row, f"{subdata_key}_upper"] = round(upper[k], 3)
+
     if not output_file:
         return table
     else:
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+from scripts.epistemic_accuracy import exact_accuracy_pre_influence_from_data
+
+
+def table_validation_pre_influence(
+    data_file: str = "../data/clean.csv",
+    output_file: str = None,
+    number_of_nodes: int = 100,
+    only_flagged: bool = True,
+    alpha: float = 0.05,
+):
+    """Compares the simulated majoritarian accuracy prior to influence with its exact
+    value. A community is flagged if the exact value lies outside the confidence
+    interval of the simulation, i.e. if the deviation exceeds half of
+    'accuracy_precision_pre_influence' (the width of the interval).
+
+    Parameters
+    ----------
+    data_file: str
+        The results of a simulation
+    output_file: str
+        Saves the table in 'output_file' or returns the table if it is not given
+    number_of_nodes: int
+        Number of nodes of the simulated communities
+    only_flagged: bool
+        Whether the table only contains the flagged communities
+    alpha: float
+        The p-value of the confidence intervals in the data
+
+    Returns
+    -------
+        Table with the simulated and exact accuracy prior to influence"""
+    df = pd.read_csv(data_file)
+
+    table = pd.DataFrame(
+        {
+            "community_number": df["community_number"],
+            "accuracy_pre_influence": df["accuracy_pre_influence"],
+            "accuracy_pre_influence_exact": exact_accuracy_pre_influence_from_data(
+                df, number_of_nodes=number_of_nodes
+            ),
+            "accuracy_precision_pre_influence": df["accuracy_precision_pre_influence"],
+        }
+    )
+    table["deviation"] = np.abs(
+        table["accuracy_pre_influence"] - table["accuracy_pre_influence_exact"]
+    )
+    table["flagged"] = table["deviation"] > (
+        table["accuracy_precision_pre_influence"] / 2
+    )
+    if only_flagged:
+        table = table[table["flagged"]]
+    print(
+        f"Flagged {table['flagged'].sum()} out of {len(df)} communities "
+        f"(expected about {round(alpha * len(df))} for alpha {alpha})"
+    )
+
+    if not output_file:
+        return table
+    else:
+        table.to_csv(f"{output_file}.csv", index=False)
+
+
+if __name__ == "__main__":
+    table_validation_pre_influence(
+        data_file="../data/clean.csv", output_file="../stats/table_validation"
+    )
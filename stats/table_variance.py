@@ -1,9 +1,23 @@
 import pandas as pd
 import statsmodels.api as sm
 from scripts.basic_functions import convert_math_to_text
+from scripts.bootstrap import (
+    bootstrap_moments,
+    percentile_interval,
+    regression_statistics,
+)
 
 
-def table_variance(data_file: str = "../data/clean.csv", output_file: str = None):
+def table_variance(
+    data_file: str = "../data/clean.csv",
+    output_file: str = None,
+    number_of_resamples: int = None,
+    alpha: float = 0.05,
+    seed: int = 0,
+):
+    """Table of R squared for several regression models. If 'number_of_resamples' is
+    given, the columns 'R_squared_lower' and 'R_squared_upper' contain bootstrap
+    confidence bounds with significance level 'alpha'."""
     # Initialize
     df = pd.read_csv(data_file)
 
@@ -19,6 +33,22 @@ def table_variance(data_file: str = "../data/clean.csv", output_file: str = None
     ]
     table = pd.DataFrame(index=rows)
 
+    # Bootstrap the moments of all variables once for all models
+    if number_of_resamples is not None:
+        all_variables = list(
+            dict.fromkeys(
+                variable
+                for row in rows
+                for variable in convert_math_to_text(row, "list")
+            )
+        ) + [output]
+        (moments,) = bootstrap_moments(
+            dataframe=df,
+            variables=all_variables,
+            number_of_resamples=number_of_resamples,
+            seed=seed,
+        )
+
     # Analysis
     for row in rows:
         # construct multiple linear regression model
@@ -28,6 +58,18 @@ def table_variance(data_file: str = "../data/clean.csv", output_file: str = None
         X = sm.add_constant(X)
         model = sm.OLS(Y, X).fit()
         table.loc[row, "R_squared"] = round(model.rsquared, 3)
+
+        # Bootstrap confidence interval
+        if number_of_resamples is not None:
+            samples = regression_statistics(
+                moments,
+                variables=all_variables,
+                dependent_variable=output,
+                independent_variables=variables,
+            )
+            lower, upper = percentile_interval(samples["r_squared"], alpha)
+            table.loc[row, "R_squared_lower"] = round(lower, 3)
+            table.loc[row, "R_squared_upper"] = round(upper, 3)
     if not output_file:
         return table
     else:
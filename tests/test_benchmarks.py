@@ -0,0 +1,34 @@
+from benchmarks.runner import case_id, compare_results, time_function
+
+
+def test_case_id():
+    params = {"number_of_nodes": 100, "degree": 6}
+    assert case_id("community_init", params) == (
+        "community_init(number_of_nodes=100, degree=6)"
+    )
+
+
+def test_time_function():
+    timings = time_function(lambda: sum(range(100)), repeat=3)
+    assert len(timings) == 3
+    assert all(timing >= 0 for timing in timings)
+
+
+def test_compare_results():
+    baseline = {
+        "a": {"min": 1.0},
+        "b": {"min": 1.0},
+        "c": {"min": 1.0},
+        "d": {"min": 1.0},
+        "e": {"error": "KeyError"},
+    }
+    current = {
+        "a": {"min": 1.05},
+        "b": {"min": 1.5},
+        "c": {"min": 0.5},
+        "e": {"min": 1.0},
+        "f": {"min": 1.0},
+    }
+    comparison = compare_results(baseline, current, threshold=0.1)
+    statuses = {item["case"]: item["status"] for item in comparison}
+    assert statuses == {"a": "unchanged", "b": "regression", "c": "improvement"}
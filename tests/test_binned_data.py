@@ -0,0 +1,44 @@
+import os
+
+import numpy as np
+import pandas as pd
+from generate_figures.binned_data import bin_counts, binned_columns, figure_bins
+
+
+def test_bin_counts():
+    values = np.random.default_rng(0).uniform(0, 1, 1000)
+    edges = np.linspace(0, 1, 11)
+    assert np.array_equal(bin_counts(values, edges), np.histogram(values, edges)[0])
+    # Values outside the bins are not counted
+    assert bin_counts([-1, 0, 1, 2, np.nan], edges).tolist() == [1] + [0] * 8 + [1]
+
+
+def test_binned_columns(tmp_path):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "accuracy": rng.uniform(0, 1, 2500),
+            "accuracy_pre_influence": rng.uniform(0, 1, 2500),
+            "influence_minority_proportion": rng.uniform(0.3, 0.6, 2500),
+        }
+    )
+    data_file = f"{tmp_path}/data.csv"
+    df.to_csv(data_file, index=False)
+    binned = binned_columns(
+        data_file, figure_bins, cache_directory=f"{tmp_path}/cache", chunk_size=1000
+    )
+    for column, edges in figure_bins.items():
+        expected_counts = np.histogram(df[column], edges)[0]
+        assert np.array_equal(binned[column]["counts"], expected_counts)
+    assert len(os.listdir(f"{tmp_path}/cache")) == 3
+
+    # The cached counts are used, unless the data file changes
+    cached = binned_columns(
+        data_file, {"accuracy": figure_bins["accuracy"]}, f"{tmp_path}/cache"
+    )
+    assert np.array_equal(cached["accuracy"]["counts"], binned["accuracy"]["counts"])
+    df.iloc[:100].to_csv(data_file, index=False)
+    changed = binned_columns(
+        data_file, {"accuracy": figure_bins["accuracy"]}, f"{tmp_path}/cache"
+    )
+    assert changed["accuracy"]["counts"].sum() == 100
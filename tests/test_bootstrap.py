@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+from scipy import stats
+from scripts.bootstrap import (
+    bootstrap_moments,
+    bootstrap_regression,
+    cross_products,
+    moments_to_statistics,
+    percentile_interval,
+    regression_statistics,
+)
+
+rng = np.random.default_rng(1)
+df = pd.DataFrame(rng.random((500, 3)), columns=["x1", "x2", "y"])
+df["y"] = df["y"] + 2 * df["x1"] - df["x2"]
+
+
+def test_moments_to_statistics():
+    products, pairs = cross_products(df, ["x1", "x2", "y"])
+    moments = np.zeros((1, 4, 4))
+    moments[0, pairs[0], pairs[1]] = products.sum(axis=0)
+    moments[0, pairs[1], pairs[0]] = products.sum(axis=0)
+    std_coefficients, r_squared = moments_to_statistics(moments)
+
+    df_norm = df.apply(stats.zscore)
+    model_norm = sm.OLS(df_norm["y"], sm.add_constant(df_norm[["x1", "x2"]])).fit()
+    assert np.allclose(std_coefficients[0], model_norm.params[["x1", "x2"]])
+    assert np.isclose(r_squared[0], model_norm.rsquared)
+
+
+def test_bootstrap_regression():
+    params = {
+        "dataframe": df,
+        "dependent_variable": "y",
+        "independent_variables": ["x1", "x2"],
+        "number_of_resamples": 250,
+        "seed": 3,
+        "batch_size": 100,
+    }
+    result_serial = bootstrap_regression(**params, max_workers=1)
+    result_parallel = bootstrap_regression(**params, max_workers=2)
+    assert result_serial["std_coefficients"].shape == (250, 2)
+    assert result_serial["r_squared"].shape == (250,)
+    assert np.allclose(result_serial["r_squared"], result_parallel["r_squared"])
+
+    lower, upper = percentile_interval(result_serial["r_squared"], alpha=0.05)
+    model = sm.OLS(df["y"], sm.add_constant(df[["x1", "x2"]])).fit()
+    assert lower < model.rsquared < upper
+
+
+def test_bootstrap_moments_of_subsets():
+    # One call for all subsets and models resamples like one call per regression
+    subsets = [df["x1"] < 0.5, df["x1"] >= 0.5]
+    moments = bootstrap_moments(
+        df,
+        ["x1", "x2", "y"],
+        number_of_resamples=150,
+        seed=3,
+        max_workers=2,
+        subsets=subsets,
+    )
+    for subset, subset_moments in zip(subsets, moments):
+        for independent_variables in [["x1"], ["x2"], ["x1", "x2"]]:
+            result = regression_statistics(
+                subset_moments, ["x1", "x2", "y"], "y", independent_variables
+            )
+            expected = bootstrap_regression(
+                df[subset],
+                "y",
+                independent_variables,
+                number_of_resamples=150,
+                seed=3,
+                max_workers=1,
+            )
+            assert np.allclose(result["r_squared"], expected["r_squared"])
+            assert np.allclose(
+                result["std_coefficients"], expected["std_coefficients"]
+            )
@@ -1,6 +1,10 @@
 import networkx as nx
+import numpy as np
+import pytest
 from community import Community
 from scripts import config as cfg
+from scripts.epistemic_accuracy import exact_accuracy_pre_influence
+from scripts.voting_rules import ignore_own_opinion, simple_majority, supermajority
 
 community_blank = Community(0, 0, 0, 0, 0, 0,)
 community_without_hom: Community = community_blank
@@ -191,6 +195,21 @@ def test_initialize_node_attributes():
     )
 
 
+def test_community_seed():
+    parameters = {
+        "number_of_nodes": 30,
+        "number_of_elites": 10,
+        "degree": 3,
+        "probability_homophilic_attachment": 0.6,
+    }
+    community = Community(**parameters, seed=5)
+    same_community = Community(**parameters, seed=5)
+    assert list(community.network.edges()) == list(same_community.network.edges())
+    assert community.voting_simulation(50) == same_community.voting_simulation(50)
+    other_community = Community(**parameters, seed=6)
+    assert list(community.network.edges()) != list(other_community.network.edges())
+
+
 def test_total_influence_elites():
     global community_from_edges
     assert community_from_edges.total_influence_elites() == (5 * 29)
@@ -223,6 +242,172 @@ def test_update_opinions():
         assert node_has_opinion
 
 
+def test_neighbourhood_array():
+    global community_from_edges
+    neighbourhoods = community_from_edges.neighbourhood_array()
+    assert neighbourhoods.shape == (200, 30)
+    assert set(neighbourhoods[0]) == set(range(30))
+    assert neighbourhoods[0, 0] == 0
+    assert all(neighbourhoods[100] == [100] + 29 * [200])
+
+
+def test_neighbourhood_array_cache():
+    community = Community(number_of_nodes=10, number_of_elites=4, degree=2)
+    neighbourhoods = community.neighbourhood_array()
+    assert community.neighbourhood_array() is neighbourhoods
+    assert not neighbourhoods.flags.writeable
+    # The network is frozen, and rewiring requires a new network, which rebuilds
+    # the index even if the number of edges is unchanged
+    source, target = next(iter(community.network.edges()))
+    with pytest.raises(nx.NetworkXError):
+        community.network.remove_edge(source, target)
+    new_target = next(
+        node
+        for node in community.nodes
+        if node != source and node not in community.network[source]
+    )
+    network = nx.DiGraph(community.network)
+    network.remove_edge(source, target)
+    network.add_edge(source, new_target)
+    community.network = network
+    assert target not in community.neighbourhood_array()[source]
+    assert new_target in community.neighbourhood_array()[source]
+    assert community.neighbourhood_array() is not neighbourhoods
+    assert np.array_equal(
+        community.neighbourhood_sizes,
+        [community.network.out_degree(node) + 1 for node in community.nodes],
+    )
+    # The array path gives the votes of the neighbourhood majority
+    community.update_votes()
+    for node in community.nodes:
+        opinions = [
+            community.network.nodes[neighbour]["opinion"]
+            for neighbour in [node] + list(community.network[node])
+        ]
+        number_for_mass = opinions.count(cfg.vote_for_mass)
+        if 2 * number_for_mass != len(opinions):
+            expected_vote = (
+                cfg.vote_for_mass
+                if 2 * number_for_mass > len(opinions)
+                else cfg.vote_for_elites
+            )
+            assert community.network.nodes[node]["vote"] == expected_vote
+
+
+def test_competence_sweep():
+    global community_without_hom
+    elite_values = [0.5, 0.7]
+    mass_values = [0.45, 0.55, 0.65]
+    result = community_without_hom.competence_sweep(
+        elite_values, mass_values, number_of_voting_simulations=300, seed=0
+    )
+    for key in ["accuracy", "precision", "accuracy_pre_influence"]:
+        assert result[key].shape == (2, 3)
+    assert np.all(np.diff(result["accuracy_pre_influence"], axis=1) > 0)
+    assert np.all(np.diff(result["accuracy_pre_influence"], axis=0) <= 0)
+    result_repeated = community_without_hom.competence_sweep(
+        elite_values, mass_values, number_of_voting_simulations=300, seed=0
+    )
+    assert np.array_equal(result["accuracy"], result_repeated["accuracy"])
+
+
+def test_voting_simulation_rules():
+    global community_without_hom
+    rules = {
+        "simple": simple_majority,
+        "supermajority": supermajority(0.5),
+        "ignore": ignore_own_opinion,
+    }
+    result = community_without_hom.voting_simulation_rules(
+        rules, number_of_voting_simulations=500, seed=0
+    )
+    assert set(result) == {"simple", "supermajority", "ignore", "pre_influence"}
+    # Neighbourhoods have odd size, so the rules coincide without ties
+    assert result["simple"]["accuracy"] == result["supermajority"]["accuracy"]
+    for name in result:
+        assert 0 <= result[name]["accuracy"] <= 1
+        assert result[name]["precision"] > 0
+
+
+def test_deliberation_simulation():
+    global community_with_hom
+    result = community_with_hom.deliberation_simulation(
+        number_of_voting_simulations=300, number_of_rounds=10, seed=0, batch_size=128
+    )
+    # The opinions and the first round are those of voting_simulation_rules
+    reference = community_with_hom.voting_simulation_rules(
+        {"simple": simple_majority}, number_of_voting_simulations=300, seed=0
+    )
+    assert len(result["accuracy"]) == 11
+    assert result["accuracy"][0] == reference["pre_influence"]["accuracy"]
+    assert result["accuracy"][1] == reference["simple"]["accuracy"]
+    assert np.isclose(
+        result["fixed_point"] + result["two_cycle"] + result["not_converged"], 1
+    )
+
+    # Two nodes of different opinions that copy each other swap their votes
+    community = Community(
+        number_of_nodes=2,
+        number_of_elites=1,
+        degree=1,
+        elite_competence=1.0,
+        mass_competence=1.0,
+        edges=[(0, 1), (1, 0)],
+    )
+    result = community.deliberation_simulation(
+        number_of_voting_simulations=10, number_of_rounds=5, rule=ignore_own_opinion
+    )
+    assert result["two_cycle"] == 1
+    assert result["convergence_round"] == 0
+    # In a complete network all nodes vote for the majority of opinions at once
+    community = Community(
+        number_of_nodes=5,
+        number_of_elites=2,
+        degree=4,
+        elite_competence=0.6,
+        mass_competence=0.6,
+        edges=[(i, j) for i in range(5) for j in range(5) if i != j],
+    )
+    result = community.deliberation_simulation(
+        number_of_voting_simulations=200, number_of_rounds=5, seed=1
+    )
+    assert result["fixed_point"] == 1
+    assert result["convergence_round"] <= 1
+    assert np.all(result["accuracy"][1:] == result["accuracy"][0])
+
+
+def test_importance_sampling_simulation():
+    community = Community(
+        number_of_nodes=40,
+        number_of_elites=12,
+        degree=4,
+        elite_competence=0.6,
+        mass_competence=0.8,
+        probability_homophilic_attachment=0.5,
+        seed=0,
+    )
+    exact_failure = 1 - exact_accuracy_pre_influence(12, 28, 0.6, 0.8)
+    result = community.importance_sampling_simulation(
+        number_of_voting_simulations=4000, alpha=0.001, seed=0
+    )
+    # A failure probability of about 2e-3 within a few percent from 4000 trials
+    assert result["relative_error_pre_influence"] < 0.05
+    assert abs(result["failure_probability_pre_influence"] - exact_failure) < (
+        result["precision_pre_influence"] / 2
+    )
+    assert result["effective_sample_size_pre_influence"] > 4000
+    assert 0 <= result["failure_probability"] <= 1
+    assert np.isclose(result["accuracy"], 1 - result["failure_probability"])
+    # Without tilt the weights are one and the estimate is plain Monte Carlo
+    result = community.importance_sampling_simulation(
+        number_of_voting_simulations=1000,
+        tilted_elite_competence=0.6,
+        tilted_mass_competence=0.8,
+        seed=0,
+    )
+    assert np.isclose(result["effective_sample_size"], 1000, rtol=0.1)
+
+
 def test_estimated_community_accuracy():
     pass
 
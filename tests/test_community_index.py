@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+from scripts.community_index import (
+    build_community_index,
+    load_communities,
+    resimulate_communities,
+    select_communities,
+)
+from scripts.community_store import CommunityStore, migrate_legacy_files
+from simulation import Simulation
+
+from tests.test_community_store import write_legacy_file
+
+
+@pytest.fixture(scope="module")
+def store_directory(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("index")
+    filenames = [
+        write_legacy_file(directory / "first", 6, homophily=0.6),
+        write_legacy_file(directory / "second", 3, homophily=None),
+    ]
+    migrate_legacy_files(filenames, f"{directory}/store", max_workers=1)
+    build_community_index(f"{directory}/store")
+    return f"{directory}/store"
+
+
+def test_select_communities(store_directory):
+    store = CommunityStore(store_directory)
+    number_of_elites = store.parameters["number_of_elites"]
+    assert select_communities(store_directory) == list(range(9))
+    community_ids = select_communities(store_directory, number_of_minority=(7, 9))
+    assert community_ids == [i for i in range(9) if 7 <= number_of_elites[i] <= 9]
+    # Communities without homophily are not in any homophily range
+    assert select_communities(store_directory, homophily=(0.5, None)) == list(range(6))
+    community_ids = select_communities(
+        store_directory, number_of_minority=(None, 6), reciprocity=(0, 1)
+    )
+    assert community_ids == [i for i in range(9) if number_of_elites[i] <= 6]
+    assert len(community_ids) == 4
+    with pytest.raises(ValueError):
+        select_communities(store_directory, diameter=(1, 2))
+
+    communities = list(load_communities(store_directory, community_ids))
+    assert [community.number_of_elites for community in communities] == [
+        number_of_elites[i] for i in community_ids
+    ]
+
+
+def test_resimulate_communities(store_directory, tmp_path):
+    simulation = Simulation(
+        folder_communities=f"{tmp_path}/results",
+        filename_csv=f"{tmp_path}/results",
+        number_of_communities=0,
+        number_of_voting_simulations=30,
+    )
+    community_ids = select_communities(store_directory, homophily=(None, 0.7))
+    resimulate_communities(simulation, store_directory, community_ids, max_workers=2)
+    data = pd.read_csv(simulation.filename_csv)
+    assert "community_number" not in data.columns
+    assert sorted(data["store_id"]) == community_ids
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from community import Community
+from scripts.community_store import (
+    CommunityStore,
+    communities_equal,
+    decode_communities,
+    migrate_legacy_files,
+)
+from scripts.save_read_community import (
+    combine_community_files,
+    community_compress,
+    read_community_from_combined_file,
+    save_community_to_file,
+)
+
+
+def write_legacy_file(directory, number_of_communities: int, homophily):
+    for number in range(number_of_communities):
+        community = Community(
+            number_of_nodes=20,
+            number_of_elites=5 + number,
+            degree=3,
+            probability_homophilic_attachment=homophily,
+        )
+        save_community_to_file(f"{directory}/communities/{number}", community)
+    combine_community_files(
+        directory_path=f"{directory}/communities",
+        output_file=f"{directory}/communities.pickle",
+        delete_directory=True,
+    )
+    return f"{directory}/communities.pickle"
+
+
+def test_migrate_legacy_files(tmp_path):
+    filenames = [
+        write_legacy_file(tmp_path / "first", 7, homophily=0.6),
+        write_legacy_file(tmp_path / "second", 4, homophily=None),
+    ]
+    report = migrate_legacy_files(
+        filenames,
+        f"{tmp_path}/store",
+        max_workers=2,
+        chunk_size=3,
+        number_of_verifications=5,
+    )
+    assert report["number_of_communities"] == 11
+    assert report["number_of_verified_communities"] == 9
+    assert report["communities_per_second"] > 0
+
+    store = CommunityStore(f"{tmp_path}/store")
+    assert len(store) == 11
+    assert store.parameters["file_number"].tolist() == [0] * 7 + [1] * 4
+    for row in range(11):
+        file_number = store.parameters["file_number"][row]
+        file_index = store.parameters["file_index"][row]
+        legacy_community = read_community_from_combined_file(
+            filenames[file_number], file_index
+        )
+        assert communities_equal(store.community(row), legacy_community)
+    assert store.community(10).probability_homophilic_attachment is None
+    assert report["number_of_edges"] == store.edge_offsets[-1]
+
+    with pytest.raises(FileExistsError):
+        migrate_legacy_files(filenames, f"{tmp_path}/store")
+
+
+def test_decode_communities():
+    community = Community(number_of_nodes=300, number_of_elites=100, degree=4)
+    parameters, numbers_of_edges, edges = decode_communities(
+        [community_compress(community)], file_number=0, start=0
+    )
+    assert numbers_of_edges.tolist() == [community.network.number_of_edges()]
+    assert edges.tolist() == [list(edge) for edge in community.network.edges()]
+    assert parameters["number_of_elites"][0] == 100
+    with pytest.raises(ValueError):
+        decode_communities(
+            [community_compress(community)], 0, 0, edge_dtype=np.uint8
+        )
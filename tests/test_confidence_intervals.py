@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from community import Community
+from scripts.basic_functions import (
+    accuracy_and_precision_from_counts,
+    accuracy_and_precision_from_histograms,
+    proportion_confidence_interval,
+    voting_statistics_from_histogram,
+)
+from scripts.save_read_community import (
+    read_histograms_from_directory,
+    save_histogram_to_file,
+)
+from statsmodels.stats.proportion import proportion_confint
+
+
+@pytest.mark.parametrize("method", ["normal", "wilson", "beta"])
+def test_proportion_confidence_interval(method):
+    number_of_items = np.array([1, 10, 10, 10, 100, 1000, 10 ** 5])
+    number_of_success = np.array([0, 0, 3, 10, 50, 999, 61234])
+    lower, upper = proportion_confidence_interval(
+        number_of_success, number_of_items, alpha=0.01, method=method
+    )
+    expected_lower, expected_upper = proportion_confint(
+        number_of_success, number_of_items, alpha=0.01, method=method
+    )
+    assert np.allclose(lower, expected_lower)
+    assert np.allclose(upper, expected_upper)
+    # Scalars and broadcasting
+    lower, upper = proportion_confidence_interval(3, 10, method=method)
+    assert np.ndim(lower) == 0
+    assert np.isclose(upper, proportion_confint(3, 10, method=method)[1])
+    lower, upper = proportion_confidence_interval([[1], [5]], 10, method=method)
+    assert lower.shape == (2, 1)
+
+
+def test_proportion_confidence_interval_method():
+    with pytest.raises(ValueError):
+        proportion_confidence_interval(3, 10, method="agresti")
+    result = accuracy_and_precision_from_counts(
+        np.array([40, 60]), 100, method="wilson"
+    )
+    assert np.allclose(result["accuracy"], [0.4, 0.6])
+    assert np.isclose(result["precision"][0], result["precision"][1])
+
+
+def test_accuracy_and_precision_from_histograms(tmp_path):
+    communities = [
+        Community(
+            number_of_nodes=20,
+            number_of_elites=8,
+            degree=4,
+            elite_competence=0.6,
+            mass_competence=mass_competence,
+        )
+        for mass_competence in [0.55, 0.7]
+    ]
+    histograms = [
+        community.voting_simulation(200, return_histogram=True)
+        for community in communities
+    ]
+    for number, histogram in enumerate(histograms):
+        save_histogram_to_file(f"{tmp_path}/{number}", histogram)
+    stored_histograms = read_histograms_from_directory(tmp_path, [0, 1])
+    assert [len(histogram["votes"]) for histogram in stored_histograms] == [21, 21]
+    for method in ["normal", "wilson", "beta"]:
+        result = accuracy_and_precision_from_histograms(
+            stored_histograms, alpha=0.01, method=method
+        )
+        for number, histogram in enumerate(histograms):
+            expected = voting_statistics_from_histogram(
+                histogram, alpha=0.01, method=method
+            )
+            for key in ["accuracy", "precision", "accuracy_pre_influence"]:
+                assert np.isclose(result[key][number], expected[key])
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scripts.emulator import GaussianProcessEmulator, active_learning
+from simulation import Simulation
+
+
+def synthetic_data(number_of_rows: int, seed: int):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "minority_competence": rng.uniform(0.55, 0.7, number_of_rows),
+            "majority_competence": rng.uniform(0.55, 0.7, number_of_rows),
+            "number_of_minority": rng.integers(25, 46, number_of_rows),
+            "homophily": rng.uniform(0.5, 0.75, number_of_rows),
+            "influence_minority_proportion": rng.uniform(0.3, 0.6, number_of_rows),
+        }
+    )
+    df["accuracy"] = (
+        0.5
+        + 3 * (df["majority_competence"] - df["minority_competence"])
+        - np.square(df["influence_minority_proportion"] - 0.3)
+    )
+    df["accuracy_precision"] = 0.01
+    return df
+
+
+def test_gaussian_process_emulator():
+    emulator = GaussianProcessEmulator(max_optimization_points=200).fit(
+        synthetic_data(300, seed=0)
+    )
+    test_data = synthetic_data(200, seed=1)
+    mean, std = emulator.predict(test_data)
+    assert np.sqrt(np.mean(np.square(mean - test_data["accuracy"]))) < 0.02
+    assert np.all(std >= 0)
+    # Far from the data the prediction is uncertain
+    outlier = test_data.iloc[:1].copy()
+    outlier["majority_competence"] = 0.95
+    assert emulator.predict(outlier)[1][0] > 5 * np.median(std)
+    # The batch avoids duplicates of the most uncertain candidate
+    candidates = pd.concat([outlier] * 3 + [test_data.iloc[1:20]], ignore_index=True)
+    chosen = emulator.select_batch(candidates, 3)
+    assert chosen[0] in [0, 1, 2]
+    assert len(set(chosen) & {0, 1, 2}) == 1
+
+
+def test_active_learning(tmp_path):
+    simulation = Simulation(
+        folder_communities=f"{tmp_path}/results",
+        filename_csv=f"{tmp_path}/results",
+        number_of_communities=0,
+        number_of_voting_simulations=20,
+        number_of_nodes=20,
+        degree=3,
+        number_of_elites_range=(5, 8),
+    )
+    data, emulator = active_learning(
+        simulation,
+        data=synthetic_data(30, seed=0),
+        number_of_rounds=2,
+        batch_size=2,
+        number_of_candidates=5,
+        emulator=GaussianProcessEmulator(max_optimization_points=50),
+        max_workers=2,
+    )
+    assert len(data) == 34
+    new_rows = pd.read_csv(simulation.filename_csv)
+    assert len(new_rows) == 4
+    assert new_rows["community_number"].nunique() == 4
+    assert new_rows["community_number"].between(0, 9).all()
+    # The data of an existing simulation is not overwritten
+    with pytest.raises(ValueError):
+        active_learning(simulation, data, number_of_rounds=1, batch_size=1)
+    assert len(pd.read_csv(simulation.filename_csv)) == 4
+
+    # The design spans the candidates beyond the number of communities
+    simulation = Simulation(
+        folder_communities=f"{tmp_path}/design",
+        filename_csv=f"{tmp_path}/design",
+        number_of_communities=4,
+        number_of_voting_simulations=20,
+        number_of_nodes=20,
+        degree=3,
+        number_of_elites_range=(5, 8),
+        design="latin_hypercube",
+    )
+    data, _ = active_learning(
+        simulation,
+        data=synthetic_data(30, seed=0),
+        number_of_rounds=1,
+        batch_size=1,
+        number_of_candidates=10,
+        emulator=GaussianProcessEmulator(max_optimization_points=50),
+        max_workers=1,
+    )
+    assert len(data) == 31
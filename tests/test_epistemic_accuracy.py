@@ -0,0 +1,90 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+from community import Community
+from scipy.stats import binom
+from scripts.epistemic_accuracy import (
+    epistemic_accuracy,
+    epistemic_accuracy_two_types,
+    exact_accuracy_pre_influence,
+    exact_accuracy_pre_influence_from_data,
+)
+
+
+def brute_force_accuracy(competences: list):
+    """Enumerates all vote profiles of a small group."""
+    group_size = len(competences)
+    probability_correct = 0
+    for profile in itertools.product([0, 1], repeat=group_size):
+        probability = np.prod(
+            [p if vote else 1 - p for vote, p in zip(profile, competences)]
+        )
+        if sum(profile) > group_size / 2:
+            probability_correct += probability
+        elif sum(profile) == group_size / 2:
+            probability_correct += probability / 2
+    return probability_correct
+
+
+def test_epistemic_accuracy():
+    assert np.isclose(epistemic_accuracy(3, 0.6), brute_force_accuracy([0.6] * 3))
+    assert np.isclose(epistemic_accuracy(4, 0.6), brute_force_accuracy([0.6] * 4))
+    assert epistemic_accuracy(2, 0.7) == 0.7
+    group_sizes = np.array([[1], [2], [11], [10 ** 6]])
+    competences = np.array([0.51, 0.6])
+    result = epistemic_accuracy(group_sizes, competences)
+    assert result.shape == (4, 2)
+    for (i, j), value in np.ndenumerate(result):
+        assert np.isclose(value, epistemic_accuracy(group_sizes[i, 0], competences[j]))
+    assert result[3, 1] > 1 - 1e-12
+
+
+def test_epistemic_accuracy_two_types():
+    for group_size_1, group_size_2 in [(2, 3), (3, 3), (4, 1), (0, 5)]:
+        competences = [0.7] * group_size_1 + [0.45] * group_size_2
+        assert np.isclose(
+            epistemic_accuracy_two_types(group_size_1, group_size_2, 0.7, 0.45),
+            brute_force_accuracy(competences),
+        )
+    group_sizes = np.array([10, 101, 4000, 10 ** 6])
+    assert np.allclose(
+        epistemic_accuracy_two_types(group_sizes // 2, group_sizes // 2, 0.55, 0.55),
+        epistemic_accuracy(2 * (group_sizes // 2), 0.55),
+    )
+    accuracy = epistemic_accuracy_two_types(40, 60, 0.3, [0.6, 0.65])
+    assert accuracy.shape == (2,)
+    assert accuracy[0] < accuracy[1]
+    # Compare with the full convolution
+    pmf = np.convolve(binom.pmf(range(41), 40, 0.3), binom.pmf(range(61), 60, 0.6))
+    assert np.isclose(accuracy[0], pmf[51:].sum() + pmf[50] / 2)
+
+
+def test_exact_accuracy_pre_influence():
+    community = Community(
+        number_of_nodes=12,
+        number_of_elites=5,
+        degree=4,
+        elite_competence=0.7,
+        mass_competence=0.55,
+        seed=0,
+    )
+    accuracy = exact_accuracy_pre_influence(5, 7, 0.7, 0.55)
+    competences = [0.3] * 5 + [0.55] * 7
+    assert np.isclose(accuracy, brute_force_accuracy(competences))
+    result = community.voting_simulation(1000, alpha=0.0001)
+    assert abs(result["accuracy_pre_influence"] - accuracy) < (
+        result["precision_pre_influence"] / 2
+    )
+
+    df = pd.DataFrame(
+        {
+            "number_of_minority": [5, 6],
+            "minority_competence": [0.7, 0.6],
+            "majority_competence": [0.55, 0.65],
+        }
+    )
+    assert np.allclose(
+        exact_accuracy_pre_influence_from_data(df, number_of_nodes=12),
+        [accuracy, exact_accuracy_pre_influence(6, 6, 0.6, 0.65)],
+    )
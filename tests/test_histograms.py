@@ -0,0 +1,72 @@
+import os
+import random as rd
+
+import numpy as np
+from community import Community
+from scripts.basic_functions import (
+    histogram_statistics,
+    voting_histogram,
+    voting_statistics_from_histogram,
+)
+from scripts.save_read_community import read_histogram_from_file, save_histogram_to_file
+
+
+def test_histogram_statistics():
+    rng = np.random.default_rng(0)
+    for number_of_values in [1, 2, 7, 100]:
+        values = rng.integers(0, 10, number_of_values)
+        mean, median, std = histogram_statistics(np.bincount(values, minlength=10))
+        assert np.isclose(mean, np.mean(values))
+        assert median == np.median(values)
+        assert np.isclose(std, np.std(values))
+
+
+def test_voting_histogram():
+    histogram = voting_histogram({(3, 4): 2, (2, 1): 1, (1, 2): 1}, 4)
+    assert np.array_equal(histogram["opinions"], [0, 1, 1, 2, 0])
+    assert np.array_equal(histogram["votes"], [0, 1, 1, 0, 2])
+    assert np.array_equal(histogram["pairs"], [[1, 2], [2, 1], [3, 4]])
+    assert np.array_equal(histogram["counts"], [1, 1, 2])
+
+
+def test_voting_statistics_from_histogram():
+    histogram = voting_histogram({(3, 4): 2, (2, 1): 1, (1, 2): 1}, 4)
+    result = voting_statistics_from_histogram(histogram)
+    assert result["accuracy"] == (2 + 0.5) / 4
+    assert result["accuracy_pre_influence"] == (2 + 0.5) / 4
+    assert result["mean"] == 11 / 4
+    assert result["median_pre_influence"] == 2.5
+    assert result["precision"] > 0
+
+
+def test_voting_simulation_histogram():
+    community = Community(number_of_nodes=30, number_of_elites=10, degree=4)
+    histogram = community.voting_simulation(50, return_histogram=True)
+    assert histogram["votes"].shape == (31,)
+    assert histogram["opinions"].sum() == histogram["counts"].sum() == 50
+    assert len(histogram["pairs"]) <= 50
+    result = community.voting_simulation(50)
+    assert 0 <= result["accuracy"] <= 1
+    assert 0 <= result["median"] <= 30
+
+
+def test_save_and_read_histogram():
+    histogram = voting_histogram({(3, 4): 2, (2, 1): 1}, 4)
+    save_histogram_to_file(filename="data/test_histogram", histogram=histogram)
+    stored_histogram = read_histogram_from_file("data/test_histogram")
+    assert set(stored_histogram) == set(histogram)
+    for key, value in histogram.items():
+        assert np.array_equal(stored_histogram[key], value)
+    os.remove("data/test_histogram.npz")
+
+
+def test_seeded_voting_simulation():
+    histograms = []
+    for _ in range(2):
+        community = Community(number_of_nodes=20, number_of_elites=8, degree=4, seed=5)
+        state = rd.getstate()
+        histograms.append(community.voting_simulation(100, return_histogram=True))
+        # Ties are broken by the generators of the community only
+        assert rd.getstate() == state
+    for key in histograms[0]:
+        assert np.array_equal(histograms[0][key], histograms[1][key])
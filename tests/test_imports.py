@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+
+root_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def imported_modules(module: str, candidates: list, statement: str = "pass"):
+    """Returns the candidates that are imported by importing 'module' and executing
+    'statement' in a new interpreter."""
+    command = (
+        f"import sys; import {module}; {statement}; "
+        f"print(','.join(m for m in {candidates!r} if m in sys.modules))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", command],
+        cwd=root_directory,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+    return [module for module in output.split(",") if module]
+
+
+def test_simulation_core_imports():
+    heavy_modules = ["statsmodels", "scipy", "pandas", "matplotlib", "seaborn"]
+    assert imported_modules("community", heavy_modules) == []
+    assert imported_modules("simulation", heavy_modules) == []
+    # The voting simulations of the workers import no heavy modules either
+    statement = (
+        "community.Community(number_of_nodes=20, number_of_elites=8, degree=3)"
+        ".voting_simulation(10)"
+    )
+    assert imported_modules("community", heavy_modules, statement) == []
+
+
+def test_figure_basics_imports():
+    plotting_modules = ["matplotlib", "seaborn"]
+    assert imported_modules("generate_figures.figure_basics", plotting_modules) == []
@@ -0,0 +1,41 @@
+import networkx as nx
+import numpy as np
+import pytest
+from community import Community
+from scripts.network_metrics import compute_network_metrics
+
+
+def test_compute_network_metrics():
+    # Nodes 0 and 1 are elites
+    edges = [(0, 1), (1, 0), (2, 0), (3, 0), (2, 3)]
+    metrics = compute_network_metrics(edges, number_of_nodes=4, number_of_elites=2)
+    assert metrics["influence_minority_proportion"] == 4 / 5
+    assert metrics["max_in_degree"] == 3
+    assert metrics["cross_type_edge_fraction"] == 2 / 5
+    assert metrics["reciprocity"] == 2 / 5
+    # In-degrees 3, 1, 0, 1
+    in_degrees = np.array([0, 1, 1, 3])
+    mean_difference = np.abs(in_degrees[:, None] - in_degrees[None, :]).mean()
+    assert metrics["in_degree_gini"] == pytest.approx(mean_difference / 2 / 1.25)
+    assert list(compute_network_metrics(edges, 4, 2, ["reciprocity"])) == [
+        "reciprocity"
+    ]
+    with pytest.raises(ValueError):
+        compute_network_metrics(edges, 4, 2, ["diameter"])
+
+
+def test_network_metrics_of_community():
+    community = Community(
+        number_of_nodes=60,
+        number_of_elites=20,
+        degree=4,
+        probability_homophilic_attachment=0.7,
+    )
+    metrics = compute_network_metrics(community.edge_array(), 60, 20)
+    assert metrics["influence_minority_proportion"] == (
+        community.total_influence_elites() / community.network.number_of_edges()
+    )
+    assert metrics["reciprocity"] == pytest.approx(nx.reciprocity(community.network))
+    assert metrics["max_in_degree"] == max(
+        in_degree for _, in_degree in community.network.in_degree()
+    )
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+from generate_figures.binned_data import bin_counts, binned_columns, figure_bins
+from scripts.online_statistics import OnlineStatistics, regression_variables
+from simulation import Simulation
+
+
+def random_rows(number_of_rows: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame(
+        {
+            "minority_competence": rng.uniform(0.55, 0.7, number_of_rows),
+            "majority_competence": rng.uniform(0.55, 0.7, number_of_rows),
+            "number_of_minority": rng.integers(25, 46, number_of_rows),
+            "influence_minority_proportion": rng.uniform(0.3, 0.6, number_of_rows),
+            "homophily": rng.uniform(0.5, 0.75, number_of_rows),
+            "accuracy_pre_influence": rng.uniform(0, 1, number_of_rows),
+        }
+    )
+    data["accuracy"] = (
+        0.2
+        + 0.8 * data["majority_competence"]
+        - 0.5 * data["influence_minority_proportion"]
+        + rng.normal(0, 0.05, number_of_rows)
+    )
+    return data
+
+
+def test_online_statistics(tmp_path):
+    data = random_rows(500)
+    statistics = OnlineStatistics()
+    for row in data.to_dict("records"):
+        statistics.update(row)
+    # A row with a missing homophily enters the histograms and moments only
+    statistics.update({"accuracy": 0.5, "homophily": None})
+
+    for column, edges in figure_bins.items():
+        values = np.append(data[column], 0.5) if column == "accuracy" else data[column]
+        assert np.array_equal(statistics.counts[column], np.histogram(values, edges)[0])
+    moments = statistics.moments()
+    assert moments["homophily"]["count"] == 500
+    assert np.isclose(moments["homophily"]["mean"], data["homophily"].mean())
+    assert np.isclose(
+        moments["majority_competence"]["std"], data["majority_competence"].std(ddof=0)
+    )
+
+    # Ordinary least squares on the same rows
+    x = np.column_stack([np.ones(500), data[regression_variables]])
+    coefficients = np.linalg.lstsq(x, data["accuracy"], rcond=None)[0]
+    residuals = data["accuracy"] - x @ coefficients
+    r_squared = 1 - residuals.var() / data["accuracy"].var()
+    regression = statistics.regression()
+    assert regression["number_of_rows"] == 500
+    assert np.allclose(list(regression["coefficients"].values()), coefficients)
+    assert np.isclose(regression["r_squared"], r_squared)
+    standardized = coefficients[1:] * data[regression_variables].std(ddof=0)
+    standardized /= data["accuracy"].std(ddof=0)
+    assert np.allclose(list(regression["std_coefficients"].values()), standardized)
+
+    subset = statistics.regression(["majority_competence"])
+    assert list(subset["coefficients"]) == ["const", "majority_competence"]
+
+    statistics.save(f"{tmp_path}/statistics.npz")
+    loaded = OnlineStatistics.load(f"{tmp_path}/statistics.npz")
+    assert loaded.variables == statistics.variables
+    assert np.allclose(loaded.cross_products, statistics.cross_products)
+    for column in figure_bins:
+        assert np.array_equal(loaded.counts[column], statistics.counts[column])
+
+
+def test_simulation_online_statistics(tmp_path):
+    simulation = Simulation(
+        folder_communities=f"{tmp_path}/results",
+        filename_csv=f"{tmp_path}/results",
+        number_of_communities=6,
+        number_of_voting_simulations=20,
+        number_of_nodes=20,
+        degree=3,
+        number_of_elites_range=(5, 9),
+        online_statistics=True,
+        checkpoint_interval=4,
+    )
+    simulation.run()
+    statistics = OnlineStatistics.load(simulation.filename_online_statistics)
+    assert statistics.cross_products[0, 0] == 6
+    data = pd.read_csv(simulation.filename_csv, skipinitialspace=True)
+    assert np.isclose(statistics.moments()["accuracy"]["mean"], data["accuracy"].mean())
+    # The figures read the histograms from the cache instead of the data file
+    binned = binned_columns(
+        simulation.filename_csv,
+        figure_bins,
+        cache_directory=f"{simulation.folder_communities}/figure_cache",
+    )
+    for column, edges in figure_bins.items():
+        assert np.array_equal(binned[column]["counts"], bin_counts(data[column], edges))
+        assert np.array_equal(binned[column]["counts"], statistics.counts[column])
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from scipy.stats import qmc
+from scripts.parameter_design import (
+    design_point,
+    scale_to_integer_range,
+    scale_to_range,
+)
+from simulation import Simulation
+
+
+def test_design_point():
+    sequence = qmc.Sobol(d=4, scramble=True, seed=3).random(16)
+    for number in [0, 5, 15]:
+        point = design_point("sobol", number, 16, 4, seed=3)
+        assert np.allclose(point, sequence[number])
+    # Numbers beyond the number of points extend the sequence
+    sequence = qmc.Sobol(d=4, scramble=True, seed=3).random_base2(6)
+    assert np.allclose(design_point("sobol", 37, 16, 4, seed=3), sequence[37])
+    # Latin hypercube: every stratum of every dimension holds one point
+    points = np.array(
+        [
+            design_point("latin_hypercube", number, 20, 4, seed=1)
+            for number in range(20)
+        ]
+    )
+    for dimension in range(4):
+        assert sorted(np.floor(points[:, dimension] * 20)) == list(range(20))
+    with pytest.raises(ValueError):
+        design_point("halton", 0, 20, 4)
+    with pytest.raises(ValueError):
+        design_point("latin_hypercube", 20, 20, 4)
+
+
+def test_scale_to_range():
+    assert scale_to_range(0.5, (0.55, 0.75)) == pytest.approx(0.65)
+    values = [scale_to_integer_range(u, (25, 29)) for u in np.linspace(0, 0.999, 100)]
+    assert set(values) == {25, 26, 27, 28, 29}
+    assert np.bincount(values)[25:].tolist() == [20] * 5
+
+
+def test_generate_community_with_design():
+    simulation = Simulation(
+        folder_communities="unused",
+        filename_csv="unused",
+        number_of_communities=16,
+        number_of_voting_simulations=1,
+        number_of_nodes=20,
+        degree=3,
+        number_of_elites_range=(5, 8),
+        design="sobol",
+        design_seed=2,
+    )
+    communities = [simulation.generate_community(number) for number in range(16)]
+    elite_competences = [community.elite_competence for community in communities]
+    assert all(0.55 <= value < 0.7 for value in elite_competences)
+    # The 16 points of a Sobol sequence fill each quarter of every range evenly
+    quarters = np.floor((np.array(elite_competences) - 0.55) / 0.15 * 4).astype(int)
+    assert np.bincount(quarters).tolist() == [4] * 4
+    numbers_of_elites = [community.number_of_elites for community in communities]
+    assert np.bincount(numbers_of_elites)[5:].tolist() == [4] * 4
+    # Reproducible for any single community number
+    community = simulation.generate_community(7)
+    assert community.mass_competence == communities[7].mass_competence
+    with pytest.raises(ValueError):
+        simulation.generate_community()
+    with pytest.raises(ValueError):
+        Simulation("unused", "unused", 1, 1, design="grid")
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+from scripts.basic_functions import accuracy_and_precision_from_counts
+from scripts.planner import (
+    calibration_nodes,
+    fit_cost_model,
+    fit_power_law,
+    measure_community,
+    plan_campaign,
+    trials_for_precision,
+)
+from scripts.work_queue import WorkQueue, create_work_queue
+from simulation import Simulation
+
+
+def test_fit_power_law():
+    x = np.array([100, 200, 400, 800])
+    coefficient, exponent = fit_power_law(x, 3e-6 * x ** 1.5)
+    assert coefficient == pytest.approx(3e-6)
+    assert exponent == pytest.approx(1.5)
+    assert fit_power_law([100], [2.0]) == (0.02, 1.0)
+    assert calibration_nodes(10 ** 5, 6) == [250, 500, 1000]
+    assert calibration_nodes(40, 6) == [28, 40]
+
+
+def test_trials_for_precision():
+    trials = trials_for_precision(0.02)
+    precision = accuracy_and_precision_from_counts(trials / 2, trials)["precision"]
+    assert precision <= 0.02 < accuracy_and_precision_from_counts(
+        (trials - 2) / 2, trials - 2
+    )["precision"]
+
+
+def test_plan_campaign(tmp_path):
+    measurements = [
+        measure_community(nodes, 3, calibration_trials=10, repeat=1)
+        for nodes in [30, 60]
+    ]
+    assert all(measurement["seconds_per_trial"] > 0 for measurement in measurements)
+    cost_model = fit_cost_model(measurements)
+    plan = plan_campaign(
+        number_of_communities=1000,
+        number_of_voting_simulations=500,
+        number_of_nodes=120,
+        degree=3,
+        cores=4,
+        time_budget_hours=1.0,
+        cost_model=cost_model,
+        baseline_bytes=10 ** 8,
+    )
+    assert plan["cpu_hours"] == pytest.approx(
+        1000 * plan["seconds_per_community"] / 3600
+    )
+    assert plan["wall_hours"] == pytest.approx(plan["cpu_hours"] / (4 * 0.9))
+    assert plan["memory_bytes"] == pytest.approx(4 * plan["memory_per_worker_bytes"])
+    assert plan["memory_per_worker_bytes"] > 10 ** 8
+    assert plan["disk_bytes"] > 0
+    # At least ten chunks per core
+    assert 1 <= plan["chunk_size"] <= 1000 // 40
+    # The chunk size is applied by the work queue of the simulation
+    simulation = Simulation(
+        folder_communities="unused",
+        filename_csv="unused",
+        number_of_communities=1000,
+        number_of_voting_simulations=500,
+        executor="queue",
+        seed=0,
+        chunk_size=plan["chunk_size"],
+    )
+    database = create_work_queue(
+        f"{tmp_path}/queue.sqlite", simulation, chunk_size=simulation.chunk_size
+    )
+    queue = WorkQueue(database)
+    assert queue.status()["pending"] == -(-1000 // plan["chunk_size"])
+    queue.close()
+    # The maximal number of trials fills the time budget
+    budget = plan_campaign(
+        number_of_communities=1000,
+        number_of_voting_simulations=plan["max_trials_within_budget"],
+        number_of_nodes=120,
+        degree=3,
+        cores=4,
+        cost_model=cost_model,
+        baseline_bytes=10 ** 8,
+    )
+    assert budget["wall_hours"] == pytest.approx(1.0, rel=0.01)
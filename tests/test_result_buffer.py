@@ -0,0 +1,52 @@
+import concurrent.futures as cf
+
+import numpy as np
+import pandas as pd
+from scripts.result_buffer import ResultBuffer, result_dtype
+
+columns = ["community_number", "accuracy", "homophily"]
+dtype = result_dtype(columns, integer_columns=["community_number"])
+
+
+def write_rows(name: str, numbers: list):
+    buffer = ResultBuffer.attach(name, dtype, 10)
+    for number in numbers:
+        buffer.write_row(
+            number,
+            {"community_number": number, "accuracy": number / 10, "homophily": None},
+        )
+
+
+def test_result_buffer(tmp_path):
+    buffer = ResultBuffer.create(dtype, 10)
+    try:
+        with cf.ProcessPoolExecutor(max_workers=2) as executor:
+            list(executor.map(write_rows, [buffer.name] * 2, [[7, 3, 5], [0, 9]]))
+        rows = buffer.new_rows()
+        assert [row["community_number"] for row in rows] == [0, 3, 5, 7, 9]
+        assert rows[1]["accuracy"] == 0.3 and np.isnan(rows[1]["homophily"])
+        assert buffer.new_rows() == []
+
+        # Only the rows up to the first missing row are appended
+        filename = f"{tmp_path}/data.csv"
+        with open(filename, "w") as f:
+            f.write(",".join(buffer.columns))
+        assert buffer.append_to_csv(filename) == 1
+        write_rows(buffer.name, [1])
+        assert [row["community_number"] for row in buffer.new_rows()] == [1]
+        assert buffer.append_to_csv(filename) == 1
+        assert buffer.append_to_csv(filename) == 0
+        with open(filename) as f:
+            lines = f.read().split("\n")
+        assert lines == [
+            "community_number,accuracy,homophily",
+            "0,0.0,None",
+            "1,0.1,None",
+        ]
+        write_rows(buffer.name, [2, 4, 6, 8])
+        assert buffer.append_to_csv(filename) == 8
+        data = pd.read_csv(filename)
+        assert data["community_number"].tolist() == list(range(10))
+        assert data["homophily"].isna().all()
+    finally:
+        buffer.unlink()
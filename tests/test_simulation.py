@@ -0,0 +1,62 @@
+import pandas as pd
+import pytest
+from simulation import Simulation
+
+
+def simulation_data(tmp_path, executor: str, seed: int = 3):
+    simulation = Simulation(
+        folder_communities=f"{tmp_path}/{executor}",
+        filename_csv=f"{tmp_path}/{executor}",
+        number_of_communities=6,
+        number_of_voting_simulations=20,
+        number_of_nodes=20,
+        degree=3,
+        number_of_elites_range=(5, 9),
+        executor=executor,
+        max_workers=2,
+        seed=seed,
+    )
+    simulation.run()
+    data = pd.read_csv(simulation.filename_csv, skipinitialspace=True)
+    return data.sort_values("community_number").reset_index(drop=True)
+
+
+def test_executors(tmp_path):
+    serial_data = simulation_data(tmp_path, "serial")
+    assert serial_data["community_number"].tolist() == list(range(6))
+    # Every community has its own random numbers, so the executors agree
+    for executor in ["threads", "processes", "queue"]:
+        pd.testing.assert_frame_equal(simulation_data(tmp_path, executor), serial_data)
+    other_seed_data = simulation_data(tmp_path / "other", "serial", seed=4)
+    assert not other_seed_data["accuracy"].equals(serial_data["accuracy"])
+    with pytest.raises(ValueError):
+        Simulation("unused", "unused", 1, 1, executor="cluster")
+    # A work queue can only be resumed with the same seed
+    with pytest.raises(ValueError):
+        Simulation("unused", "unused", 1, 1, executor="queue")
+
+
+def test_result_buffer(tmp_path):
+    data = {}
+    for result_buffer in [False, True]:
+        simulation = Simulation(
+            folder_communities=f"{tmp_path}/{result_buffer}",
+            filename_csv=f"{tmp_path}/{result_buffer}",
+            number_of_communities=8,
+            number_of_voting_simulations=20,
+            number_of_nodes=20,
+            degree=3,
+            number_of_elites_range=(5, 9),
+            probability_homophilic_attachment_range=None,
+            max_workers=2,
+            seed=0,
+            result_buffer=result_buffer,
+            checkpoint_interval=3,
+        )
+        simulation.run()
+        data[result_buffer] = pd.read_csv(simulation.filename_csv)
+    # The rows of the buffer are written ordered by community number
+    assert data[True]["community_number"].tolist() == list(range(8))
+    assert data[True]["homophily"].isna().all()
+    data[False] = data[False].sort_values("community_number").reset_index(drop=True)
+    pd.testing.assert_frame_equal(data[True], data[False])
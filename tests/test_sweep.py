@@ -0,0 +1,34 @@
+import random as rd
+
+from scripts.sweep import parameter_grid, parameter_sweep, task_seed
+
+
+def noisy_sum(a: float, b: float):
+    return a + b, rd.random()
+
+
+def test_parameter_grid():
+    grid = parameter_grid({"a": [1, 2], "b": [3]})
+    assert grid == [{"a": 1, "b": 3}, {"a": 2, "b": 3}]
+
+
+def test_task_seed():
+    assert task_seed(0, {"a": 1, "b": 3}, 0) == task_seed(0, {"b": 3, "a": 1}, 0)
+    assert task_seed(0, {"a": 1, "b": 3}, 0) != task_seed(0, {"a": 1, "b": 3}, 1)
+    assert task_seed(0, {"a": 1, "b": 3}, 0) != task_seed(1, {"a": 1, "b": 3}, 0)
+
+
+def test_parameter_sweep():
+    params = {
+        "function": noisy_sum,
+        "parameters": {"a": [1, 2], "b": [0.5, 1.5, 2.5]},
+        "outputs": ["sum", "noise"],
+        "number_of_replicates": 3,
+        "seed": 7,
+    }
+    df_serial = parameter_sweep(**params, max_workers=1)
+    df_parallel = parameter_sweep(**params, max_workers=2)
+    assert len(df_serial) == 2 * 3 * 3
+    assert list(df_serial.columns) == ["a", "b", "replicate", "sum", "noise"]
+    assert (df_serial["sum"] == df_serial["a"] + df_serial["b"]).all()
+    assert df_serial.equals(df_parallel)
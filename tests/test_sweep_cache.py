@@ -0,0 +1,82 @@
+import os
+import random as rd
+import shutil
+from functools import partial
+
+import numpy as np
+from scripts.sweep import parameter_sweep
+from scripts.sweep_cache import SweepCache, function_identity, local_dependencies
+
+cache_directory = "data/test_sweep_cache"
+
+
+def noisy_sum(a: float, b: float):
+    return a + b, rd.random()
+
+
+def teardown_function(function):
+    shutil.rmtree(cache_directory, ignore_errors=True)
+
+
+def test_function_identity():
+    identity = function_identity(partial(partial(noisy_sum, b=2), a=1))
+    assert identity["function"].endswith("noisy_sum")
+    assert identity["keywords"] == {"a": 1, "b": 2}
+
+
+def test_cache_key():
+    cache = SweepCache(cache_directory)
+    key = cache.key(noisy_sum, {"a": 1}, 3, 0)
+    assert key == cache.key(noisy_sum, {"a": 1}, 3, 0)
+    assert key != cache.key(noisy_sum, {"a": 1}, 4, 0)
+    assert key != cache.key(noisy_sum, {"a": 1}, 3, 1)
+    assert key != cache.key(partial(noisy_sum, b=1), {"a": 1}, 3, 0)
+    assert key != SweepCache(cache_directory, code_version="1").key(
+        noisy_sum, {"a": 1}, 3, 0
+    )
+
+
+def test_cache_eviction():
+    cache = SweepCache(cache_directory, max_size_bytes=450)
+    for k in range(2):
+        cache.put(str(k), np.zeros(10))
+        os.utime(cache.filename(str(k)), (k, k))
+    assert cache.get("0") is not None
+    cache.put("2", np.zeros(10))
+    assert sorted(os.listdir(cache_directory)) == ["0.npy", "2.npy"]
+    assert cache.get("1") is None
+
+
+def test_parameter_sweep_with_cache():
+    cache = SweepCache(cache_directory)
+    params = {
+        "function": noisy_sum,
+        "outputs": ["sum", "noise"],
+        "number_of_replicates": 2,
+        "seed": 1,
+        "max_workers": 1,
+        "cache": cache,
+    }
+    df = parameter_sweep(parameters={"a": [1, 2], "b": [3]}, **params)
+    assert len(os.listdir(cache_directory)) == 2
+
+    df_extended = parameter_sweep(parameters={"a": [1, 2, 3], "b": [3]}, **params)
+    assert len(os.listdir(cache_directory)) == 3
+    assert df_extended.iloc[:4].equals(df)
+    df_uncached = parameter_sweep(
+        parameters={"a": [1, 2, 3], "b": [3]},
+        **{**params, "cache": None},
+    )
+    assert df_extended.equals(df_uncached)
+
+
+def test_local_dependencies():
+    import community
+
+    names = [module.__name__ for module in local_dependencies(community)]
+    assert names == [
+        "community",
+        "scripts.basic_functions",
+        "scripts.config",
+        "scripts.voting_rules",
+    ]
@@ -0,0 +1,44 @@
+import numpy as np
+from scripts.voting_rules import (
+    ignore_own_opinion,
+    simple_majority,
+    supermajority,
+    weighted_self_vote,
+)
+
+number_for_mass = np.array([[2, 1, 0, 3]])
+out_degrees = np.array([4, 2, 0, 4])
+opinions_for_mass = np.array([[True, False, True, False]])
+tie_breakers = np.array([[0.9, 0.9, 0.9, 0.1]])
+
+
+def test_simple_majority():
+    votes = simple_majority(
+        number_for_mass, out_degrees, opinions_for_mass, tie_breakers
+    )
+    assert votes.tolist() == [[True, False, True, True]]
+
+
+def test_ignore_own_opinion():
+    votes = ignore_own_opinion(
+        number_for_mass, out_degrees, opinions_for_mass, tie_breakers
+    )
+    assert votes.tolist() == [[False, False, True, True]]
+
+
+def test_weighted_self_vote():
+    rule = weighted_self_vote(weight=3)
+    votes = rule(number_for_mass, out_degrees, opinions_for_mass, tie_breakers)
+    assert votes.tolist() == [[True, False, True, False]]
+    rule = weighted_self_vote(weight=0)
+    votes = rule(number_for_mass, out_degrees, opinions_for_mass, tie_breakers)
+    assert votes.tolist() == [[False, False, False, True]]
+
+
+def test_supermajority():
+    rule = supermajority(threshold=0.75)
+    votes = rule(number_for_mass, out_degrees, opinions_for_mass, tie_breakers)
+    assert votes.tolist() == [[True, False, True, False]]
+    rule = supermajority(threshold=0.6)
+    votes = rule(number_for_mass, out_degrees, opinions_for_mass, tie_breakers)
+    assert votes.tolist() == [[True, False, True, True]]
@@ -0,0 +1,153 @@
+import multiprocessing
+import time
+
+import pandas as pd
+import pytest
+from scripts.work_queue import (
+    WorkQueue,
+    create_work_queue,
+    run_worker,
+    simulate_community,
+)
+from simulation import Simulation
+
+
+def small_simulation(tmp_path, number_of_communities: int = 8):
+    return Simulation(
+        folder_communities=f"{tmp_path}/communities",
+        filename_csv=f"{tmp_path}/data",
+        number_of_communities=number_of_communities,
+        number_of_voting_simulations=20,
+        number_of_nodes=20,
+        degree=3,
+        number_of_elites_range=(5, 9),
+        executor="serial",
+        seed=2,
+    )
+
+
+def test_lease(tmp_path):
+    database = create_work_queue(
+        f"{tmp_path}/queue.sqlite", small_simulation(tmp_path, 5), chunk_size=2
+    )
+    queue = WorkQueue(database, lease_seconds=0.2, max_attempts=2)
+    assert queue.status() == {"pending": 3}
+    assert queue.lease("a") == (0, 0, 2)
+    assert queue.lease("b") == (1, 2, 4)
+    assert queue.heartbeat(0, "a")
+    assert not queue.heartbeat(0, "b")
+    time.sleep(0.3)
+    # The expired leases are retried
+    assert queue.lease("c") == (0, 0, 2)
+    assert not queue.complete(0, "a", [])
+    assert queue.complete(0, "c", [])
+    assert queue.lease("c") == (1, 2, 4)
+    assert queue.lease("c") == (2, 4, 5)
+    time.sleep(0.3)
+    # Chunk 1 was leased twice and fails, chunk 2 is retried
+    assert queue.lease("d") == (2, 4, 5)
+    assert queue.status() == {"done": 1, "failed": 1, "leased": 1}
+    assert not queue.finished()
+    queue.close()
+
+
+def test_workers(tmp_path):
+    simulation = small_simulation(tmp_path)
+    simulation.initialize_dirs()
+    database = create_work_queue(f"{tmp_path}/queue.sqlite", simulation, chunk_size=3)
+    # A lost worker leaves a leased chunk behind
+    queue = WorkQueue(database, lease_seconds=1.0)
+    assert queue.lease("lost") == (0, 0, 3)
+    workers = [
+        multiprocessing.Process(
+            target=run_worker,
+            args=(database,),
+            kwargs={"lease_seconds": 1.0, "poll_interval": 0.1},
+        )
+        for _ in range(2)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert all(worker.exitcode == 0 for worker in workers)
+    assert queue.status() == {"done": 3}
+    queue.to_csv(f"{tmp_path}/queue.csv")
+    queue.close()
+
+    simulation.run()
+    expected = pd.read_csv(simulation.filename_csv)
+    pd.testing.assert_frame_equal(pd.read_csv(f"{tmp_path}/queue.csv"), expected)
+
+
+def test_resume(tmp_path):
+    simulation = small_simulation(tmp_path, 5)
+    database = create_work_queue(f"{tmp_path}/queue.sqlite", simulation, chunk_size=2)
+    queue = WorkQueue(database, lease_seconds=0.1, max_attempts=1)
+    assert queue.lease("a") == (0, 0, 2)
+    assert queue.complete(0, "a", [{"community_number": 0, "accuracy": 0.5}])
+    assert queue.lease("a") == (1, 2, 4)
+    time.sleep(0.2)
+    assert queue.lease("b") == (2, 4, 5)
+    assert queue.status() == {"done": 1, "failed": 1, "leased": 1}
+    queue.close()
+
+    # The same simulation keeps the completed chunks and retries the failed chunk
+    simulation.max_workers = 4
+    create_work_queue(database, simulation, chunk_size=2)
+    queue = WorkQueue(database)
+    assert queue.status() == {"done": 1, "pending": 1, "leased": 1}
+    assert queue.results()[0]["accuracy"] == 0.5
+    queue.close()
+    # Another simulation replaces the database only if explicitly requested
+    other_simulation = small_simulation(tmp_path, 6)
+    with pytest.raises(ValueError):
+        create_work_queue(database, other_simulation, chunk_size=2)
+    create_work_queue(database, other_simulation, chunk_size=2, overwrite=True)
+    queue = WorkQueue(database)
+    assert queue.status() == {"pending": 3}
+    queue.close()
+
+
+def fail_on_community_three(simulation, number: int):
+    if number == 3:
+        raise ValueError("Lost community")
+    return simulate_community(simulation, number)
+
+
+def test_incomplete_work_queue(tmp_path, monkeypatch):
+    simulation = small_simulation(tmp_path, 5)
+    simulation.executor = "queue"
+    simulation.max_workers = 1
+    simulation.chunk_size = 2
+    # The worker processes are forked and inherit the failing simulation
+    monkeypatch.setattr(
+        "scripts.work_queue.simulate_community", fail_on_community_three
+    )
+    with pytest.raises(RuntimeError):
+        simulation.run()
+    # The data file is not written from an incomplete queue
+    assert pd.read_csv(simulation.filename_csv).empty
+    queue = WorkQueue(simulation.filename_work_queue)
+    # Community 3 fails in the second of three chunks
+    assert queue.chunk_size() == 2
+    assert queue.status() == {"done": 1, "leased": 1, "pending": 1}
+    assert len(queue.results()) == 2
+    # The lease of the lost worker expires
+    queue.connection.execute("UPDATE chunks SET lease_expires = 0")
+    queue.close()
+
+    # Running again resumes the queue and keeps the completed communities
+    monkeypatch.undo()
+    simulation.run()
+    data = pd.read_csv(simulation.filename_csv)
+    assert data["community_number"].tolist() == list(range(5))
+    # A simulation with another seed does not delete the finished queue
+    other_simulation = small_simulation(tmp_path, 5)
+    other_simulation.seed = 3
+    other_simulation.executor = "queue"
+    with pytest.raises(ValueError):
+        other_simulation.run()
+    queue = WorkQueue(simulation.filename_work_queue)
+    assert queue.status() == {"done": 3}
+    queue.close()